@@ -1,20 +1,72 @@
-import json
+import io
 import os
-import sqlite3
-from flask import Blueprint, jsonify, request
+from datetime import datetime, timezone
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from flask_login import login_required
-from shapely.geometry import shape
-from shapely.ops import transform
-import pyproj
-from shapely.ops import unary_union
+from cable_cache import get_snapshot, cache_stats
+from cable_store import (
+    FEATURE_PROPERTIES, MAX_FEATURE_ID, cable_version, iter_feature_json, name_exists, normalize_date,
+)
+from zone_crossings import (
+    ensure_crossings, ensure_zone_crossings, fetch_all_crossings, fetch_crossings,
+    summarize_cable_crossings, summarize_crossings,
+)
+from cable_index import cable_crossings, network_crossings
+from geometry_pyramid import level_from_args
+from zone_layers import ZONE_FILES, get_zone_layer, zone_level_path
+from db_utils import DATABASE_FILE, get_connection
+from http_cache import conditional, finish_response, http_cache_stats, make_etag, precompressed, vary
+from jurisdiction_report import REPORT_FORMATS, REPORT_WORKERS, build_report
+from json_utils import dumps
+from wire_format import compact_features, compact_geometries, compact_geometry_json, wire_params
 
 api_bp = Blueprint("api_bp", __name__)
-DATABASE_FILE = "UsersDB.db"
+
+# RFC 8142 GeoJSON text sequences: one RS-prefixed, LF-terminated Feature per record
+GEOJSON_SEQ_MIMETYPE = "application/geo+json-seq"
+
+# /api/cables parameters that can only be answered from the database
+QUERY_PARAMS = ("category", "name", "text", "bbox", "date_from", "date_to", "fields", "limit", "cursor")
+
+# Largest ?limit=... page of /api/cables
+MAX_PAGE_LIMIT = 10000
+
+# Most ?cable=... names one /api/cable-crossings/all request may ask for
+MAX_CROSSING_CABLES = 100
 
 def get_db():
-    conn = sqlite3.connect(DATABASE_FILE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    # Read-only pooled connection: the API never waits behind converter writes
+    return get_connection(DATABASE_FILE, readonly=True)
+
+@api_bp.after_request
+def compress_response(response):
+    # ETag / Last-Modified given to http_cache.conditional, then gzip or brotli
+    return finish_response(response)
+
+def cable_validators(*parts):
+    """
+    (etag, last_modified) of a response built from the cable tables, taken from
+    their cable_version row; `parts` add whatever else the response depends on.
+    """
+    conn = get_db()
+    try:
+        version, updated_at = cable_version(conn)
+    finally:
+        conn.close()
+    return make_etag("cables", version, *parts), updated_at
+
+def zone_validators(*parts):
+    """
+    Same as `cable_validators` for a response that also depends on every zone file.
+    """
+    zone_layers = [get_zone_layer(filename) for filename in ZONE_FILES.values()]
+    etag, last_modified = cable_validators(
+        *parts, *[zone_layer.file_hash if zone_layer else None for zone_layer in zone_layers]
+    )
+    for zone_layer in zone_layers:
+        if zone_layer is not None:
+            last_modified = max(last_modified, datetime.fromtimestamp(int(zone_layer.mtime), timezone.utc))
+    return etag, last_modified
 
 @api_bp.route("/api/cables", methods=["GET"])
 @login_required
@@ -22,49 +74,76 @@ def get_cables():
     """
     Returns cables from DB as a GeoJSON FeatureCollection,
     optionally filtered by ?Status=..., ?Condition=...
+    ?zoom=... or ?tolerance=... (degrees) return the precomputed simplified geometries.
+
+    Query parameters answered from the database indexes:
+        category=...                     exact Category of Cable
+        name=...                         case-insensitive name prefix
+        text=...                         full-text search over names
+        bbox=minLon,minLat,maxLon,maxLat features overlapping the box
+        date_from=... / date_to=...      fixed date range overlapping these dates
+        fields=a,b,geometry              only these properties (and geometry if listed)
+        limit=...&cursor=...             pages of `limit` (up to MAX_PAGE_LIMIT) features; the response
+                                         carries the `next_cursor` to pass back
+        format=compact                   quantized, delta-encoded coordinates (see
+                                         wire_format.wire_params); &precision=6, &delta=0
+
+    With ?stream=1 (implied by the parameters above) the FeatureCollection is written
+    feature by feature from the database cursor; `Accept: application/geo+json-seq`
+    streams RFC 8142 records.
+
+    The ETag follows the cable_version row and the negotiated mimetype, so
+    If-None-Match gets a 304 until the next insert; the unfiltered collection is
+    kept precompressed per version.
     """
     try:
-        status_filter = request.args.get("Status", "").strip()
-        cond_filter   = request.args.get("Condition", "").strip()
-
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute("SELECT feature_collection FROM Cables")
-        rows = cur.fetchall()
-        conn.close()
-
-        all_features = []
-        for row in rows:
-            feature_collection = row["feature_collection"]
-            if not feature_collection:
-                continue
-            data = json.loads(feature_collection)
-
-            # Check if data is a dict or a list
-            if isinstance(data, dict):
-                # assume { "type": "FeatureCollection", "features": [...] }
-                feature_list = data.get("features", [])
-            elif isinstance(data, list):
-                # It's already a list of features
-                feature_list = data
-            else:
-                feature_list = []
-
-            for feat in feature_list:
-                props = feat.get("properties", {})
-
-                # Filter by Status
-                if status_filter and props.get("Status", "") != status_filter:
-                    continue
-
-                # Filter by Condition
-                if cond_filter and props.get("Condition", "") != cond_filter:
-                    continue
-
-                # If we pass filters, add
-                all_features.append(feat)
+        try:
+            query = parse_cable_query(request.args)
+            encoding = wire_params(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # The same URL answers JSON or GeoJSON text sequences depending on Accept
+        vary("Accept")
+        best = request.accept_mimetypes.best_match(["application/json", GEOJSON_SEQ_MIMETYPE])
+        etag, last_modified = cable_validators(best or "application/json")
+        not_modified = conditional(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        if best == GEOJSON_SEQ_MIMETYPE:
+            if encoding is not None:
+                return jsonify({"error": "'format=compact' is not available for GeoJSON text sequences"}), 400
+            return Response(
+                stream_with_context(stream_cables(query, seq=True)),
+                mimetype=GEOJSON_SEQ_MIMETYPE,
+            )
+        if request.args.get("stream") or any(request.args.get(param) for param in QUERY_PARAMS):
+            return Response(
+                stream_with_context(stream_cables(query, encoding=encoding)),
+                mimetype="application/json" if encoding else "application/geo+json",
+            )
+
+        if not query["status"] and not query["condition"]:
+            cached = precompressed(("cables", etag, query["level"], dumps(encoding)))
+            if cached is not None:
+                return cached
+
+        snapshot = get_snapshot(get_db)
+        features, _ = snapshot.level(query["level"], get_db)
+        positions = snapshot.positions(
+            status=query["status"],
+            condition=query["condition"],
+        )
+        all_features = [features[pos] for pos in positions]
 
         # Return as a FeatureCollection
+        if encoding is not None:
+            return jsonify({
+                "type": "FeatureCollection",
+                "encoding": encoding,
+                "features": compact_features(all_features, encoding)
+            }), 200
         return jsonify({
             "type": "FeatureCollection",
             "features": all_features
@@ -75,6 +154,161 @@ def get_cables():
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
+def parse_cable_query(args):
+    """
+    Reads the /api/cables filters into keyword arguments for `iter_feature_json`.
+
+    Raises:
+        ValueError: With a message for the client if a parameter is malformed.
+    """
+    query = {
+        "status": args.get("Status", "").strip() or None,
+        "condition": args.get("Condition", "").strip() or None,
+        "category": args.get("category", "").strip() or None,
+        "name_prefix": args.get("name", "").strip() or None,
+        "text": args.get("text", "").strip() or None,
+        "bbox": None,
+        "date_from": None,
+        "date_to": None,
+        "fields": None,
+        "after": None,
+        "limit": None,
+    }
+
+    try:
+        query["level"] = level_from_args(args)
+    except ValueError:
+        raise ValueError("'zoom' and 'tolerance' must be numbers")
+
+    if args.get("bbox"):
+        try:
+            bbox = [float(part) for part in args["bbox"].split(",")]
+        except ValueError:
+            bbox = []
+        if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+            raise ValueError("'bbox' must be minLon,minLat,maxLon,maxLat")
+        query["bbox"] = tuple(bbox)
+
+    for param in ("date_from", "date_to"):
+        if args.get(param):
+            query[param] = normalize_date(args[param])
+            if query[param] is None:
+                raise ValueError(f"'{param}' must be a date (YYYY-MM-DD)")
+
+    if args.get("fields"):
+        query["fields"] = [field.strip() for field in args["fields"].split(",") if field.strip()]
+        unknown = [field for field in query["fields"] if field != "geometry" and field not in FEATURE_PROPERTIES]
+        if unknown:
+            raise ValueError(f"Unknown field(s) in 'fields': {', '.join(unknown)}")
+
+    if args.get("limit"):
+        try:
+            query["limit"] = int(args["limit"])
+        except ValueError:
+            query["limit"] = 0
+        if not 1 <= query["limit"] <= MAX_PAGE_LIMIT:
+            raise ValueError(f"'limit' must be an integer from 1 to {MAX_PAGE_LIMIT}")
+
+    if args.get("cursor"):
+        try:
+            query["after"] = int(args["cursor"])
+        except ValueError:
+            query["after"] = -1
+        if not 0 <= query["after"] <= MAX_FEATURE_ID:
+            raise ValueError("Invalid 'cursor'")
+
+    return query
+
+def stream_cables(query, seq=False, encoding=None):
+    """
+    Generator behind the streaming modes of /api/cables: either one
+    FeatureCollection or (seq=True) a GeoJSON text sequence.
+    With a limit, one extra row is read to tell whether there is a next page.
+    With an `encoding` (see wire_format.wire_params) the geometries are compact.
+    """
+    limit = query["limit"]
+    conn = get_db()
+    try:
+        options = {**query, "limit": limit + 1 if limit else None}
+        if encoding is not None:
+            options["geometry_encoder"] = compact_geometry_json(encoding)
+            options["drop_null_properties"] = True
+        features = iter_feature_json(conn, **options)
+        if seq:
+            for idx, (_, feature) in enumerate(features):
+                if limit and idx == limit:
+                    break
+                yield f"\x1e{feature}\n"
+            return
+
+        if encoding is not None:
+            yield f'{{"type": "FeatureCollection", "encoding": {dumps(encoding)}, "features": ['
+        else:
+            yield '{"type": "FeatureCollection", "features": ['
+        next_cursor = None
+        last_id = None
+        for idx, (feature_id, feature) in enumerate(features):
+            if limit and idx == limit:
+                next_cursor = str(last_id)
+                break
+            yield feature if idx == 0 else "," + feature
+            last_id = feature_id
+        if limit:
+            yield f'], "next_cursor": {dumps(next_cursor)}}}'
+        else:
+            yield "]}"
+    finally:
+        conn.close()
+
+@api_bp.route("/api/zones/<zone_label>", methods=["GET"])
+@login_required
+def get_zone(zone_label):
+    """
+    GET /api/zones/<zone_label>?zoom=3
+    Returns a maritime zone layer as GeoJSON, at the simplification level
+    matching ?zoom=... or ?tolerance=... (full detail when neither is given).
+    The ETag follows the zone file hash; each level is kept precompressed.
+    """
+    if zone_label not in ZONE_FILES:
+        return jsonify({"error": f"Unknown zone '{zone_label}'"}), 404
+
+    try:
+        try:
+            level = level_from_args(request.args)
+        except ValueError:
+            return jsonify({"error": "'zoom' and 'tolerance' must be numbers"}), 400
+
+        path = zone_level_path(ZONE_FILES[zone_label], level)
+        zone_layer = get_zone_layer(ZONE_FILES[zone_label])
+        if path is None or zone_layer is None:
+            return jsonify({"error": f"{ZONE_FILES[zone_label]} not found"}), 404
+
+        etag = make_etag("zone", zone_layer.file_hash, level)
+        last_modified = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+        not_modified = conditional(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        cached = precompressed(("zone", etag))
+        if cached is not None:
+            return cached
+        with open(path, "rb") as f:
+            return Response(f.read(), mimetype="application/geo+json")
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@api_bp.route("/api/cache/stats", methods=["GET"])
+@login_required
+def get_cache_stats():
+    """
+    Returns hit/miss counters of the in-process parsed-cable cache, and under
+    "http" the 304 and precompressed-response counters.
+    """
+    return jsonify({**cache_stats(), "http": http_cache_stats()}), 200
+
 @api_bp.route("/api/cable-crossings/territorial", methods=["GET"])
 @login_required
 def get_territorial_crossings():
@@ -126,81 +360,167 @@ def get_highseas_crossings():
     return compute_zone_intersections("highseas", "simplified_High_Seas_v2.geojson")
 
 
+def geometry_response(key, records, encoding):
+    """
+    JSON response {key: records}; with an `encoding` the record geometries are
+    compact and the encoding is returned alongside them.
+    """
+    if encoding is None:
+        return jsonify({key: records}), 200
+    return jsonify({"encoding": encoding, key: compact_geometries(records, encoding)}), 200
+
+
 def compute_zone_intersections(zone_label, filename):
+    """
+    Reads the crossings of ?cable=... with one zone from `cable_zone_crossings`.
+    The table is filled at insert time and rebuilt when the zone file changes.
+    ?format=compact returns the geometries in the compact wire format.
+    The ETag follows both the cable_version row and the zone file hash.
+    """
     try:
         cable_name = request.args.get("cable", "").strip().lower()
+        try:
+            encoding = wire_params(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        zone_layer = get_zone_layer(filename)
+        if zone_layer is not None:
+            etag, last_modified = cable_validators("crossings", zone_label, zone_layer.file_hash)
+            last_modified = max(last_modified, datetime.fromtimestamp(int(zone_layer.mtime), timezone.utc))
+            not_modified = conditional(etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+
+        # Writable: a changed zone file makes ensure_zone_crossings rebuild its rows
+        conn = get_connection(DATABASE_FILE)
+        try:
+            if not name_exists(conn, cable_name):
+                return jsonify({"error": f"Cable '{cable_name}' not found"}), 404
+
+            if not ensure_zone_crossings(conn, zone_label):
+                return jsonify({"error": f"{filename} not found"}), 404
+
+            intersections = fetch_crossings(conn, zone_label, cable_name)
+        finally:
+            conn.close()
+
+        return geometry_response("intersections", intersections, encoding)
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
 
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute("SELECT feature_collection FROM Cables")
-        rows = cur.fetchall()
-        conn.close()
 
-        cable_geom_list = []
-        for row in rows:
-            feature_collection = row["feature_collection"]
-            if not feature_collection:
-                continue
-            data = json.loads(feature_collection)
-
-            # handle list vs dict
-            if isinstance(data, dict):
-                feature_list = data.get("features", [])
-            elif isinstance(data, list):
-                feature_list = data
-            else:
-                feature_list = []
-
-            for feat in feature_list:
-                props = feat.get("properties", {})
-                if props.get("[Feature Name]: Name", "").lower() == cable_name:
-                    g = shape(feat["geometry"])
-                    cable_geom_list.append(g)
-
-        if not cable_geom_list:
-            return jsonify({"error": f"Cable '{cable_name}' not found"}), 404
-
-        cable_geom = unary_union(cable_geom_list)
-
-
-        base_path = os.path.join("static", "simplified_geojson_files")
-        file_path = os.path.join(base_path, filename)
-        if not os.path.exists(file_path):
-            return jsonify({"error": f"{filename} not found"}), 404
-
-        with open(file_path, "r", encoding="utf-8") as f:
-            zone_data = json.load(f)
-
-        project_to_mercator = pyproj.Transformer.from_crs(
-            "EPSG:4326", "EPSG:3857", always_xy=True
-        ).transform
-
-        intersections = []
-        # For each zone polygon
-        for zfeat in zone_data.get("features", []):
-            geom = zfeat.get("geometry")
-            if not geom or not geom.get("type"):
-                continue
-            zone_geom = shape(geom)
-            country_name = zfeat.get("properties", {}).get("SOVEREIGN1", "Unknown")
-
-            if cable_geom.intersects(zone_geom):
-                inters = cable_geom.intersection(zone_geom)
-                if not inters.is_empty:
-                    inters_geojson = json.loads(json.dumps(inters.__geo_interface__))
-                    inters_merc = transform(project_to_mercator, inters)
-                    length_m = inters_merc.length
-                    length_km = length_m / 1000.0
-
-                    intersections.append({
-                        "zone_label": zone_label,
-                        "cable_name": cable_name,
-                        "country_name": country_name,
-                        "intersection_km": round(length_km, 3),
-                        "geometry": inters_geojson
-                    })
-
-        return jsonify({"intersections": intersections}), 200
+@api_bp.route("/api/cable-crossings/all", methods=["GET"])
+@login_required
+def get_all_zone_crossings():
+    """
+    GET /api/cable-crossings/all?cable=C-Lion[&cable=2Africa...]
+    Returns the crossings of one or more cables with every zone layer in one
+    response, grouped by zone, plus a per-country, per-zone length breakdown for
+    each cable and for all of them together:
+
+        {"zones": [...], "cables": [{"cable_name", "intersections": {zone: [...]},
+         "summary": {...}}], "summary": {...}, "not_found": [...]}
+
+    ?format=compact returns the geometries in the compact wire format.
+    """
+    try:
+        cable_names = list(dict.fromkeys(
+            name.strip().lower() for name in request.args.getlist("cable") if name.strip()
+        ))
+        if not cable_names:
+            return jsonify({"error": "Missing 'cable' query param"}), 400
+        if len(cable_names) > MAX_CROSSING_CABLES:
+            return jsonify({"error": f"At most {MAX_CROSSING_CABLES} 'cable' params per request"}), 400
+        try:
+            encoding = wire_params(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        not_modified = conditional(*zone_validators("crossings-all"))
+        if not_modified is not None:
+            return not_modified
+
+        # Writable: changed zone files make ensure_crossings rebuild their rows
+        conn = get_connection(DATABASE_FILE)
+        try:
+            found = [name for name in cable_names if name_exists(conn, name)]
+            if not found:
+                if len(cable_names) == 1:
+                    return jsonify({"error": f"Cable '{cable_names[0]}' not found"}), 404
+                return jsonify({"error": "None of the cables were found"}), 404
+
+            zone_labels = ensure_crossings(conn)
+            crossings = fetch_all_crossings(conn, found, zone_labels)
+        finally:
+            conn.close()
+
+        cables = [
+            {
+                "cable_name": name,
+                "intersections": {
+                    zone_label: compact_geometries(records, encoding)
+                    for zone_label, records in crossings[name].items()
+                },
+                "summary": summarize_cable_crossings(crossings[name]),
+            }
+            for name in found
+        ]
+        result = {
+            "zones": zone_labels,
+            "cables": cables,
+            "summary": summarize_crossings(
+                record for name in found for records in crossings[name].values() for record in records
+            ),
+            "not_found": [name for name in cable_names if name not in found],
+        }
+        if encoding is not None:
+            result["encoding"] = encoding
+        return jsonify(result), 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route("/api/reports/jurisdictions", methods=["GET"])
+@login_required
+def get_jurisdiction_report():
+    """
+    GET /api/reports/jurisdictions?format=csv|xlsx|parquet
+    Downloads the whole-network jurisdiction report: km of every cable per country
+    and zone type (see jurisdiction_report.py). Only cables changed since the last
+    report are recomputed; ?full=1 recomputes every cable.
+    """
+    try:
+        fmt = request.args.get("format", "csv").strip().lower()
+        if fmt not in REPORT_FORMATS:
+            return jsonify({"error": f"'format' must be one of: {', '.join(REPORT_FORMATS)}"}), 400
+        full = request.args.get("full", "").strip().lower() in ("1", "true", "yes")
+
+        not_modified = conditional(*zone_validators("jurisdiction-report"))
+        if not_modified is not None and not full:
+            return not_modified
+
+        output = io.BytesIO()
+        try:
+            stats = build_report(output, fmt, DATABASE_FILE, full=full, workers=REPORT_WORKERS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        current_app.logger.info(
+            "Jurisdiction report: recomputed %d of %d cables in %ss.",
+            stats["recomputed"], stats["cables"], stats["elapsed"],
+        )
+
+        return Response(
+            output.getvalue(),
+            mimetype=REPORT_FORMATS[fmt],
+            headers={"Content-Disposition": f'attachment; filename="jurisdiction_report.{fmt}"'},
+        )
 
     except Exception as e:
         import traceback
@@ -216,92 +536,65 @@ def get_cable_to_cable_crossings():
         cable_name_query = request.args.get("cable", "").strip().lower()
         if not cable_name_query:
             return jsonify({"error": "Missing 'cable' query param"}), 400
+        try:
+            encoding = wire_params(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        not_modified = conditional(*cable_validators("cable-crossings"))
+        if not_modified is not None:
+            return not_modified
+
+        snapshot = get_snapshot(get_db)
 
+        # Only cables near the requested one (R*Tree lookup) are intersected
         conn = get_db()
-        cur = conn.cursor()
-        cur.execute("SELECT feature_collection FROM Cables")
-        rows = cur.fetchall()
+        crossings = cable_crossings(conn, snapshot, cable_name_query)
         conn.close()
 
-        # 1) Build geometry for the requested cable (call it "cableA")
-        cableA_geom_list = []
-        for row in rows:
-            fc = row["feature_collection"]
-            if not fc:
-                continue
-            data = json.loads(fc)
-            if isinstance(data, dict):
-                feature_list = data.get("features", [])
-            elif isinstance(data, list):
-                feature_list = data
-            else:
-                feature_list = []
-
-            for feat in feature_list:
-                props = feat.get("properties", {})
-                if props.get("[Feature Name]: Name", "").lower() == cable_name_query:
-                    cableA_geom_list.append(shape(feat["geometry"]))
-
-        if not cableA_geom_list:
+        if crossings is None:
             return jsonify({"error": f"Cable '{cable_name_query}' not found"}), 404
 
+        return geometry_response("crossings", crossings, encoding)
 
-        cableA_geom = unary_union(cableA_geom_list)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route("/api/cable-crossings/network", methods=["GET"])
+@login_required
+def get_network_crossings():
+    """
+    GET /api/cable-crossings/network
+    Returns every pairwise cable-to-cable crossing in one batch, for reporting.
+    ?format=compact returns the geometries in the compact wire format.
+    Kept precompressed until the next change to the cable tables.
+    """
+    try:
+        try:
+            encoding = wire_params(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        crossings = []
+        etag, last_modified = cable_validators("cable-crossings")
+        not_modified = conditional(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
 
+        cached = precompressed(("network", etag, dumps(encoding)))
+        if cached is not None:
+            return cached
+
+        snapshot = get_snapshot(get_db)
         conn = get_db()
-        cur = conn.cursor()
-        cur.execute("SELECT feature_collection FROM Cables")
-        rows2 = cur.fetchall()
+        crossings = network_crossings(conn, snapshot)
         conn.close()
 
-        for row2 in rows2:
-            fc2 = row2["feature_collection"]
-            if not fc2:
-                continue
-            data2 = json.loads(fc2)
-            if isinstance(data2, dict):
-                feature_list2 = data2.get("features", [])
-            elif isinstance(data2, list):
-                feature_list2 = data2
-            else:
-                feature_list2 = []
-
-            # Build geometry for cableB
-            cableB_name = None
-            cableB_geom_list = []
-            for feat2 in feature_list2:
-                props2 = feat2.get("properties", {})
-                # The name from the partial feature
-                nameB = props2.get("[Feature Name]: Name", "").lower()
-                if not cableB_name and nameB:
-                    cableB_name = nameB  # store one name to identify it
-                cableB_geom_list.append(shape(feat2["geometry"]))
-
-            if not cableB_geom_list:
-                continue
-            cableB_geom = unary_union(cableB_geom_list)
-
-            # If cableB is the same as cableA, skip
-            if cableB_name == cable_name_query:
-                continue
-
-            # Check intersection
-            if cableA_geom.intersects(cableB_geom):
-                inters = cableA_geom.intersection(cableB_geom)
-                if not inters.is_empty:
-                    inter_geojson = json.loads(json.dumps(inters.__geo_interface__))
-
-                    crossings.append({
-                        "cableA": cable_name_query,
-                        "cableB": cableB_name,
-                        "geometry": inter_geojson
-                    })
-
-        return jsonify({"crossings": crossings}), 200
+        return geometry_response("crossings", crossings, encoding)
 
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
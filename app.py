@@ -7,23 +7,39 @@ from flask import Flask, render_template, request, g, jsonify
 from flask_caching import Cache
 from flask_login import LoginManager, login_required, current_user
 from user import User
-from db_utils import get_db, close_db
-from converter_bp import convert_xlsx_to_geojson
+from db_utils import get_db, close_db, DATABASE_FILE
+from json_utils import FastJSONProvider
+from cable_store import init_cable_store
+from zone_layers import preload_zone_layers
+from zone_crossings import init_zone_crossings
+from converter_bp import queue_conversion
+from jobs import init_jobs, start_job_workers
 
 from api_bp import api_bp  # Make sure this import is correct
 from auth import auth_bp  # Existing Blueprint
 from converter_bp import converter_bp  # Existing Blueprint
 from profile_bp import profile_bp  # Existing Blueprint
+from tiles_bp import tiles_bp
 
 load_dotenv()
 
 app = Flask(__name__)
+# jsonify and request.json go through json_utils (orjson when installed)
+app.json = FastJSONProvider(app)
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "fallback_development_key")
 app.config["CACHE_TYPE"] = "simple"
 app.config["CACHE_DEFAULT_TIMEOUT"] = 300
 
 cache = Cache(app)
 
+# Make sure the normalized cable tables exist and legacy rows are migrated
+init_cable_store(DATABASE_FILE)
+init_zone_crossings(DATABASE_FILE)
+preload_zone_layers()
+
+# Conversion jobs table; picks up jobs left over from a restart
+init_jobs(DATABASE_FILE)
+
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = "auth_bp.login"  # Adjust if necessary
@@ -45,6 +61,12 @@ def load_user(user_id):
         )
     return None
 
+@app.before_request
+def start_conversion_workers():
+    # Started by the first request so only the serving process runs them, never
+    # the debug reloader's watcher; a no-op after that (and with JOB_WORKERS=0)
+    start_job_workers(DATABASE_FILE)
+
 @app.teardown_appcontext
 def close_db(exception):
     db = g.pop("db", None)
@@ -59,6 +81,9 @@ app.register_blueprint(profile_bp)
 # Register the API Blueprint with the '/api' prefix
 app.register_blueprint(api_bp)
 
+# Vector tiles for cables and maritime zones
+app.register_blueprint(tiles_bp)
+
 @app.route("/dashboard")
 @login_required
 def dashboard():
@@ -73,16 +98,8 @@ def upload_file():
     uploaded_file = request.files['file']
     if uploaded_file.filename.endswith('.xlsx'):
         try:
-            print("ends with xlsx. starting conversion...")
-            geojson_files = convert_xlsx_to_geojson(uploaded_file) 
-
-            response = {
-                "success": True,
-                "message": "File processed succesfully!",
-                "files": geojson_files,
-            }
-            return jsonify(response)
-
+            print("ends with xlsx. queueing conversion...")
+            return queue_conversion(uploaded_file, "xlsx")
         except Exception as e:
             print(f"ERROR: {e}")
             return jsonify({"success": False, "error": f"File processing failed: {str(e)}"})
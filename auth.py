@@ -33,7 +33,6 @@ def login():
             "SELECT * FROM User WHERE email = ?",
             (form.email.data,)
         ).fetchone()
-        conn.close()
 
         if user_row and check_password_hash(user_row["password"], form.password.data):
             user_obj = User(
@@ -0,0 +1,102 @@
+# benchmarks/coordinate_parse_bench.py
+"""
+Compares row-by-row coordinate parsing (what extract_coordinates_to_df used to
+do through df.apply) with parse_coordinate_series on synthetic
+route position lists, and checks both give the same coordinates.
+
+Run from the project root:
+    python benchmarks/coordinate_parse_bench.py [--rows 200000] [--repeat 3]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from converter_bp import parse_coordinate, parse_coordinate_series  # noqa: E402
+
+
+def make_sheets(rows, seed=0):
+    """
+    One sheet per layout: combined "N12°34.5678'" strings and split degree/minute
+    columns, both with a couple of header rows mixed in like real workbooks.
+    """
+    rng = np.random.default_rng(seed)
+    degrees = rng.integers(0, 90, rows)
+    minutes = np.round(rng.uniform(0, 60, rows), 4)
+    hemispheres = rng.choice(["N", "S"], rows)
+
+    combined = pd.Series(
+        ["Latitude", None] + [f"{h}{d}°{m:07.4f}'" for h, d, m in zip(hemispheres, degrees, minutes)],
+        dtype=object,
+    )
+    split_degrees = pd.Series(["Lat", None] + degrees.tolist(), dtype=object)
+    split_minutes = pd.Series(["Min", None] + minutes.tolist(), dtype=object)
+    return {
+        "combined": (combined, None),
+        "split": (split_degrees, split_minutes),
+    }
+
+
+def legacy_parse_coordinate(degree, minutes=None):
+    # parse_coordinate before it was vectorized: two regex passes per cell
+    try:
+        if isinstance(degree, str) and re.match(r"[NSEW]?\d{1,3}[^\d]*\d{1,2}\.\d+", degree):
+            match = re.match(r"([NSEW])?(\d{1,3})[^\d]*(\d{1,2}\.\d+)", degree, re.IGNORECASE)
+            if match:
+                decimal_degrees = int(match.group(2)) + (float(match.group(3)) / 60)
+                if match.group(1) and match.group(1).upper() in ('S', 'W'):
+                    decimal_degrees = -decimal_degrees
+                return decimal_degrees
+        if degree is not None and minutes is not None:
+            return float(degree) + (float(minutes) / 60)
+    except (ValueError, TypeError):
+        return None
+
+
+def rowwise(parse, degrees, minutes):
+    if minutes is None:
+        return degrees.apply(parse)
+    frame = pd.DataFrame({"deg": degrees, "min": minutes})
+    return frame.apply(lambda row: parse(row["deg"], row["min"]), axis=1)
+
+
+def timed(func, args, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for layout, columns in make_sheets(args.rows).items():
+        reference, _ = timed(rowwise, (legacy_parse_coordinate, *columns), 1)
+        expected = pd.to_numeric(reference, errors="coerce").to_numpy(dtype=float)
+
+        for label, func, func_args in (
+            ("row-wise (legacy)", rowwise, (legacy_parse_coordinate, *columns)),
+            ("row-wise", rowwise, (parse_coordinate, *columns)),
+            ("series", parse_coordinate_series, columns),
+        ):
+            result, elapsed = timed(func, func_args, args.repeat)
+            same = np.array_equal(expected, pd.to_numeric(result, errors="coerce").to_numpy(dtype=float), equal_nan=True)
+            print(
+                f"{layout:9s} {label:18s} {elapsed * 1000:9.1f} ms  "
+                f"{args.rows / elapsed:12.0f} rows/s  identical: {same}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/geodesic_length_bench.py
+"""
+Compares the old crossing length path (new Transformer per request, reproject to
+EPSG:3857, planar length) with the batched geodesic engine in cable_lengths.py.
+
+Run from the project root:
+    python benchmarks/geodesic_length_bench.py [--database UsersDB.db] [--repeat 5]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pyproj
+from shapely.geometry import LineString
+from shapely.ops import transform, unary_union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cable_lengths import GEOD, geodesic_lengths_km  # noqa: E402
+from cable_store import fetch_geometries_by_name, fetch_name_keys, init_cable_store  # noqa: E402
+from zone_layers import ZONE_FILES, get_zone_layer  # noqa: E402
+
+
+def load_workload(database_file):
+    """
+    Intersection parts of every stored cable with every available zone layer,
+    plus east-west lines at increasing latitudes where Web Mercator is worst.
+    """
+    geoms = []
+    init_cable_store(database_file)
+    with sqlite3.connect(database_file) as conn:
+        zone_layers = [layer for layer in map(get_zone_layer, ZONE_FILES.values()) if layer]
+        for name_key in fetch_name_keys(conn):
+            parts = fetch_geometries_by_name(conn, name_key)
+            if not parts:
+                continue
+            cable_geom = unary_union(parts)
+            for zone_layer in zone_layers:
+                geoms.extend(inters for _, inters in zone_layer.intersections(cable_geom))
+
+    for lat in range(0, 85, 5):
+        geoms.append(LineString([(lon, lat) for lon in np.linspace(-10, 10, 50)]))
+    return geoms
+
+
+def legacy_lengths_km(geoms):
+    # What compute_zone_intersections used to do for every request
+    lengths = []
+    for geom in geoms:
+        project_to_mercator = pyproj.Transformer.from_crs(
+            "EPSG:4326", "EPSG:3857", always_xy=True
+        ).transform
+        lengths.append(transform(project_to_mercator, geom).length / 1000.0)
+    return np.array(lengths)
+
+
+def timed(func, geoms, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(geoms)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="UsersDB.db")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    geoms = load_workload(args.database)
+    print(f"Workload: {len(geoms)} geometries")
+
+    reference = np.array([GEOD.geometry_length(g) / 1000.0 for g in geoms])
+    measured = reference > 0
+
+    for label, func in (("mercator (legacy)", legacy_lengths_km), ("geodesic (batched)", geodesic_lengths_km)):
+        lengths, elapsed = timed(func, geoms, args.repeat)
+        rel_err = np.abs(lengths[measured] - reference[measured]) / reference[measured]
+        print(
+            f"{label:20s} {elapsed * 1000:9.2f} ms  {len(geoms) / elapsed:12.0f} geoms/s  "
+            f"rel. error mean {rel_err.mean():.2%} max {rel_err.max():.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/geometry_storage_bench.py
+"""
+Compares storing cable geometries as GeoJSON TEXT (the old cable_features.geometry
+column) with little-endian WKB in a BLOB (cable_features.geometry_wkb): bytes on
+disk and the time to read every geometry back as shapely geometries, as NumPy
+coordinate arrays, as GeoJSON dicts and as GeoJSON text.
+
+Run from the project root:
+    python benchmarks/geometry_storage_bench.py [--database UsersDB.db] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import shapely
+from shapely.geometry import mapping, shape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cable_store import (  # noqa: E402
+    decode_geometries, encode_geometry, feature_list_from, geometry_coordinates, geometry_json,
+)
+
+
+def load_workload(database_file):
+    """
+    Every Feature geometry of every stored document, as GeoJSON dicts.
+    """
+    geometries = []
+    with sqlite3.connect(database_file) as conn:
+        for (feature_collection,) in conn.execute("SELECT feature_collection FROM Cables"):
+            for feature in feature_list_from(json.loads(feature_collection)):
+                if isinstance(feature, dict) and feature.get("geometry"):
+                    geometries.append(feature["geometry"])
+    return geometries
+
+
+def build_table(path, values, column_type):
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE geometries(feature_id INTEGER PRIMARY KEY, geometry {column_type})")
+    conn.executemany("INSERT INTO geometries (geometry) VALUES (?)", ((v,) for v in values))
+    conn.commit()
+    conn.execute("VACUUM")
+    stored = conn.execute("SELECT SUM(LENGTH(geometry)) FROM geometries").fetchone()[0]
+    return conn, stored, os.path.getsize(path)
+
+
+def read_column(conn):
+    return [row[0] for row in conn.execute("SELECT geometry FROM geometries ORDER BY feature_id")]
+
+
+def text_coordinates(text):
+    geometry = json.loads(text)
+    if geometry["type"] == "LineString":
+        return np.asarray(geometry["coordinates"], dtype=float)
+    geom = shape(geometry)
+    return shapely.get_coordinates(geom, include_z=geom.has_z)
+
+
+def timed(func, conn, repeat):
+    # Includes the SELECT, as every reader in the app pays for it too
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(read_column(conn))
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="UsersDB.db")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    geometries = load_workload(args.database)
+    points = sum(len(shapely.get_coordinates(shape(g))) for g in geometries)
+    print(f"Workload: {len(geometries)} geometries, {points} points")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text_conn, text_bytes, text_file = build_table(
+            os.path.join(tmp, "text.db"), [json.dumps(g) for g in geometries], "TEXT"
+        )
+        wkb_conn, wkb_bytes, wkb_file = build_table(
+            os.path.join(tmp, "wkb.db"), [encode_geometry(g) for g in geometries], "BLOB"
+        )
+
+        print(f"{'':<24}{'TEXT':>14}{'WKB':>14}{'ratio':>8}")
+        print(f"{'stored bytes':<24}{text_bytes:>14,}{wkb_bytes:>14,}{wkb_bytes / text_bytes:>8.2f}")
+        print(f"{'file bytes (VACUUM)':<24}{text_file:>14,}{wkb_file:>14,}{wkb_file / text_file:>8.2f}")
+
+        cases = [
+            ("shapely geometries",
+             lambda values: [shape(json.loads(v)) for v in values],
+             decode_geometries),
+            ("NumPy coordinates",
+             lambda values: [text_coordinates(v) for v in values],
+             lambda values: [geometry_coordinates(v) for v in values]),
+            ("GeoJSON dicts",
+             lambda values: [json.loads(v) for v in values],
+             lambda values: [mapping(g) for g in decode_geometries(values)]),
+            ("GeoJSON text",
+             lambda values: values,
+             lambda values: geometry_json(values, precision=None)),
+        ]
+        print(f"\n{'decode (best of %d)' % args.repeat:<24}{'TEXT ms':>14}{'WKB ms':>14}{'speedup':>8}")
+        for label, text_func, wkb_func in cases:
+            text_result, text_time = timed(text_func, text_conn, args.repeat)
+            wkb_result, wkb_time = timed(wkb_func, wkb_conn, args.repeat)
+            print(f"{label:<24}{text_time * 1000:>14.1f}{wkb_time * 1000:>14.1f}{text_time / wkb_time:>7.1f}x")
+
+            if label == "shapely geometries":
+                same = all(a.equals_exact(b, 0) for a, b in zip(text_result, wkb_result))
+            elif label == "NumPy coordinates":
+                same = all(np.array_equal(a, b) for a, b in zip(text_result, wkb_result))
+            else:
+                same = all(
+                    shape(json.loads(a) if isinstance(a, str) else a).equals_exact(
+                        shape(json.loads(b) if isinstance(b, str) else b), 0)
+                    for a, b in zip(text_result, wkb_result)
+                )
+            if not same:
+                print(f"  WARNING: {label} differ between TEXT and WKB")
+
+        text_conn.close()
+        wkb_conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/http_cache_bench.py
+"""
+Bytes on the wire and compression time for the unfiltered /api/cables body (plain
+GeoJSON and ?format=compact) at the gzip levels / brotli qualities http_cache
+uses per request and for precompressed bodies. A 304 answer costs the headers only;
+a precompressed hit costs a dictionary lookup instead of the encode + compress time.
+
+Run from the project root:
+    python benchmarks/http_cache_bench.py [--database UsersDB.db] [--repeat 5]
+"""
+import argparse
+import gzip
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_cache  # noqa: E402
+from cable_store import init_cable_store, row_to_feature  # noqa: E402
+from json_utils import dumps  # noqa: E402
+from wire_format import compact_features, wire_params  # noqa: E402
+
+
+def load_workload(database_file):
+    """
+    (label, body) pairs: the unfiltered /api/cables response as plain GeoJSON and compact.
+    """
+    init_cable_store(database_file)
+    with sqlite3.connect(database_file) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute("SELECT geometry_wkb, properties FROM cable_features ORDER BY feature_id")
+        features = [row_to_feature(row) for row in rows]
+
+    encoding = wire_params({"format": "compact"})
+    return [
+        ("geojson", dumps({"type": "FeatureCollection", "features": features}).encode("utf-8")),
+        ("compact", dumps({
+            "type": "FeatureCollection",
+            "encoding": encoding,
+            "features": compact_features(features, encoding),
+        }).encode("utf-8")),
+    ]
+
+
+def timed(func, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="UsersDB.db")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    codecs = [
+        (f"gzip {level}", lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0))
+        for level in sorted({1, http_cache.GZIP_LEVEL, http_cache.PRECOMPRESSED_GZIP_LEVEL})
+    ]
+    if http_cache.brotli is not None:
+        codecs += [
+            (f"brotli {quality}", lambda data, quality=quality: http_cache.brotli.compress(data, quality=quality))
+            for quality in sorted({http_cache.BROTLI_QUALITY, http_cache.PRECOMPRESSED_BROTLI_QUALITY})
+        ]
+    else:
+        print("brotli is not installed; gzip only")
+
+    for label, body in load_workload(args.database):
+        print(f"\n{label}: {len(body):,} bytes uncompressed")
+        print(f"  {'coding':<14}{'bytes':>12}{'ratio':>8}{'ms':>9}")
+        for name, func in codecs:
+            compressed, elapsed = timed(func, body, args.repeat)
+            print(f"  {name:<14}{len(compressed):>12,}{len(body) / len(compressed):>8.1f}{elapsed * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
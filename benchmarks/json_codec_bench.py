@@ -0,0 +1,109 @@
+# benchmarks/json_codec_bench.py
+"""
+Compares the old GeoJSON encoding (json.dumps / geojson.dumps with indent=2, plain
+json.loads) with json_utils: compact output, coordinates rounded to
+GEOJSON_PRECISION places, on the standard library and on orjson when installed.
+
+The workload is every stored cable as one FeatureCollection plus the zone layer
+files under static/simplified_geojson_files.
+
+Run from the project root:
+    python benchmarks/json_codec_bench.py [--database UsersDB.db] [--repeat 5]
+"""
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import geojson
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_utils  # noqa: E402
+from cable_store import feature_list_from  # noqa: E402
+from zone_layers import ZONE_DIR  # noqa: E402
+
+
+def load_workload(database_file):
+    """
+    (label, GeoJSON dict) pairs: all stored cables, then each zone layer file.
+    """
+    features = []
+    with sqlite3.connect(database_file) as conn:
+        for (feature_collection,) in conn.execute("SELECT feature_collection FROM Cables"):
+            features.extend(feature_list_from(json.loads(feature_collection)))
+    workload = [("cables", {"type": "FeatureCollection", "features": features})]
+
+    for path in sorted(glob.glob(os.path.join(ZONE_DIR, "*.geojson"))):
+        with open(path, "r", encoding="utf-8") as f:
+            workload.append((os.path.basename(path), json.load(f)))
+    return workload
+
+
+def timed(func, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def with_backend(backend, func):
+    # Runs a json_utils call on one backend, whatever is installed
+    def run(data):
+        installed = json_utils.orjson
+        json_utils.orjson = installed if backend == "orjson" else None
+        try:
+            return func(data)
+        finally:
+            json_utils.orjson = installed
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="UsersDB.db")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = ["json"] + (["orjson"] if json_utils.orjson is not None else [])
+    print(f"Backends: {', '.join(backends)}; precision {json_utils.GEOJSON_PRECISION} places")
+
+    for label, data in load_workload(args.database):
+        old_text = json.dumps(data, indent=2)
+        print(f"\n{label}: {len(data.get('features', []))} features, {len(old_text):,} bytes as indent=2")
+
+        encoders = [
+            ("json.dumps indent=2 (old)", lambda d: json.dumps(d, indent=2)),
+            ("geojson.dumps indent=2 (old)", lambda d: geojson.dumps(d, indent=2)),
+        ]
+        for backend in backends:
+            encoders.append((f"dumps compact [{backend}]", with_backend(backend, json_utils.dumps)))
+            encoders.append((f"dumps_geojson [{backend}]", with_backend(backend, json_utils.dumps_geojson)))
+
+        print(f"  {'encode (best of %d)' % args.repeat:<34}{'ms':>9}{'bytes':>13}{'speedup':>9}")
+        base_time = None
+        for name, func in encoders:
+            text, elapsed = timed(func, data, args.repeat)
+            base_time = base_time or elapsed
+            print(f"  {name:<34}{elapsed * 1000:>9.1f}{len(text):>13,}{base_time / elapsed:>8.1f}x")
+
+        compact = json_utils.dumps(data)
+        print(f"  {'decode (best of %d)' % args.repeat:<34}{'ms':>9}")
+        base_time = None
+        decoders = [("json.loads (old)", json.loads)]
+        decoders += [(f"loads [{backend}]", with_backend(backend, json_utils.loads)) for backend in backends]
+        for name, func in decoders:
+            decoded, elapsed = timed(func, compact, args.repeat)
+            base_time = base_time or elapsed
+            print(f"  {name:<34}{elapsed * 1000:>9.1f}{'':>13}{base_time / elapsed:>8.1f}x")
+            if decoded != json.loads(compact):
+                print(f"  WARNING: {name} decoded differently")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/wire_format_bench.py
+"""
+Transfer size of the full cable network from /api/cables as plain GeoJSON and in
+the compact wire format (?format=compact) at a few precisions, with and without
+delta encoding, raw and gzip-compressed, plus the encode time and the largest
+position error after decoding.
+
+Run from the project root:
+    python benchmarks/wire_format_bench.py [--database UsersDB.db] [--repeat 5]
+"""
+import argparse
+import gzip
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cable_store import init_cable_store, row_to_feature  # noqa: E402
+from json_utils import dumps  # noqa: E402
+from wire_format import compact_features, decode_geometry, wire_params  # noqa: E402
+
+
+def load_workload(database_file):
+    """
+    Every stored Feature, as the /api/cables snapshot holds them.
+    """
+    init_cable_store(database_file)
+    with sqlite3.connect(database_file) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute("SELECT geometry_wkb, properties FROM cable_features ORDER BY feature_id")
+        return [row_to_feature(row) for row in rows]
+
+
+def max_error(features, compact, encoding):
+    # Largest absolute lon/lat difference after decoding
+    error = 0.0
+    for feature, packed in zip(features, compact):
+        if not feature["geometry"]:
+            continue
+        decoded = decode_geometry(packed["geometry"], encoding)
+        original = np.asarray(feature["geometry"]["coordinates"], dtype=float)
+        restored = np.asarray(decoded["coordinates"], dtype=float)
+        if original.size:
+            error = max(error, float(np.abs(original[..., :2] - restored[..., :2]).max()))
+    return error
+
+
+def timed(func, features, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(features)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="UsersDB.db")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    features = load_workload(args.database)
+    print(f"Workload: {len(features)} features")
+
+    def plain(feats):
+        return dumps({"type": "FeatureCollection", "features": feats})
+
+    body, elapsed = timed(plain, features, args.repeat)
+    base = len(body.encode("utf-8"))
+    base_gz = len(gzip.compress(body.encode("utf-8")))
+    print(f"{'format':<32}{'bytes':>12}{'ratio':>8}{'gzip':>10}{'ratio':>8}{'encode ms':>11}{'max err':>10}")
+    print(f"{'geojson':<32}{base:>12,}{1:>8.1f}{base_gz:>10,}{1:>8.1f}{elapsed * 1000:>11.1f}{'-':>10}")
+
+    for precision in (7, 6, 5, 4):
+        for delta in ("1", "0"):
+            encoding = wire_params({"format": "compact", "precision": str(precision), "delta": delta})
+
+            def compact(feats):
+                return dumps({
+                    "type": "FeatureCollection",
+                    "encoding": encoding,
+                    "features": compact_features(feats, encoding),
+                })
+
+            body, elapsed = timed(compact, features, args.repeat)
+            size = len(body.encode("utf-8"))
+            size_gz = len(gzip.compress(body.encode("utf-8")))
+            error = max_error(features, compact_features(features, encoding), encoding)
+            label = f"compact precision={precision} delta={delta}"
+            print(f"{label:<32}{size:>12,}{base / size:>8.1f}{size_gz:>10,}{base_gz / size_gz:>8.1f}"
+                  f"{elapsed * 1000:>11.1f}{error:>10.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# cable_cache.py
+import threading
+from shapely.geometry import box, mapping
+from shapely.strtree import STRtree
+from shapely.ops import unary_union
+from cable_store import cable_version, decode_geometries, fetch_level_geometries, row_to_feature
+from json_utils import round_coordinates
+
+# The generation is bumped by every insert route; a snapshot built for an older
+# generation is thrown away on the next read. The counter lives in this process,
+# so each worker process keeps (and invalidates) its own copy. Snapshots also
+# remember the cable_version row they were read at, so writes made by other
+# processes (other workers, cable_import.py) invalidate them as well.
+_lock = threading.Lock()
+_generation = 0
+_snapshot = None
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+class CableSnapshot:
+    """
+    Parsed contents of `cable_features` for one generation: the GeoJSON Features,
+    their shapely geometries and small lookup indexes over the filter columns.
+    """
+
+    def __init__(self, generation, rows, version=None):
+        self.generation = generation
+        self.version = version
+        self.feature_ids = []
+        self.cable_ids = []
+        self.name_keys = []
+        self.features = []
+        self.geometries = []
+        self._indexes = {"name": {}, "status": {}, "condition": {}, "category": {}}
+        self._unions = {}
+        self._levels = {}
+        self._cables = None
+        self._tree = None
+        self._tree_positions = None
+
+        self.geometries = decode_geometries([row["geometry_wkb"] for row in rows])
+        for pos, row in enumerate(rows):
+            self.feature_ids.append(row["feature_id"])
+            self.cable_ids.append(row["cable_id"])
+            self.name_keys.append(row["name_key"])
+            self.features.append(row_to_feature(row, self.geometries[pos]))
+
+            self._indexes["name"].setdefault(row["name_key"], []).append(pos)
+            for column in ("status", "condition", "category"):
+                self._indexes[column].setdefault(row[column], []).append(pos)
+
+    def positions(self, status=None, condition=None, category=None, name=None):
+        """
+        Returns the positions of the Features matching every given filter, in insertion order.
+        """
+        selected = None
+        for column, value in (("status", status), ("condition", condition),
+                              ("category", category), ("name", name)):
+            if value is None or (column != "name" and not value):
+                continue
+            if column == "name":
+                value = value.lower()
+            matches = set(self._indexes[column].get(value, []))
+            selected = matches if selected is None else selected & matches
+
+        if selected is None:
+            return list(range(len(self.features)))
+        return sorted(selected)
+
+    def positions_in_bounds(self, min_lon, min_lat, max_lon, max_lat):
+        """
+        Returns the positions of the Features whose bounding boxes overlap the given box,
+        using an STRtree built once per snapshot.
+        """
+        if self._tree is None:
+            self._tree_positions = [pos for pos, geom in enumerate(self.geometries) if geom is not None]
+            self._tree = STRtree([self.geometries[pos] for pos in self._tree_positions])
+        hits = self._tree.query(box(min_lon, min_lat, max_lon, max_lat))
+        return sorted(self._tree_positions[idx] for idx in hits)
+
+    def level(self, level, get_db):
+        """
+        Returns (features, geometries) at one pyramid level, aligned with the snapshot
+        positions. Level 0 is the stored geometry; other levels are read from
+        `cable_feature_lods` with `get_db()` once per snapshot.
+        """
+        if level == 0:
+            return self.features, self.geometries
+
+        if level not in self._levels:
+            conn = get_db()
+            try:
+                lods = fetch_level_geometries(conn, level)
+            finally:
+                conn.close()
+
+            features, geometries = [], []
+            for pos, feature_id in enumerate(self.feature_ids):
+                geometry = lods.get(feature_id)
+                if geometry is None:
+                    features.append(self.features[pos])
+                    geometries.append(self.geometries[pos])
+                else:
+                    features.append({**self.features[pos], "geometry": round_coordinates(mapping(geometry))})
+                    geometries.append(geometry)
+            self._levels[level] = (features, geometries)
+        return self._levels[level]
+
+    def filter_features(self, status=None, condition=None, category=None, name=None):
+        return [self.features[pos] for pos in self.positions(status, condition, category, name)]
+
+    def union_for_name(self, name):
+        """
+        Returns the unary_union of every geometry named `name` (case-insensitive),
+        or None if there is no such cable. Computed once per snapshot.
+        """
+        key = name.lower()
+        if key not in self._unions:
+            geoms = [self.geometries[pos] for pos in self._indexes["name"].get(key, [])
+                     if self.geometries[pos] is not None]
+            self._unions[key] = unary_union(geoms) if geoms else None
+        return self._unions[key]
+
+    def cables(self):
+        """
+        Groups geometries by cable_id.
+
+        Returns:
+            list[tuple]: (cable_id, name, geometries) per cable, where `name` is the first
+                         non-empty lower-cased Feature name of that cable (or None).
+        """
+        if self._cables is None:
+            names, geometries = {}, {}
+            for pos, cable_id in enumerate(self.cable_ids):
+                geometries.setdefault(cable_id, [])
+                if not names.get(cable_id) and self.name_keys[pos]:
+                    names[cable_id] = self.name_keys[pos]
+                if self.geometries[pos] is not None:
+                    geometries[cable_id].append(self.geometries[pos])
+            self._cables = {
+                cable_id: (names.get(cable_id), geoms) for cable_id, geoms in geometries.items()
+            }
+        return [(cable_id, name, geoms) for cable_id, (name, geoms) in self._cables.items()]
+
+    def cable_name(self, cable_id):
+        self.cables()
+        return self._cables.get(cable_id, (None, []))[0]
+
+    def union_for_cable(self, cable_id):
+        """
+        Returns the unary_union of one cable's geometries, or None if it has none.
+        """
+        self.cables()
+        key = ("cable", cable_id)
+        if key not in self._unions:
+            geoms = self._cables.get(cable_id, (None, []))[1]
+            self._unions[key] = unary_union(geoms) if geoms else None
+        return self._unions[key]
+
+
+def bump_generation():
+    """
+    Marks every cached snapshot as stale. Call after any write to the cable tables.
+    """
+    global _generation
+    with _lock:
+        _generation += 1
+        _stats["invalidations"] += 1
+
+
+def current_generation():
+    return _generation
+
+
+def get_snapshot(get_db):
+    """
+    Returns the CableSnapshot for the current generation and cable_version,
+    loading it with `get_db()` only when the cached one is missing or stale.
+    """
+    global _snapshot
+    conn = get_db()
+    try:
+        version, _ = cable_version(conn)
+    finally:
+        conn.close()
+
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.generation == _generation and snapshot.version == version:
+        _stats["hits"] += 1
+        return snapshot
+
+    with _lock:
+        # Another thread may have rebuilt it while we waited for the lock
+        if _snapshot is not None and _snapshot.generation == _generation and _snapshot.version == version:
+            _stats["hits"] += 1
+            return _snapshot
+
+        generation = _generation
+        conn = get_db()
+        try:
+            # Read before the rows: a write landing in between only makes the
+            # next call rebuild again, never keeps newer rows under an old version
+            version, _ = cable_version(conn)
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT feature_id, cable_id, name_key, status, condition, category, geometry_wkb, properties
+                FROM cable_features
+                ORDER BY feature_id
+            """)
+            rows = cur.fetchall()
+        finally:
+            conn.close()
+
+        _snapshot = CableSnapshot(generation, rows, version)
+        _stats["misses"] += 1
+        return _snapshot
+
+
+def cache_stats():
+    """
+    Returns hit/miss/invalidation counters plus what is currently cached.
+    """
+    snapshot = _snapshot
+    return {
+        **_stats,
+        "generation": _generation,
+        "cached_generation": snapshot.generation if snapshot else None,
+        "cached_version": snapshot.version if snapshot else None,
+        "cached_features": len(snapshot.features) if snapshot else 0,
+    }
@@ -0,0 +1,253 @@
+# cable_import.py
+import argparse
+import glob
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from cable_store import (
+    NAME_KEY, as_feature_collection, create_cable_tables, feature_list_from, fetch_name_keys, insert_feature_collections,
+    validate_feature_collection,
+)
+from db_utils import DATABASE_FILE
+from zone_crossings import compute_crossings_parallel, create_crossing_tables, write_crossings
+from json_utils import dumps, load, loads
+
+IMPORT_EXTENSIONS = (".geojson", ".json", ".kml", ".kmz", ".xlsx")
+# Cables inserted per transaction
+BATCH_SIZE = 200
+
+
+def create_import_tables(cursor):
+    """
+    Creates `cable_imports`, which records the content hash of every imported
+    file and the cables it produced, so importing the same file again is a no-op.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cable_imports(
+            content_hash TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            cable_ids TEXT NOT NULL,
+            imported_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    """)
+
+
+def expand_sources(sources):
+    """
+    Expands directories (walked recursively), glob patterns and plain paths into
+    the sorted list of importable files, without duplicates.
+    """
+    paths = set()
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, filenames in os.walk(source):
+                paths.update(os.path.join(root, name) for name in filenames)
+        elif glob.has_magic(source):
+            paths.update(glob.glob(source, recursive=True))
+        else:
+            paths.add(source)
+    return sorted(
+        os.path.normpath(path) for path in paths
+        if os.path.isfile(path) and path.lower().endswith(IMPORT_EXTENSIONS)
+    )
+
+
+def file_hash(path):
+    """
+    SHA-256 of a file's bytes, read in 1 MB blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_source(path, group_by=None):
+    """
+    Reads one file into FeatureCollections, one per cable. Runs in the worker processes.
+
+    GeoJSON files are kept whole (a bare list of Features or a single Feature is
+    wrapped in a FeatureCollection), KML/KMZ files give one collection per cable
+    group and XLSX workbooks one per sheet with coordinates, named after the
+    file (and the sheet, for workbooks with several) since sheets carry no name.
+
+    Returns:
+        tuple: (collections, error) where error is None or a message for this file.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext in (".geojson", ".json"):
+            with open(path, "r", encoding="utf-8") as f:
+                collections = [as_feature_collection(load(f))]
+
+        elif ext in (".kml", ".kmz"):
+            from kml_to_geojson_functions import process_kml_file
+            collections = [
+                loads(geojson_str)
+                for geojson_str in process_kml_file(path, group_by=group_by, per_cable=True).values()
+            ]
+
+        else:
+            from converter_bp import process_excel_to_geojson
+            stem = os.path.splitext(os.path.basename(path))[0]
+            with tempfile.TemporaryDirectory() as save_dir:
+                entries = process_excel_to_geojson(path, save_dir, workers=1)
+                collections = []
+                for sheet_name, entry in entries.items():
+                    with open(entry["file_path"], "r", encoding="utf-8") as f:
+                        collection = load(f)
+                    # Without a name every sheet would be stored as the same unnamed cable
+                    name = stem if len(entries) == 1 else f"{stem} {sheet_name}"
+                    for feature in feature_list_from(collection):
+                        properties = feature.setdefault("properties", {})
+                        if not properties.get(NAME_KEY):
+                            properties[NAME_KEY] = name
+                    collections.append(collection)
+
+        for collection in collections:
+            validate_feature_collection(collection)
+        return collections, None
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}"
+
+
+def _parse_job(args):
+    return parse_source(*args)
+
+
+def _insert_batch(conn, batch):
+    # One transaction per batch: the cables, their features and the import records
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        cable_ids = insert_feature_collections(conn, [collection for _, _, collection in batch])
+        sources = {}
+        for (content_hash, path, _), cable_id in zip(batch, cable_ids):
+            sources.setdefault(content_hash, (path, []))[1].append(cable_id)
+        conn.executemany(
+            "INSERT OR REPLACE INTO cable_imports (content_hash, source, cable_ids) VALUES (?, ?, ?)",
+            [(content_hash, path, dumps(ids)) for content_hash, (path, ids) in sources.items()]
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return cable_ids
+
+
+def import_cables(sources, database_file=DATABASE_FILE, workers=None, batch_size=BATCH_SIZE,
+                  group_by=None, force=False, crossings=True):
+    """
+    Imports every KML/KMZ, XLSX and GeoJSON file under `sources` as cables.
+
+    Files are hashed first; files already imported (or repeated in this run) are
+    skipped unless `force` is set. The rest are parsed in a process pool and
+    inserted in transactions of `batch_size` cables. The zone crossings of every
+    new cable name are then computed in the same pool and written at once, unless
+    `crossings` is False (rebuild them later with `python zone_crossings.py`).
+
+    Returns:
+        dict: Counts of files, skipped files, errors, cables and features, plus
+              the new cable_ids and the elapsed time.
+    """
+    start = time.perf_counter()
+    paths = expand_sources(sources)
+
+    conn = sqlite3.connect(database_file, timeout=30)
+    cursor = conn.cursor()
+    create_cable_tables(cursor)
+    create_crossing_tables(cursor)
+    create_import_tables(cursor)
+    conn.commit()
+
+    imported = {row[0] for row in conn.execute("SELECT content_hash FROM cable_imports")}
+    pending = []
+    seen = set()
+    skipped = 0
+    for path in paths:
+        content_hash = file_hash(path)
+        if content_hash in seen or (content_hash in imported and not force):
+            skipped += 1
+            continue
+        seen.add(content_hash)
+        pending.append((content_hash, path))
+    print(f"{len(paths)} files found, {skipped} already imported or duplicated, {len(pending)} to import.")
+
+    cable_ids = []
+    features = 0
+    errors = 0
+    batch = []
+    parse_args = [(path, group_by) for _, path in pending]
+    pool = None
+    try:
+        if workers == 1:
+            results = map(_parse_job, parse_args)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            results = pool.map(_parse_job, parse_args)
+
+        for (content_hash, path), (collections, error) in zip(pending, results):
+            if error:
+                errors += 1
+                print(f"ERROR: {path}: {error}")
+                continue
+            for collection in collections:
+                batch.append((content_hash, path, collection))
+                features += len(feature_list_from(collection))
+            if len(batch) >= batch_size:
+                cable_ids.extend(_insert_batch(conn, batch))
+                batch = []
+        if batch:
+            cable_ids.extend(_insert_batch(conn, batch))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    insert_elapsed = time.perf_counter() - start
+    if cable_ids and crossings:
+        # Materialize the zone crossings of every new cable name in one go
+        name_keys = sorted({
+            name_key for cable_id in cable_ids for name_key in fetch_name_keys(conn, cable_id)
+        })
+        rows = compute_crossings_parallel(database_file, name_keys, workers=workers)
+        write_crossings(conn, rows, name_keys)
+        conn.commit()
+        print(f"Computed {len(rows)} zone crossings for {len(name_keys)} cable names.")
+    conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Imported {len(cable_ids)} cables ({features} features) from {len(pending) - errors} files "
+          f"in {elapsed:.2f}s: {features / insert_elapsed if insert_elapsed else 0:.0f} features/s "
+          f"parsed and inserted, {errors} files failed.")
+    return {
+        "files": len(paths),
+        "skipped": skipped,
+        "errors": errors,
+        "cables": len(cable_ids),
+        "features": features,
+        "cable_ids": cable_ids,
+        "elapsed_s": round(elapsed, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Import KML/KMZ, XLSX and GeoJSON cable files into the database."
+    )
+    parser.add_argument("sources", nargs="+", help="Files, directories or glob patterns (quote them)")
+    parser.add_argument("--database", default=DATABASE_FILE, help="SQLite database file")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Cables per transaction")
+    parser.add_argument("--group-by", default=None,
+                        help="KML cable grouping: a regex on placemark names or property:<key>")
+    parser.add_argument("--force", action="store_true", help="Import files even if already imported")
+    parser.add_argument("--skip-crossings", action="store_true",
+                        help="Do not compute zone crossings (run zone_crossings.py afterwards)")
+    args = parser.parse_args()
+
+    import_cables(args.sources, args.database, args.workers, args.batch_size, args.group_by,
+                  args.force, not args.skip_crossings)
+    print("A running server picks up the new cables on its next request (cable_version changed).")
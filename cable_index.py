@@ -0,0 +1,128 @@
+# cable_index.py
+from json_utils import round_coordinates
+
+
+def nearby_cable_ids(conn, bounds_list):
+    """
+    Looks up the cables with at least one feature whose bounding box overlaps
+    any of the given boxes, using the `cable_features_rtree` index.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+        bounds_list (list[tuple]): (min_lon, min_lat, max_lon, max_lat) boxes.
+
+    Returns:
+        list[int]: Matching cable_ids in ascending order.
+    """
+    cur = conn.cursor()
+    cable_ids = set()
+    for min_lon, min_lat, max_lon, max_lat in bounds_list:
+        cur.execute("""
+            SELECT DISTINCT f.cable_id
+            FROM cable_features_rtree r
+            JOIN cable_features f ON f.feature_id = r.feature_id
+            WHERE r.max_lon >= ? AND r.min_lon <= ?
+              AND r.max_lat >= ? AND r.min_lat <= ?
+        """, (min_lon, max_lon, min_lat, max_lat))
+        cable_ids.update(row[0] for row in cur.fetchall())
+    return sorted(cable_ids)
+
+
+def candidate_cable_pairs(conn):
+    """
+    Returns every (cable_id_a, cable_id_b) pair, a < b, where some feature of A
+    has a bounding box overlapping some feature of B. Joins the R*Tree with
+    itself so each feature is only compared against its spatial neighbours.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT DISTINCT fa.cable_id, fb.cable_id
+        FROM cable_features_rtree a
+        JOIN cable_features_rtree b
+          ON b.max_lon >= a.min_lon AND b.min_lon <= a.max_lon
+         AND b.max_lat >= a.min_lat AND b.min_lat <= a.max_lat
+        JOIN cable_features fa ON fa.feature_id = a.feature_id
+        JOIN cable_features fb ON fb.feature_id = b.feature_id
+        WHERE fa.cable_id < fb.cable_id
+        ORDER BY fa.cable_id, fb.cable_id
+    """)
+    return [(row[0], row[1]) for row in cur.fetchall()]
+
+
+def _geojson(geom):
+    return round_coordinates(geom.__geo_interface__)
+
+
+def cable_crossings(conn, snapshot, cable_name):
+    """
+    Finds where the cable named `cable_name` crosses any other cable.
+
+    Only cables returned by the R*Tree for the bounding boxes of the requested
+    cable's features are intersected exactly.
+
+    Returns:
+        list[dict] | None: { cableA, cableB, geometry } per crossing cable,
+                           or None if `cable_name` is not stored.
+    """
+    cable_name = cable_name.lower()
+    cableA_geom = snapshot.union_for_name(cable_name)
+    if cableA_geom is None:
+        return None
+
+    bounds_list = [
+        snapshot.geometries[pos].bounds
+        for pos in snapshot.positions(name=cable_name)
+        if snapshot.geometries[pos] is not None
+    ]
+
+    crossings = []
+    for cable_id in nearby_cable_ids(conn, bounds_list):
+        # If cableB is the same as cableA, skip
+        cableB_name = snapshot.cable_name(cable_id)
+        if cableB_name == cable_name:
+            continue
+
+        cableB_geom = snapshot.union_for_cable(cable_id)
+        if cableB_geom is None or not cableA_geom.intersects(cableB_geom):
+            continue
+
+        inters = cableA_geom.intersection(cableB_geom)
+        if not inters.is_empty:
+            crossings.append({
+                "cableA": cable_name,
+                "cableB": cableB_name,
+                "geometry": _geojson(inters)
+            })
+    return crossings
+
+
+def network_crossings(conn, snapshot):
+    """
+    Finds every pairwise crossing between stored cables in one pass.
+    Pairs that share a name (one cable uploaded in several parts) are skipped.
+
+    Returns:
+        list[dict]: { cable_id_a, cable_id_b, cableA, cableB, geometry } per crossing pair.
+    """
+    crossings = []
+    for cable_id_a, cable_id_b in candidate_cable_pairs(conn):
+        name_a = snapshot.cable_name(cable_id_a)
+        name_b = snapshot.cable_name(cable_id_b)
+        if name_a and name_a == name_b:
+            continue
+
+        geom_a = snapshot.union_for_cable(cable_id_a)
+        geom_b = snapshot.union_for_cable(cable_id_b)
+        if geom_a is None or geom_b is None or not geom_a.intersects(geom_b):
+            continue
+
+        inters = geom_a.intersection(geom_b)
+        if not inters.is_empty:
+            crossings.append({
+                "cable_id_a": cable_id_a,
+                "cable_id_b": cable_id_b,
+                "cableA": name_a,
+                "cableB": name_b,
+                "geometry": _geojson(inters)
+            })
+    return crossings
@@ -0,0 +1,71 @@
+# cable_lengths.py
+from functools import lru_cache
+import numpy as np
+import pyproj
+import shapely
+
+# WGS84 ellipsoid used for every length we report
+GEOD = pyproj.Geod(ellps="WGS84")
+
+# shapely type ids of Multi* geometries / GeometryCollection, and of measured lines
+_COLLECTION_TYPES = [4, 5, 6, 7]
+_LINE_TYPES = [1, 2]
+
+
+@lru_cache(maxsize=None)
+def get_transformer(src_crs, dst_crs):
+    """
+    Returns a cached always_xy Transformer; building one costs far more than using it.
+    """
+    return pyproj.Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+
+
+def _flatten(geoms):
+    """
+    Explodes Multi* geometries and (nested) GeometryCollections into single parts.
+
+    Returns:
+        tuple: (parts, index) where index[i] is the input position parts[i] came from.
+    """
+    parts = np.asarray(geoms, dtype=object)
+    index = np.arange(len(parts))
+    while len(parts) and np.isin(shapely.get_type_id(parts), _COLLECTION_TYPES).any():
+        parts, part_index = shapely.get_parts(parts, return_index=True)
+        index = index[part_index]
+    return parts, index
+
+
+def geodesic_lengths_km(geoms):
+    """
+    Computes the geodesic (WGS84) length of many lon/lat geometries in one pass.
+
+    All coordinates are gathered into flat NumPy arrays, every segment is measured
+    with a single vectorized `Geod.inv` call and the segment lengths are summed back
+    per input geometry. Only line parts are measured; points and polygons count as 0.
+
+    Args:
+        geoms (list[shapely.Geometry]): Geometries in EPSG:4326.
+
+    Returns:
+        np.ndarray: Length in kilometres of each input geometry.
+    """
+    lengths = np.zeros(len(geoms))
+    if not len(geoms):
+        return lengths
+
+    parts, geom_index = _flatten(geoms)
+    is_line = np.isin(shapely.get_type_id(parts), _LINE_TYPES)
+    parts, geom_index = parts[is_line], geom_index[is_line]
+    coords, part_index = shapely.get_coordinates(parts, return_index=True)
+    if len(coords) < 2:
+        return lengths
+
+    # Segments only join consecutive vertices of the same part
+    same_part = part_index[:-1] == part_index[1:]
+    lon, lat = coords[:, 0], coords[:, 1]
+    _, _, dist_m = GEOD.inv(lon[:-1][same_part], lat[:-1][same_part],
+                            lon[1:][same_part], lat[1:][same_part])
+
+    seg_geom = geom_index[part_index[:-1][same_part]]
+    lengths += np.bincount(seg_geom, weights=dist_m, minlength=len(geoms))
+    return lengths / 1000.0
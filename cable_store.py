@@ -0,0 +1,718 @@
+# cable_store.py
+import json
+import sqlite3
+from datetime import datetime, timezone
+import numpy as np
+import shapely
+from shapely.geometry import mapping, shape
+from geometry_pyramid import simplify_levels
+from json_utils import GEOJSON_PRECISION, dumps, loads, round_coordinates
+
+# Property keys that get their own indexed column in `cable_features`
+NAME_KEY = "[Feature Name]: Name"
+STATUS_KEY = "Status"
+CONDITION_KEY = "Condition"
+CATEGORY_KEY = "Category of Cable"
+DATE_START_KEY = "[Fixed Date Range]: Date Start"
+DATE_END_KEY = "[Fixed Date Range]: Date End"
+
+# Every property of the cable Feature schema (see converter_bp.create_geojson);
+# the names ?fields=... may ask for
+FEATURE_PROPERTIES = (
+    "Buried Depth", "Category of Cable", "Condition",
+    "[Feature Name]: Language", "[Feature Name]: Name", "[Feature Name]: Name Usage",
+    "[Fixed Date Range]: Date End", "[Fixed Date Range]: Date Start",
+    "Status", "Scale Minimum",
+    "[Information]: File Locator", "[Information]: File Reference", "[Information]: Headline",
+    "[Information]: Language", "[Information]: Text",
+    "Feature Association: Component of", "Feature Association: Updates",
+    "Feature Association: Positions", "Feature Association: Provides Information",
+)
+
+# Largest feature_id SQLite can store, the upper bound of pagination cursors
+MAX_FEATURE_ID = 2 ** 63 - 1
+
+# Accepted spellings of the fixed date range; stored as ISO YYYY-MM-DD
+DATE_FORMATS = ("%Y-%m-%d", "%Y%m%d", "%Y-%m", "%Y", "%d/%m/%Y")
+
+GEOMETRY_TYPES = {
+    "Point", "MultiPoint", "LineString", "MultiLineString",
+    "Polygon", "MultiPolygon", "GeometryCollection",
+}
+
+INSERT_FEATURE_SQL = """
+    INSERT INTO cable_features
+        (cable_id, feature_index, name, name_key, status, condition, category,
+         date_start, date_end, geometry_wkb, properties)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Geometries are stored as little-endian WKB; shapely sets this bit in the type
+# code of geometries with a depth (Z) coordinate
+WKB_LINESTRING = 2
+WKB_Z_FLAG = 0x80000000
+# Rows turned into GeoJSON text per vectorized shapely call in iter_feature_json
+STREAM_BATCH_ROWS = 500
+
+
+def create_cable_tables(cursor):
+    """
+    Creates the normalized `cable_features` table and its indexes.
+
+    `Cables` keeps one row per uploaded document (the original FeatureCollection
+    is kept as-is), while every Feature of that document becomes one row in
+    `cable_features` with the commonly filtered properties pulled out into
+    indexed columns.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Cables(
+            cable_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            feature_collection TEXT NOT NULL
+        )
+    """)
+
+    # name_key is the lower-cased name used by the ?cable=... lookups
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cable_features(
+            feature_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cable_id INTEGER NOT NULL REFERENCES Cables(cable_id),
+            feature_index INTEGER NOT NULL,
+            name TEXT,
+            name_key TEXT NOT NULL,
+            status TEXT,
+            condition TEXT,
+            category TEXT,
+            date_start TEXT,
+            date_end TEXT,
+            geometry_wkb BLOB,
+            properties TEXT NOT NULL
+        )
+    """)
+    _add_date_columns(cursor)
+    _convert_geometry_columns(cursor)
+
+    # One row, bumped by the triggers below on every change to cable_features made by
+    # any process (the app, the bulk importer); API responses derive their ETag and
+    # Last-Modified from it
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cable_version(
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO cable_version (id, version, updated_at) VALUES (1, 1, datetime('now'))")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS cable_features_version_{event.lower()}
+            AFTER {event} ON cable_features
+            BEGIN
+                UPDATE cable_version SET version = version + 1, updated_at = datetime('now') WHERE id = 1;
+            END
+        """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cable_features_cable ON cable_features(cable_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cable_features_name ON cable_features(name_key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cable_features_status ON cable_features(status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cable_features_condition ON cable_features(condition)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cable_features_category ON cable_features(category)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cable_features_date_start ON cable_features(date_start)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cable_features_date_end ON cable_features(date_end)")
+
+    # Bounding box of every feature, used to find nearby cables without a full scan
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS cable_features_rtree USING rtree(
+            feature_id,
+            min_lon, max_lon,
+            min_lat, max_lat
+        )
+    """)
+
+    # Simplified geometry of every feature per pyramid level (level 0 is cable_features.geometry_wkb)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cable_feature_lods(
+            feature_id INTEGER NOT NULL REFERENCES cable_features(feature_id),
+            level INTEGER NOT NULL,
+            geometry_wkb BLOB NOT NULL,
+            PRIMARY KEY (feature_id, level)
+        )
+    """)
+
+    # Full-text index over feature names; rowid is the feature_id
+    cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS cable_features_fts USING fts5(name)")
+
+
+def _add_date_columns(cursor):
+    """
+    Adds the date_start / date_end columns to a `cable_features` table created
+    before they existed, filling them from the stored properties.
+    """
+    cursor.execute("PRAGMA table_info(cable_features)")
+    if "date_start" in [row[1] for row in cursor.fetchall()]:
+        return
+
+    cursor.execute("ALTER TABLE cable_features ADD COLUMN date_start TEXT")
+    cursor.execute("ALTER TABLE cable_features ADD COLUMN date_end TEXT")
+    cursor.execute("SELECT feature_id, properties FROM cable_features")
+    updates = []
+    for feature_id, properties in cursor.fetchall():
+        props = loads(properties)
+        updates.append((
+            normalize_date(props.get(DATE_START_KEY)),
+            normalize_date(props.get(DATE_END_KEY)),
+            feature_id,
+        ))
+    cursor.executemany(
+        "UPDATE cable_features SET date_start = ?, date_end = ? WHERE feature_id = ?",
+        updates
+    )
+
+
+def _convert_geometry_columns(cursor):
+    """
+    Moves the GeoJSON text `geometry` column of a `cable_features` table created
+    before geometries were stored as WKB into `geometry_wkb`. The old text
+    `cable_feature_lods` table is dropped; index_feature_lods rebuilds it.
+    """
+    cursor.execute("PRAGMA table_info(cable_features)")
+    columns = [row[1] for row in cursor.fetchall()]
+    if "geometry" in columns:
+        if "geometry_wkb" not in columns:
+            cursor.execute("ALTER TABLE cable_features ADD COLUMN geometry_wkb BLOB")
+        cursor.execute("SELECT feature_id, geometry FROM cable_features WHERE geometry IS NOT NULL")
+        updates = [
+            (encode_geometry(loads(geometry)), feature_id)
+            for feature_id, geometry in cursor.fetchall()
+        ]
+        cursor.executemany("UPDATE cable_features SET geometry_wkb = ? WHERE feature_id = ?", updates)
+        cursor.execute("ALTER TABLE cable_features DROP COLUMN geometry")
+        print(f"Converted {len(updates)} feature geometries to WKB.")
+
+    cursor.execute("PRAGMA table_info(cable_feature_lods)")
+    if "geometry" in [row[1] for row in cursor.fetchall()]:
+        cursor.execute("DROP TABLE cable_feature_lods")
+
+
+def encode_geometry(geometry):
+    """
+    Encodes a GeoJSON geometry dict (or a shapely geometry) as little-endian WKB,
+    keeping the depth coordinate. Returns None for a missing geometry.
+    """
+    if isinstance(geometry, dict):
+        geometry = shape(geometry) if geometry else None
+    if geometry is None:
+        return None
+    return shapely.to_wkb(geometry, byte_order=1)
+
+
+def decode_geometries(blobs):
+    """
+    Decodes stored WKB values into shapely geometries with one vectorized
+    from_wkb call. None values stay None.
+    """
+    return list(shapely.from_wkb(np.array(blobs, dtype=object)))
+
+
+def geometry_coordinates(blob):
+    """
+    Returns the coordinates of a stored WKB geometry as an (n, 2) or (n, 3)
+    float64 array. LineStrings (nearly every cable) are read in place with
+    np.frombuffer, so the array is a read-only view over the BLOB; other types
+    go through shapely.
+    """
+    geom_type = int.from_bytes(blob[1:5], "little")
+    if blob[0] == 1 and geom_type & ~WKB_Z_FLAG == WKB_LINESTRING:
+        dims = 3 if geom_type & WKB_Z_FLAG else 2
+        return np.frombuffer(blob, dtype="<f8", offset=9).reshape(-1, dims)
+    geom = shapely.from_wkb(blob)
+    return shapely.get_coordinates(geom, include_z=geom.has_z)
+
+
+def geometry_json(blobs, precision=GEOJSON_PRECISION):
+    """
+    Converts stored WKB values into GeoJSON geometry text with coordinates
+    rounded to `precision` places, using vectorized shapely calls. None values
+    stay None.
+    """
+    geoms = shapely.from_wkb(np.array(blobs, dtype=object))
+    if precision is not None:
+        has_z = shapely.has_z(geoms)
+        for mask, include_z in ((has_z, True), (~has_z, False)):
+            if mask.any():
+                coords = shapely.get_coordinates(geoms[mask], include_z=include_z)
+                geoms[mask] = shapely.set_coordinates(geoms[mask], np.round(coords, precision))
+    return list(shapely.to_geojson(geoms))
+
+
+def normalize_date(value):
+    """
+    Parses a fixed date range value into ISO format.
+
+    Returns:
+        str | None: "YYYY-MM-DD", or None if the value is empty or not a date.
+    """
+    if value is None:
+        return None
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def feature_list_from(data):
+    """
+    Returns the list of Features from a stored document.
+    Older rows hold a bare list of Features, newer ones a full FeatureCollection.
+    """
+    if isinstance(data, dict):
+        return data.get("features", [])
+    if isinstance(data, list):
+        return data
+    return []
+
+
+def as_feature_collection(data):
+    """
+    Wraps a bare list of Features or a single Feature read from a GeoJSON file in
+    a FeatureCollection; anything else (a FeatureCollection with its top-level
+    members) is returned unchanged.
+    """
+    if isinstance(data, list):
+        return {"type": "FeatureCollection", "features": data}
+    if isinstance(data, dict) and data.get("type") == "Feature":
+        return {"type": "FeatureCollection", "features": [data]}
+    return data
+
+
+def validate_feature_collection(data):
+    """
+    Checks an uploaded document before it is stored.
+
+    Raises:
+        ValueError: If it is neither a FeatureCollection nor a list of Features,
+                    or a Feature has no valid GeoJSON geometry.
+    """
+    if isinstance(data, dict):
+        if data.get("type") != "FeatureCollection" or not isinstance(data.get("features"), list):
+            raise ValueError("Expected a GeoJSON FeatureCollection.")
+    elif not isinstance(data, list):
+        raise ValueError("Expected a GeoJSON FeatureCollection or a list of Features.")
+
+    features = feature_list_from(data)
+    if not features:
+        raise ValueError("The FeatureCollection has no features.")
+
+    for idx, feature in enumerate(features):
+        if not isinstance(feature, dict) or feature.get("type") != "Feature":
+            raise ValueError(f"Feature {idx} is not a GeoJSON Feature.")
+        geometry = feature.get("geometry")
+        if not isinstance(geometry, dict) or geometry.get("type") not in GEOMETRY_TYPES:
+            raise ValueError(f"Feature {idx} has no valid geometry.")
+        members = "geometries" if geometry["type"] == "GeometryCollection" else "coordinates"
+        if not isinstance(geometry.get(members), list):
+            raise ValueError(f"Feature {idx} geometry has no {members}.")
+        if not isinstance(feature.get("properties") or {}, dict):
+            raise ValueError(f"Feature {idx} properties must be an object.")
+
+
+def _feature_row(cable_id, feature_index, feature):
+    props = feature.get("properties") or {}
+    geometry = feature.get("geometry")
+    name = props.get(NAME_KEY)
+    return (
+        cable_id,
+        feature_index,
+        name,
+        (name or "").lower(),
+        props.get(STATUS_KEY),
+        props.get(CONDITION_KEY),
+        props.get(CATEGORY_KEY),
+        normalize_date(props.get(DATE_START_KEY)),
+        normalize_date(props.get(DATE_END_KEY)),
+        encode_geometry(geometry),
+        dumps(props),
+    )
+
+
+def insert_features(cursor, cable_id, data):
+    """
+    Writes one `cable_features` row per Feature of `data` for an existing cable_id.
+    """
+    rows = [
+        _feature_row(cable_id, idx, feat)
+        for idx, feat in enumerate(feature_list_from(data))
+    ]
+    cursor.executemany(INSERT_FEATURE_SQL, rows)
+    index_feature_bounds(cursor, cable_id)
+    index_feature_lods(cursor, cable_id)
+    index_feature_names(cursor, cable_id)
+
+
+def index_feature_bounds(cursor, cable_id=None):
+    """
+    Adds the bounding boxes of features missing from `cable_features_rtree`,
+    either for one cable_id or (when None) for the whole table.
+    """
+    sql = """
+        SELECT f.feature_id, f.geometry_wkb FROM cable_features f
+        WHERE f.geometry_wkb IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM cable_features_rtree r WHERE r.feature_id = f.feature_id)
+    """
+    params = ()
+    if cable_id is not None:
+        sql += " AND f.cable_id = ?"
+        params = (cable_id,)
+    cursor.execute(sql, params)
+
+    boxes = []
+    for feature_id, geometry in cursor.fetchall():
+        coords = geometry_coordinates(geometry)
+        if not len(coords):
+            continue
+        min_lon, min_lat = coords[:, :2].min(axis=0)
+        max_lon, max_lat = coords[:, :2].max(axis=0)
+        boxes.append((feature_id, float(min_lon), float(max_lon), float(min_lat), float(max_lat)))
+
+    cursor.executemany("""
+        INSERT INTO cable_features_rtree (feature_id, min_lon, max_lon, min_lat, max_lat)
+        VALUES (?, ?, ?, ?, ?)
+    """, boxes)
+
+
+def index_feature_lods(cursor, cable_id=None):
+    """
+    Stores the simplified pyramid levels of features missing from `cable_feature_lods`,
+    either for one cable_id or (when None) for the whole table.
+    """
+    sql = """
+        SELECT f.feature_id, f.geometry_wkb FROM cable_features f
+        WHERE f.geometry_wkb IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM cable_feature_lods l WHERE l.feature_id = f.feature_id)
+    """
+    params = ()
+    if cable_id is not None:
+        sql += " AND f.cable_id = ?"
+        params = (cable_id,)
+    cursor.execute(sql, params)
+
+    rows = cursor.fetchall()
+    lods = []
+    for (feature_id, _), geom in zip(rows, decode_geometries([row[1] for row in rows])):
+        if geom.is_empty:
+            continue
+        for level, simplified in simplify_levels(geom):
+            lods.append((feature_id, level, encode_geometry(simplified)))
+
+    cursor.executemany("""
+        INSERT INTO cable_feature_lods (feature_id, level, geometry_wkb)
+        VALUES (?, ?, ?)
+    """, lods)
+
+
+def index_feature_names(cursor, cable_id=None):
+    """
+    Adds the names of features missing from `cable_features_fts`,
+    either for one cable_id or (when None) for the whole table.
+    """
+    sql = """
+        INSERT INTO cable_features_fts (rowid, name)
+        SELECT f.feature_id, f.name FROM cable_features f
+        WHERE f.name IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM cable_features_fts t WHERE t.rowid = f.feature_id)
+    """
+    params = ()
+    if cable_id is not None:
+        sql += " AND f.cable_id = ?"
+        params = (cable_id,)
+    cursor.execute(sql, params)
+
+
+def insert_feature_collection(conn, data):
+    """
+    Inserts an uploaded document into `Cables` and its Features into `cable_features`.
+    The caller is responsible for committing.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+        data (dict | list): A FeatureCollection dict or a bare list of Features.
+
+    Returns:
+        int: The new cable_id.
+    """
+    return insert_feature_collections(conn, [data])[0]
+
+
+def insert_feature_collections(conn, collections):
+    """
+    Inserts many uploaded documents at once: one `Cables` row each, then the
+    Features of all of them with a single executemany. The caller is
+    responsible for the transaction and committing.
+
+    Returns:
+        list[int]: The new cable_ids, in order.
+    """
+    cur = conn.cursor()
+    cable_ids = []
+    for data in collections:
+        cur.execute(
+            "INSERT INTO Cables (feature_collection) VALUES (?)",
+            (dumps(data),)
+        )
+        cable_ids.append(cur.lastrowid)
+
+    cur.executemany(INSERT_FEATURE_SQL, (
+        _feature_row(cable_id, idx, feat)
+        for cable_id, data in zip(cable_ids, collections)
+        for idx, feat in enumerate(feature_list_from(data))
+    ))
+    for cable_id in cable_ids:
+        index_feature_bounds(cur, cable_id)
+        index_feature_lods(cur, cable_id)
+        index_feature_names(cur, cable_id)
+    return cable_ids
+
+
+def migrate_cables(conn):
+    """
+    Copies every `Cables` row that has no `cable_features` rows yet into the normalized table.
+    Safe to run repeatedly; returns the number of migrated cables.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT c.cable_id, c.feature_collection
+        FROM Cables c
+        WHERE NOT EXISTS (SELECT 1 FROM cable_features f WHERE f.cable_id = c.cable_id)
+    """)
+    pending = cur.fetchall()
+
+    migrated = 0
+    for cable_id, feature_collection in pending:
+        if not feature_collection:
+            continue
+        try:
+            data = loads(feature_collection)
+        except json.JSONDecodeError as e:
+            print(f"WARNING: Skipping cable {cable_id}, invalid JSON: {e}")
+            continue
+        if not feature_list_from(data):
+            # Stored empty before inserts were validated; nothing to migrate
+            continue
+        insert_features(cur, cable_id, data)
+        migrated += 1
+
+    # Features stored before the R*Tree / the pyramid / the name index existed
+    index_feature_bounds(cur)
+    index_feature_lods(cur)
+    index_feature_names(cur)
+
+    conn.commit()
+    return migrated
+
+
+def init_cable_store(database_file):
+    """
+    Creates the cable tables if needed and migrates any legacy `Cables` rows.
+    """
+    with sqlite3.connect(database_file) as conn:
+        create_cable_tables(conn.cursor())
+        migrated = migrate_cables(conn)
+    if migrated:
+        print(f"Migrated {migrated} cables into cable_features.")
+
+
+def cable_version(conn):
+    """
+    Returns (version, updated_at) of the cable tables: `version` goes up with every
+    insert, update or delete in `cable_features`, `updated_at` is the time of the
+    last such change as an aware UTC datetime (whole seconds).
+    """
+    version, updated_at = conn.execute("SELECT version, updated_at FROM cable_version WHERE id = 1").fetchone()
+    return version, datetime.strptime(updated_at, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+def row_to_feature(row, geometry=None):
+    """
+    Rebuilds a GeoJSON Feature dict from a `cable_features` row, with coordinates
+    rounded to GEOJSON_PRECISION. `geometry` is the already decoded shapely
+    geometry of the row, if the caller has it.
+    """
+    if geometry is None and row["geometry_wkb"] is not None:
+        geometry = shapely.from_wkb(row["geometry_wkb"])
+    return {
+        "type": "Feature",
+        "geometry": round_coordinates(mapping(geometry)) if geometry is not None else None,
+        "properties": loads(row["properties"]),
+    }
+
+
+def _fts_query(text):
+    """
+    Turns free text into an FTS5 query: every word must match, as a word prefix.
+    """
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in text.split())
+
+
+def _json_value_sql(type_sql, value_sql):
+    # json_extract() and json_each give booleans as 1 / 0: turn them back into JSON
+    # true / false. Same output as the `->` operator, which needs SQLite 3.38+
+    return f"CASE {type_sql} WHEN 'true' THEN json('true') WHEN 'false' THEN json('false') ELSE {value_sql} END"
+
+
+def iter_feature_json(conn, status=None, condition=None, category=None, name_prefix=None,
+                      text=None, bbox=None, date_from=None, date_to=None,
+                      level=0, fields=None, after=None, limit=None, geometry_encoder=geometry_json,
+                      drop_null_properties=False):
+    """
+    Yields the GeoJSON text of every matching Feature straight from the cursor,
+    STREAM_BATCH_ROWS rows at a time. The stored properties JSON is spliced in
+    as-is and each batch of WKB geometries becomes GeoJSON text in one shapely
+    call, so neither all rows nor parsed dicts are ever held at once. Every filter
+    is answered by an index: the column indexes, the R*Tree for `bbox` and
+    the FTS5 table for `text`.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+        status, condition, category (str | None): Exact property matches.
+        name_prefix (str | None): Case-insensitive name prefix.
+        text (str | None): Words that must all start a word of the name.
+        bbox (tuple | None): (min_lon, min_lat, max_lon, max_lat) the feature must overlap.
+        date_from, date_to (str | None): ISO dates the fixed date range must overlap;
+                                         features without any date are left out.
+        level (int): Pyramid level of the geometries (0 is full detail).
+        fields (list[str] | None): Only return these properties ("geometry" keeps the geometry).
+        after (int | None): Only features after this feature_id (pagination cursor).
+        limit (int | None): Maximum number of features.
+        geometry_encoder: Turns a list of stored WKB values into geometry JSON texts
+                          (None for a missing geometry); `geometry_json` by default.
+        drop_null_properties (bool): Leave out properties whose value is null
+                                     (ignored when `fields` is given).
+
+    Yields:
+        tuple: (feature_id, GeoJSON Feature text).
+
+    Raises:
+        ValueError: If a field name contains a double quote.
+    """
+    params = []
+    if fields is None:
+        geometry_sql = "COALESCE(l.geometry_wkb, f.geometry_wkb)"
+        properties_sql = "f.properties"
+        if drop_null_properties:
+            properties_sql = f"""(
+                SELECT json_group_object(p.key, {_json_value_sql("p.type", "p.value")})
+                FROM json_each(f.properties) p WHERE p.type != 'null'
+            )"""
+    else:
+        geometry_sql = "COALESCE(l.geometry_wkb, f.geometry_wkb)" if "geometry" in fields else "NULL"
+        pairs = []
+        for field in fields:
+            if field == "geometry":
+                continue
+            if '"' in field:
+                raise ValueError(f"Invalid field name {field!r}")
+            pairs.append("?, " + _json_value_sql("json_type(f.properties, ?)", "json_extract(f.properties, ?)"))
+            params.extend([field, f'$."{field}"', f'$."{field}"'])
+        properties_sql = f"json_object({', '.join(pairs)})"
+
+    sql = f"""
+        SELECT f.feature_id, {geometry_sql}, {properties_sql}
+        FROM cable_features f
+        LEFT JOIN cable_feature_lods l ON l.feature_id = f.feature_id AND l.level = ?
+    """
+    params.append(level)
+
+    clauses = []
+    for column, value in (("status", status), ("condition", condition), ("category", category)):
+        if value:
+            clauses.append(f"f.{column} = ?")
+            params.append(value)
+    if name_prefix:
+        # Range scan on idx_cable_features_name
+        clauses.append("f.name_key >= ? AND f.name_key < ?")
+        params.extend([name_prefix.lower(), name_prefix.lower() + "\U0010ffff"])
+    if text and text.split():
+        clauses.append("f.feature_id IN (SELECT rowid FROM cable_features_fts WHERE cable_features_fts MATCH ?)")
+        params.append(_fts_query(text))
+    if bbox:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        clauses.append("""f.feature_id IN (
+            SELECT feature_id FROM cable_features_rtree
+            WHERE max_lon >= ? AND min_lon <= ? AND max_lat >= ? AND min_lat <= ?
+        )""")
+        params.extend([min_lon, max_lon, min_lat, max_lat])
+    if date_from or date_to:
+        clauses.append("(f.date_start IS NOT NULL OR f.date_end IS NOT NULL)")
+    if date_from:
+        clauses.append("(f.date_end IS NULL OR f.date_end >= ?)")
+        params.append(date_from)
+    if date_to:
+        clauses.append("(f.date_start IS NULL OR f.date_start <= ?)")
+        params.append(date_to)
+    if after is not None:
+        clauses.append("f.feature_id > ?")
+        params.append(after)
+
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY f.feature_id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    cursor = conn.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(STREAM_BATCH_ROWS)
+        if not rows:
+            break
+        for (feature_id, _, properties), geometry in zip(rows, geometry_encoder([row[1] for row in rows])):
+            yield feature_id, f'{{"type": "Feature", "geometry": {geometry or "null"}, "properties": {properties}}}'
+
+
+def fetch_geometries_by_name(conn, name):
+    """
+    Returns the shapely geometries of every Feature named `name` (case-insensitive).
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT geometry_wkb FROM cable_features
+        WHERE name_key = ? AND geometry_wkb IS NOT NULL
+        ORDER BY feature_id
+    """, (name.lower(),))
+    return decode_geometries([row[0] for row in cur.fetchall()])
+
+
+def fetch_level_geometries(conn, level):
+    """
+    Returns {feature_id: shapely geometry} of every feature at one pyramid level.
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT feature_id, geometry_wkb FROM cable_feature_lods WHERE level = ?", (level,))
+    rows = cur.fetchall()
+    return dict(zip((row[0] for row in rows), decode_geometries([row[1] for row in rows])))
+
+
+def fetch_name_keys(conn, cable_id=None):
+    """
+    Returns the distinct lower-cased cable names, optionally only those of one cable_id.
+    """
+    cur = conn.cursor()
+    if cable_id is None:
+        cur.execute("SELECT DISTINCT name_key FROM cable_features ORDER BY name_key")
+    else:
+        cur.execute(
+            "SELECT DISTINCT name_key FROM cable_features WHERE cable_id = ? ORDER BY name_key",
+            (cable_id,)
+        )
+    return [row[0] for row in cur.fetchall()]
+
+
+def name_exists(conn, name):
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT 1 FROM cable_features WHERE name_key = ? AND geometry_wkb IS NOT NULL LIMIT 1",
+        (name.lower(),)
+    )
+    return cur.fetchone() is not None
+
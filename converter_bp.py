@@ -1,40 +1,165 @@
 # converter_bp.py
 import os
-import json
-import sqlite3
+import io
+import multiprocessing
 import geojson
 import re
+import time
+import numpy as np
+import openpyxl
 import pandas as pd
-import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
 from dotenv import load_dotenv
-from shapely.geometry import LineString
+# The strings pd.read_excel reads as NaN
+from pandas._libs.parsers import STR_NA_VALUES
 from flask import Blueprint, request, jsonify, send_file
-from flask_login import login_required
+from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
-from dotenv import load_dotenv
 
 # Your existing KML parser that returns a GeoJSON string
 from kml_to_geojson_functions import process_kml_file
+from cable_store import (
+    as_feature_collection, feature_list_from, insert_feature_collections, validate_feature_collection,
+)
+from cable_cache import bump_generation
+from zone_crossings import mark_zones_stale, refresh_cables_crossings
+from jobs import get_job, register_job_handler, submit_job
+from db_utils import DATABASE_FILE, get_connection
+from json_utils import dumps, dumps_geojson, load, loads
 
 converter_bp = Blueprint("converter_bp", __name__)
 load_dotenv()
 
-DATABASE_FILE = "UsersDB.db"
-ALLOWED_EXT = {"xlsx", "csv", "kml"}
+ALLOWED_EXT = {"xlsx", "csv", "kml", "kmz"}
+# Worker processes converting XLSX sheets; unset or 0 uses every CPU
+XLSX_WORKERS = int(os.getenv("XLSX_WORKERS", "0")) or None
+
+# Combined degree/minute values such as "N12°34.56"; groups are hemisphere, degrees, minutes
+COMBINED_COORD_RE = re.compile(r"^([NSEW])?(\d{1,3})[^\d]*(\d{1,2}\.\d+)")
+
+# Streaming XLSX ingestion: rows sampled to detect the coordinate columns, rows parsed per chunk
+STREAM_HEAD_ROWS = 50
+STREAM_CHUNK_ROWS = 20000
+# Workbooks at least this large are streamed instead of loaded with pd.read_excel
+STREAM_MIN_BYTES = 10 * 1024 * 1024
 
 def get_db():
-    conn = sqlite3.connect(DATABASE_FILE)
-    return conn
+    return get_connection(DATABASE_FILE)
+
+def save_feature_collection(data, database_file=DATABASE_FILE):
+    """
+    Stores a FeatureCollection (or bare list of Features) as a new cable.
+    Every insert route goes through here so `Cables` and `cable_features` stay in sync.
+
+    Returns:
+        int: The new cable_id.
+    """
+    return save_feature_collections([data], database_file)[0]
+
+def save_feature_collections(collections, database_file=DATABASE_FILE):
+    """
+    Stores several FeatureCollections as new cables in one transaction, then
+    refreshes their crossings and drops the caches once. A failed crossing
+    refresh is logged and left to `ensure_crossings`; the cables stay stored.
+
+    Returns:
+        list[int]: The new cable_ids, in order.
+    """
+    conn = get_connection(database_file)
+    try:
+        # Take the write lock up front: the whole batch is one transaction and one fsync
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cable_ids = insert_feature_collections(conn, collections)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        try:
+            # Materialize the new cables' zone crossings so the map only reads them
+            refresh_cables_crossings(conn, cable_ids)
+        except Exception:
+            # The cables are stored: leave the zones stale for ensure_crossings
+            # to rebuild on the next read instead of failing the insert
+            import traceback
+            traceback.print_exc()
+            print(f"WARNING: Zone crossings of cables {cable_ids} not refreshed; rebuilding them on next read")
+            conn.rollback()
+            mark_zones_stale(conn)
+        finally:
+            # Drop the parsed-cable cache so nothing serves the old set; cached tiles
+            # are keyed by cable_version and need no invalidation
+            bump_generation()
+    finally:
+        conn.close()
+
+    return cable_ids
+
+def bulk_insert_cables(items, database_file=DATABASE_FILE):
+    """
+    Validates many cables and stores them in a single transaction. Nothing is
+    inserted if any of them is invalid.
+
+    Args:
+        items (list): FeatureCollection dicts (or bare lists of Features) and/or
+                      paths to GeoJSON files.
+
+    Returns:
+        dict: The new `cable_ids` plus `cables`, `features`, `elapsed_ms` and
+              `features_per_second` for the whole batch.
+
+    Raises:
+        ValueError: Naming the first item that cannot be read or is not valid GeoJSON.
+    """
+    start = time.perf_counter()
+    collections = []
+    for idx, item in enumerate(items):
+        try:
+            if isinstance(item, str):
+                with open(item, "r", encoding="utf-8") as f:
+                    item = load(f)
+            validate_feature_collection(item)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Cable {idx}: {e}") from e
+        collections.append(item)
+
+    cable_ids = save_feature_collections(collections, database_file)
+
+    elapsed = time.perf_counter() - start
+    features = sum(len(feature_list_from(data)) for data in collections)
+    print(f"DEBUG: Bulk inserted {len(cable_ids)} cables ({features} features) in {elapsed:.2f}s.")
+    return {
+        "cable_ids": cable_ids,
+        "cables": len(cable_ids),
+        "features": features,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "features_per_second": round(features / elapsed, 1) if elapsed > 0 else None,
+    }
+
+def split_cable_groups(feature_collection):
+    """
+    Splits a multi-cable FeatureCollection from `process_kml_file` into one
+    FeatureCollection per cable using its "cable_groups" member.
+
+    Returns:
+        list[dict]: The per-cable FeatureCollections, in group order.
+    """
+    features = feature_collection.get("features", [])
+    return [
+        {"type": "FeatureCollection", "features": [features[idx] for idx in indexes]}
+        for indexes in feature_collection["cable_groups"].values()
+    ]
 
 @converter_bp.route("/upload_and_convert", methods=["POST"])
 @login_required
 def upload_and_convert():
     """
     1) Handles file upload.
-    2) If KML, parse to a GeoJSON string via `process_kml_file`.
-    3) Convert that string back to a Python dict so we return a real JSON object to the client.
+    2) If KML/KMZ (or XLSX), queues a background job that parses it via `process_kml_file`.
+    3) Returns the job id right away; GET /jobs/<job_id> has the GeoJSON once it is done.
     """
     if "file" not in request.files:
         return jsonify({"success": False, "error": "No file part in request."}), 400
@@ -48,46 +173,22 @@ def upload_and_convert():
     if ext not in ALLOWED_EXT:
         return jsonify({"success": False, "error": f"File extension '{ext}' not allowed."}), 400
 
-    # Save locally (temp)
-    save_dir = os.path.join("static", "uploads")
-    os.makedirs(save_dir, exist_ok=True)
-    local_path = os.path.join(save_dir, filename)
-    uploaded_file.save(local_path)
+    if ext == "csv":
+        # CSV (placeholder, adapt to your actual code)
+        return jsonify({
+            "success": True,
+            "message": "CSV file parsed successfully. (Not implemented here)",
+            "geojson": {}
+        })
 
     try:
-        if ext == "kml":
-            # Parse KML -> GeoJSON (string)
-            geojson_str = process_kml_file(local_path)
-            # Remove the temp file
-            os.remove(local_path)
-
-            # Convert that string to a Python dict
-            try:
-                geojson_dict = json.loads(geojson_str)
-            except json.JSONDecodeError as err:
-                return jsonify({
-                    "success": False,
-                    "error": f"Unable to parse JSON from KML: {err}"
-                }), 500
-
-            return jsonify({
-                "success": True,
-                "message": "KML parsed successfully.",
-                # Return as an actual dict to the frontend
-                "geojson": geojson_dict
-            })
-
-        else:
-            # XLSX or CSV (placeholder, adapt to your actual code)
-            os.remove(local_path)
-            return jsonify({
-                "success": True,
-                "message": f"{ext.upper()} file parsed successfully. (Not implemented here)",
-                "geojson": {}
-            })
+        if ext == "xlsx":
+            return queue_conversion(uploaded_file, "xlsx")
+        # KMZ archives go through the KML parser, which unpacks them.
+        # Optional cable grouping rule: a regex on placemark names or "property:<key>"
+        options = {"group_by": request.form.get("group_by") or None}
+        return queue_conversion(uploaded_file, "kml", options)
     except Exception as e:
-        if os.path.exists(local_path):
-            os.remove(local_path)
         return jsonify({"success": False, "error": str(e)}), 500
 
 
@@ -97,24 +198,31 @@ def confirm_insertion():
     """
     Receives final GeoJSON (including user-updated metadata), inserts into DB.
     Expects JSON: { "geojson": {...} }
-    The entire FeatureCollection is stored in the 'feature_collection' column of `Cables`.
+    The FeatureCollection is stored in `Cables`, one row per Feature in `cable_features`.
+    A KML upload with several cables ("cable_groups") is stored as one cable per group.
     """
     data = request.json
     if not data or "geojson" not in data:
         return jsonify({"success": False, "error": "No GeoJSON provided."}), 400
 
-    # Convert the Python dict -> JSON string
-    fc_str = json.dumps(data["geojson"], ensure_ascii=False)
+    geojson_data = data["geojson"]
+    try:
+        validate_feature_collection(geojson_data)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
 
     try:
-        conn = get_db()
-        cur = conn.cursor()
+        if isinstance(geojson_data, dict) and geojson_data.get("cable_groups"):
+            # A whole KML network: one cable per group
+            cable_ids = save_feature_collections(split_cable_groups(geojson_data))
+            return jsonify({
+                "success": True,
+                "message": f"{len(cable_ids)} cables inserted into DB successfully.",
+                "cable_id": cable_ids[0],
+                "cable_ids": cable_ids
+            })
 
-        # We'll store the entire FeatureCollection in one column
-        cur.execute("INSERT INTO Cables (feature_collection) VALUES (?)", (fc_str,))
-        conn.commit()
-        cable_id = cur.lastrowid
-        conn.close()
+        cable_id = save_feature_collection(geojson_data)
 
         return jsonify({
             "success": True,
@@ -125,17 +233,48 @@ def confirm_insertion():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@converter_bp.route("/cables/bulk", methods=["POST"])
+@login_required
+def bulk_insert():
+    """
+    Inserts many cables in one transaction.
+    Expects JSON: { "cables": [ {FeatureCollection}, ... ] }
+    Returns every new cable_id and the batch throughput.
+    File paths are only taken by `bulk_insert_cables` and cable_import.py, never over HTTP.
+    """
+    data = request.json
+    if not data or not isinstance(data.get("cables"), list) or not data["cables"]:
+        return jsonify({"success": False, "error": "No cables provided."}), 400
+    for idx, item in enumerate(data["cables"]):
+        if not isinstance(item, (dict, list)):
+            return jsonify({"success": False, "error": f"Cable {idx}: Expected a GeoJSON FeatureCollection."}), 400
+
+    try:
+        report = bulk_insert_cables(data["cables"])
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": f"Failed to insert into DB: {str(e)}"}), 500
+
+    return jsonify({
+        "success": True,
+        "message": f"{report['cables']} cables inserted into DB successfully.",
+        **report
+    })
+
+
 @converter_bp.route("/download_geojson", methods=["POST"])
 @login_required
 def download_geojson():
     """
     Takes JSON body with "geojson", saves it as .geojson, returns it as a file download.
+    The file is compact unless the body has "pretty": true.
     """
     data = request.json
     if not data or "geojson" not in data:
         return jsonify({"success": False, "error": "No GeoJSON provided."}), 400
 
-    fc_str = json.dumps(data["geojson"], ensure_ascii=False, indent=2)
+    fc_str = dumps_geojson(data["geojson"], pretty=bool(data.get("pretty")))
 
     tmp_dir = os.path.join("static", "downloads")
     os.makedirs(tmp_dir, exist_ok=True)
@@ -147,6 +286,54 @@ def download_geojson():
     return send_file(tmp_file, as_attachment=True, download_name="converted.geojson")
 
 
+def queue_conversion(uploaded_file, kind, options=None):
+    """
+    Queues the conversion of an uploaded file for the current user.
+
+    Returns:
+        tuple: A 202 JSON response with the job id and the URL to poll.
+    """
+    job_id = submit_job(kind, uploaded_file, user_id=current_user.id, options=options)
+    return jsonify({
+        "success": True,
+        "message": f"{kind.upper()} file queued for conversion.",
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}"
+    }), 202
+
+
+def run_xlsx_job(file_path, progress, options):
+    """
+    Background job handler for XLSX uploads. Each job writes its GeoJSON files to
+    its own directory so sheets with the same name in different uploads do not clash.
+    """
+    job_id = os.path.basename(os.path.dirname(file_path))
+    save_dir = os.path.join("static", "tempconvertedfiles", job_id)
+    os.makedirs(save_dir, exist_ok=True)
+    return {"files": process_excel_to_geojson(file_path, save_dir, progress=progress)}
+
+
+def run_kml_job(file_path, progress, options):
+    """
+    Background job handler for KML uploads. `options["group_by"]` is the cable
+    grouping rule passed to `process_kml_file`.
+    """
+    progress(0, 1, 0)
+    geojson_dict = loads(process_kml_file(file_path, group_by=options.get("group_by")))
+
+    rows = 0
+    for feature in geojson_dict.get("features", []):
+        geometry = feature.get("geometry") or {}
+        lines = geometry.get("coordinates") or []
+        rows += sum(len(line) for line in lines) if geometry.get("type") == "MultiLineString" else len(lines)
+    progress(1, 1, rows)
+    return {"geojson": geojson_dict}
+
+
+register_job_handler("xlsx", run_xlsx_job)
+register_job_handler("kml", run_kml_job)
+
+
 def convert_xlsx_to_geojson(uploaded_file):
     """
     Converts an uploaded XLSX file to GeoJSON format and saves the outputs.
@@ -190,7 +377,7 @@ def find_coordinate_columns(df):
 
     print("DEBUG: Starting column detection...")
     for i, col in enumerate(df.columns):
-        sample_values = df[col].dropna().astype(str).head(10)
+        sample_values = df[col].dropna().head(10).astype(str)
         print(f"DEBUG: Checking column '{col}' with sample values: {sample_values.tolist()}")
 
         # skip columns with too much text (irrelevant data)
@@ -270,16 +457,15 @@ def parse_coordinate(degree, minutes=None):
     Handles combined and split formats.
     """
     try:
-        if isinstance(degree, str) and re.match(r"[NSEW]?\d{1,3}[^\d]*\d{1,2}\.\d+", degree):
-            match = re.match(r"([NSEW])?(\d{1,3})[^\d]*(\d{1,2}\.\d+)", degree, re.IGNORECASE)
-            if match:
-                direction = match.group(1)
-                degrees = int(match.group(2))
-                minutes = float(match.group(3))
-                decimal_degrees = degrees + (minutes / 60)
-                if direction and direction.upper() in ('S', 'W'):
-                    decimal_degrees = -decimal_degrees
-                return decimal_degrees
+        match = COMBINED_COORD_RE.match(degree) if isinstance(degree, str) else None
+        if match:
+            direction = match.group(1)
+            degrees = int(match.group(2))
+            minutes = float(match.group(3))
+            decimal_degrees = degrees + (minutes / 60)
+            if direction in ('S', 'W'):
+                decimal_degrees = -decimal_degrees
+            return decimal_degrees
 
         # Handle separate degrees and minutes
         if degree is not None and minutes is not None:
@@ -291,12 +477,73 @@ def parse_coordinate(degree, minutes=None):
         return None
 
 
+def parse_coordinate_series(degrees, minutes=None):
+    """
+    `parse_coordinate` over whole columns.
+
+    Combined string values go through the compiled `parse_coordinate` one value
+    at a time (a `str.extract` pipeline is slower on these); split degree/minute
+    columns are converted with `pd.to_numeric` and combined with NumPy arithmetic.
+
+    Args:
+        degrees (pd.Series): Degree (or combined degree/minute) values.
+        minutes (pd.Series | None): Minute values, aligned with `degrees`.
+
+    Returns:
+        pd.Series: Decimal degrees, NaN where `parse_coordinate` returns None.
+    """
+    result = np.array(
+        [parse_coordinate(value) if isinstance(value, str) else None for value in degrees],
+        dtype=float,
+    )
+    combined = ~np.isnan(result)
+
+    if minutes is not None:
+        split = ~combined
+        result[split] = (
+            pd.to_numeric(degrees[split], errors="coerce").to_numpy(dtype=float)
+            + pd.to_numeric(minutes[split], errors="coerce").to_numpy(dtype=float) / 60
+        )
+
+    return pd.Series(result, index=degrees.index)
+
+
+def parse_depth_series(values):
+    """
+    Vectorized depth parsing: plain non-negative decimal numbers become floats,
+    anything else NaN.
+
+    Returns:
+        pd.Series | None: Depths, or None if no value is a valid depth.
+    """
+    if pd.api.types.is_float_dtype(values):
+        # Same as the text check: non-negative and not printed in exponent notation
+        valid = ~np.signbit(values) & ((values == 0) | ((values >= 1e-4) & (values < 1e16)))
+    elif pd.api.types.is_integer_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        valid = values >= 0
+    else:
+        text = values.astype(str)
+        valid = values.notna() & text.str.replace(".", "", n=1, regex=False).str.isdigit()
+    if not valid.any():
+        return None
+    depth = pd.Series(np.nan, index=values.index)
+    depth[valid] = values[valid].astype(float)
+    return depth
+
+
 def extract_coordinates_to_df(df):
     """
     Extracts latitude, longitude, and depth from a DataFrame.
     Handles combined and split formats for degrees and minutes.
     """
-    col_mapping = find_coordinate_columns(df)
+    return coordinates_from_columns(df, find_coordinate_columns(df))
+
+
+def coordinates_from_columns(df, col_mapping):
+    """
+    Parses the columns picked by `find_coordinate_columns` into a
+    longitude/latitude/depth DataFrame, dropping rows without coordinates.
+    """
     lat_deg_col = col_mapping["lat_deg_col"]
     lat_min_col = col_mapping["lat_min_col"]
     lon_deg_col = col_mapping["lon_deg_col"]
@@ -307,35 +554,117 @@ def extract_coordinates_to_df(df):
         print("DEBUG: Missing required latitude or longitude columns. Skipping sheet.")
         return pd.DataFrame()
 
-    # handle combined or split formats for latitude and longitude
-    df["latitude_combined"] = (
-        df.apply(lambda row: parse_coordinate(row[lat_deg_col], row[lat_min_col]), axis=1)
-        if lat_min_col
-        else df[lat_deg_col].apply(parse_coordinate)
-    )
-    df["longitude_combined"] = (
-        df.apply(lambda row: parse_coordinate(row[lon_deg_col], row[lon_min_col]), axis=1)
-        if lon_min_col
-        else df[lon_deg_col].apply(parse_coordinate)
-    )
+    # handle combined or split formats for latitude and longitude, whole columns at a time
+    latitude = parse_coordinate_series(df[lat_deg_col], df[lat_min_col] if lat_min_col else None)
+    longitude = parse_coordinate_series(df[lon_deg_col], df[lon_min_col] if lon_min_col else None)
 
     # create standardized DataFrame
     coordinates_df = pd.DataFrame({
-        "longitude": df["longitude_combined"],
-        "latitude": df["latitude_combined"],
-        "depth": (
-            df[depth_col].apply(
-                lambda x: float(x) if pd.notna(x) and str(x).replace('.', '', 1).isdigit() else None
-            )
-            if depth_col
-            else None
-        )
+        "longitude": longitude,
+        "latitude": latitude,
+        "depth": parse_depth_series(df[depth_col]) if depth_col else None
     })
 
     # drop rows with missing coordinates
     coordinates_df = coordinates_df.dropna(subset=["longitude", "latitude"]).copy()
     return coordinates_df
 
+
+def _excel_value(value):
+    """
+    Converts a raw openpyxl value the way pd.read_excel does: empty cells and
+    NA strings become NaN, whole-number floats become ints.
+    """
+    if value is None or (isinstance(value, str) and value in STR_NA_VALUES):
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _excel_header(row):
+    """
+    Column names pd.read_excel gives a header row: "Unnamed: i" for empty
+    cells and ".1", ".2", ... suffixes on repeated names.
+    """
+    names, counts = [], {}
+    for idx, value in enumerate(row):
+        name = f"Unnamed: {idx}" if value is None or value == "" else value
+        if name in counts:
+            counts[name] += 1
+            name = f"{name}.{counts[name]}"
+        counts.setdefault(name, 0)
+        names.append(name)
+    return names
+
+
+def _trimmed_length(row):
+    length = len(row)
+    while length and row[length - 1] in (None, ""):
+        length -= 1
+    return length
+
+
+def stream_sheet_coordinates(worksheet, head_rows=STREAM_HEAD_ROWS, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    Streaming counterpart of `extract_coordinates_to_df` for one openpyxl
+    `read_only` worksheet.
+
+    The first non-blank row is the header, as with pd.read_excel. The next
+    `head_rows` rows are used to detect the coordinate columns with
+    `find_coordinate_columns`; after that only those columns are kept and
+    parsed `chunk_rows` rows at a time, so memory per sheet is bounded by a
+    chunk plus the resulting coordinates.
+
+    Returns:
+        pd.DataFrame: longitude/latitude/depth rows, empty if no coordinate columns were found.
+    """
+    rows = (row for row in worksheet.iter_rows(values_only=True) if _trimmed_length(row))
+
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    head = []
+    for row in rows:
+        head.append(row)
+        if len(head) == head_rows:
+            break
+
+    # Trailing empty columns are dropped, as pd.read_excel does
+    width = max(_trimmed_length(row) for row in [header] + head)
+    names = _excel_header(tuple(header[:width]) + (None,) * (width - len(header)))
+
+    def to_frame(chunk, positions):
+        return pd.DataFrame(
+            [[_excel_value(row[pos]) if pos < len(row) else np.nan for pos in positions] for row in chunk],
+            columns=[names[pos] for pos in positions],
+        )
+
+    head_df = to_frame(head, range(width))
+    col_mapping = find_coordinate_columns(head_df)
+    if not (col_mapping["lat_deg_col"] and col_mapping["lon_deg_col"]):
+        print("DEBUG: Missing required latitude or longitude columns. Skipping sheet.")
+        return pd.DataFrame()
+
+    used = [col for col in col_mapping.values() if col is not None]
+    positions = sorted({names.index(col) for col in used})
+
+    parts = [coordinates_from_columns(head_df[[names[pos] for pos in positions]], col_mapping)]
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_rows:
+            parts.append(coordinates_from_columns(to_frame(chunk, positions), col_mapping))
+            chunk = []
+    if chunk:
+        parts.append(coordinates_from_columns(to_frame(chunk, positions), col_mapping))
+
+    # A chunk without any valid depth has depth None; keep None only if no chunk had one
+    has_depth = any(part["depth"].notna().any() for part in parts)
+    coordinates_df = pd.concat(parts, ignore_index=True)
+    coordinates_df["depth"] = coordinates_df["depth"].astype(float) if has_depth else None
+    return coordinates_df
+
 def format_as_geojson(coordinates):
     """
     Convert a list of coordinates into a GeoJSON feature collection.
@@ -356,46 +685,138 @@ def format_as_geojson(coordinates):
             }
         ]
     }
-    return json.dumps(geojson_output, indent=2)
+    return dumps_geojson(geojson_output)
 
 
 # WORKS ON ALL
 
-def process_excel_to_geojson(file_path, save_dir):
+def list_sheet_names(file_path):
     """
-    Process an Excel file and extract coordinate data into GeoJSON format.
+    Returns the worksheet names of a workbook in order (chart sheets are left out).
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, keep_links=False)
+    try:
+        return [worksheet.title for worksheet in workbook.worksheets]
+    finally:
+        workbook.close()
+
+
+def sheet_coordinates(file_path, sheet_name, streaming=False):
+    """
+    Extracts the coordinates of one sheet.
 
     Args:
         file_path (str): Path to the Excel file.
-        save_dir (str): Directory to save GeoJSON files.
+        sheet_name (str): Sheet to read.
+        streaming (bool): Read rows with openpyxl in read_only mode instead of
+                          loading the whole sheet with pd.read_excel.
+    """
+    if not streaming:
+        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        return extract_coordinates_to_df(df)
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        return stream_sheet_coordinates(workbook[sheet_name])
+    finally:
+        workbook.close()
+
+
+def convert_sheet(file_path, sheet_name, save_dir, streaming=False):
+    """
+    Converts one sheet end to end: column detection, coordinate parsing, GeoJSON
+    encoding and writing the .geojson file. Runs in the worker processes of
+    `process_excel_to_geojson`.
 
     Returns:
-        dict: A dictionary mapping sheet names to GeoJSON file paths.
+        tuple: (entry, elapsed_ms, rows) where entry is the sheet's result dict, or None
+               if the sheet has fewer than 10 coordinates, and rows is the number of
+               coordinate rows parsed.
     """
-    xls = pd.ExcelFile(file_path)
-    geojson_files = {} 
+    start = time.perf_counter()
+    coords_df = sheet_coordinates(file_path, sheet_name, streaming)
+
+    entry = None
+    if not coords_df.empty and len(coords_df) >= 10:
+        coords_df["depth"] = coords_df["depth"].fillna(0)
+        geojson_data = create_geojson(coords_df[["longitude", "latitude", "depth"]].fillna(0).values.tolist())
+
+        # save the GeoJSON data to a file
+        geojson_filename = f"{sheet_name.replace(' ', '_')}.geojson"
+        geojson_path = os.path.join(save_dir, geojson_filename)
+        with open(geojson_path, "w", encoding="utf-8") as f:
+            f.write(geojson_data)
+
+        entry = {
+            "file_path": geojson_path,
+            "filename": geojson_filename,
+            "coordinates": coords_df[["longitude", "latitude", "depth"]].values.tolist()
+        }
 
-    for sheet_name in xls.sheet_names:
-        df = pd.read_excel(xls, sheet_name=sheet_name)
-        coords_df = extract_coordinates_to_df(df)
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    if entry is not None:
+        entry["elapsed_ms"] = elapsed_ms
+    return entry, elapsed_ms, len(coords_df)
 
-        if not coords_df.empty and len(coords_df) >= 10:
-            coords_df["depth"] = coords_df["depth"].fillna(0)
-            geojson_data = create_geojson(coords_df[["longitude", "latitude", "depth"]].fillna(0).values.tolist())
 
-            # save the GeoJSON data to a file
-            geojson_filename = f"{sheet_name.replace(' ', '_')}.geojson"
-            geojson_path = os.path.join(save_dir, geojson_filename)
-            with open(geojson_path, "w") as f:
-                f.write(geojson_data)
+def process_excel_to_geojson(file_path, save_dir, streaming=None, workers=XLSX_WORKERS, progress=None):
+    """
+    Process an Excel file and extract coordinate data into GeoJSON format.
+    Sheets are converted in parallel, one sheet per worker process.
 
-            geojson_files[sheet_name] = {
-                "file_path": geojson_path,
-                "filename": geojson_filename,
-                "coordinates": coords_df[["longitude", "latitude", "depth"]].values.tolist()
-            }
+    Args:
+        file_path (str): Path to the Excel file.
+        save_dir (str): Directory to save GeoJSON files.
+        streaming (bool | None): Read sheets with openpyxl in read_only mode. By default
+                                 workbooks of at least STREAM_MIN_BYTES are streamed.
+        workers (int | None): Worker processes (default: CPU count); 1 converts in-process.
+        progress (callable | None): Called as progress(sheets_done, sheets_total, rows_parsed)
+                                    before the first sheet and after every finished sheet.
 
-    print(f"{len(geojson_files)} cables found and saved.")
+    Returns:
+        dict: A dictionary mapping sheet names to GeoJSON file paths, in sheet order.
+              Each entry carries the sheet's conversion time in `elapsed_ms`.
+    """
+    if streaming is None:
+        streaming = os.path.getsize(file_path) >= STREAM_MIN_BYTES
+
+    sheet_names = list_sheet_names(file_path)
+    workers = min(workers or os.cpu_count() or 1, len(sheet_names))
+    jobs = [(file_path, sheet_name, save_dir, streaming) for sheet_name in sheet_names]
+
+    rows_parsed = 0
+
+    def report(sheets_done):
+        if progress is not None:
+            progress(sheets_done, len(sheet_names), rows_parsed)
+
+    report(0)
+    start = time.perf_counter()
+    results = {}
+    if workers <= 1:
+        for job in jobs:
+            results[job[1]] = convert_sheet(*job)
+            rows_parsed += results[job[1]][2]
+            report(len(results))
+    else:
+        # Spawned, not forked: this runs on a job worker thread of a multi-threaded web process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {pool.submit(convert_sheet, *job): job[1] for job in jobs}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                rows_parsed += results[futures[future]][2]
+                report(len(results))
+
+    geojson_files = {}
+    for sheet_name in sheet_names:
+        entry, elapsed_ms, rows = results[sheet_name]
+        print(f"DEBUG: Sheet '{sheet_name}' converted in {elapsed_ms} ms ({rows} rows).")
+        if entry is not None:
+            geojson_files[sheet_name] = entry
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(geojson_files)} cables found and saved ({len(sheet_names)} sheets, "
+          f"{max(workers, 1)} workers, {elapsed:.2f}s).")
     return geojson_files 
 
 def create_geojson(
@@ -451,7 +872,7 @@ def create_geojson(
     )
     feature_collection = geojson.FeatureCollection([feature])
 
-    return geojson.dumps(feature_collection, indent=2)
+    return dumps_geojson(feature_collection)
 
 @converter_bp.route("/save_geojson", methods=["POST"])
 @login_required
@@ -483,8 +904,8 @@ def save_geojson():
         }
 
         output_path = os.path.join(output_dir, output_filename)
-        with open(output_path, "w") as geojson_file:
-            json.dump(geojson_data, geojson_file, indent=2)
+        with open(output_path, "w", encoding="utf-8") as geojson_file:
+            geojson_file.write(dumps_geojson(geojson_data))
 
         return jsonify({"success": True, "message": "GeoJSON saved successfully.", "file_path": output_path})
     except Exception as e:
@@ -510,20 +931,16 @@ def confirm_xlsx_insertion():
     try:
         # Read the GeoJSON file
         with open(file_path, "r", encoding="utf-8") as f:
-            geojson_content = json.load(f)
+            geojson_content = load(f)
 
         # Validate the GeoJSON structure
-        if "features" not in geojson_content or "type" not in geojson_content:
-            return jsonify({"success": False, "error": "Invalid GeoJSON format."}), 400
+        try:
+            validate_feature_collection(geojson_content)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid GeoJSON format: {e}"}), 400
 
         # Insert into the database
-        fc_str = json.dumps(geojson_content, ensure_ascii=False)
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute("INSERT INTO Cables (feature_collection) VALUES (?)", (fc_str,))
-        conn.commit()
-        cable_id = cur.lastrowid
-        conn.close()
+        cable_id = save_feature_collection(geojson_content)
 
         return jsonify({
             "success": True,
@@ -540,7 +957,8 @@ def confirm_xlsx_insertion():
 def download_xlsx_geojson():
     """
     Sends a specific updated GeoJSON file for download.
-    Expects JSON: { "file_path": "path_to_geojson_file" }
+    Expects JSON: { "file_path": "path_to_geojson_file" }, plus "pretty": true
+    for an indented file instead of the compact one on disk.
     """
     data = request.json
     if not data or "file_path" not in data:
@@ -554,6 +972,12 @@ def download_xlsx_geojson():
 
     # Send the file for download
     try:
+        if data.get("pretty"):
+            with open(file_path, "r", encoding="utf-8") as f:
+                pretty = dumps(load(f), pretty=True)
+            return send_file(io.BytesIO(pretty.encode("utf-8")), as_attachment=True,
+                             download_name=os.path.basename(file_path),
+                             mimetype="application/geo+json")
         return send_file(file_path, as_attachment=True, download_name=os.path.basename(file_path))
     except Exception as e:
         return jsonify({"success": False, "error": f"Failed to send file: {str(e)}"}), 500
@@ -564,7 +988,8 @@ def download_xlsx_geojson():
 @login_required
 def upload_xlsx():
     """
-    Handles XLSX file uploads, converts them to GeoJSON, and returns metadata for further processing.
+    Handles XLSX file uploads. The conversion runs as a background job; the response
+    carries its id and GET /jobs/<job_id> returns the per-sheet metadata once it is done.
     """
     if "file" not in request.files:
         return jsonify({"success": False, "error": "No file part in request."}), 400
@@ -579,74 +1004,53 @@ def upload_xlsx():
         return jsonify({"success": False, "error": "Invalid file type for this endpoint."}), 400
 
     try:
-        # Convert XLSX to GeoJSON using the existing function
-        geojson_files = convert_xlsx_to_geojson(uploaded_file)
-
-        return jsonify({
-            "success": True,
-            "message": "XLSX file processed successfully.",
-            "files": geojson_files
-        })
+        return queue_conversion(uploaded_file, "xlsx")
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-def load_single_geojson_file(file_path, database_file="UsersDB.db"):
+@converter_bp.route("/jobs/<job_id>", methods=["GET"])
+@login_required
+def job_status(job_id):
     """
-    Inserts a single GeoJSON file's 'features' into the 'Cables' table in the database.
-
-    Args:
-        file_path (str): The full path to the GeoJSON file.
-        database_file (str): The path to the database file.
+    Reports a conversion job: status (queued, running, done or failed), progress
+    (sheets done out of sheets total, rows parsed), the result once it is done
+    and the error if it failed.
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"GeoJSON file not found: {file_path}")
+    job = get_job(job_id)
+    if job is None or (job["user_id"] is not None and job["user_id"] != current_user.id):
+        return jsonify({"success": False, "error": "Job not found."}), 404
 
-    with sqlite3.connect(database_file) as conn:
-        cursor = conn.cursor()
+    job.pop("user_id")
+    return jsonify({"success": True, "job": job})
 
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            features = json.dumps(data.get("features", []))
 
-            # Insert the features into the Cables table
-            cursor.execute("""
-                INSERT INTO Cables (feature_collection)
-                VALUES (?)
-            """, (features,))
-
-        conn.commit()
-        print(f"GeoJSON data from {file_path} loaded into the Cables table.")
-
-
-
-
-def load_single_geojson_file(file_path, database_file="UsersDB.db"):
+def load_single_geojson_file(file_path, database_file=DATABASE_FILE):
     """
-    Inserts a single GeoJSON file's 'features' into the 'Cables' table in the database.
+    Inserts a single GeoJSON file as a new cable, keeping the whole FeatureCollection
+    (a bare list of Features or a single Feature is wrapped in one).
 
     Args:
         file_path (str): The full path to the GeoJSON file.
         database_file (str): The path to the database file.
+
+    Returns:
+        int: The new cable_id.
+
+    Raises:
+        ValueError: If the file is not a valid FeatureCollection.
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"GeoJSON file not found: {file_path}")
 
-    with sqlite3.connect(database_file) as conn:
-        cursor = conn.cursor()
-
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            features = json.dumps(data.get("features", []))
-
-            # Insert the features into the Cables table
-            cursor.execute("""
-                INSERT INTO Cables (feature_collection)
-                VALUES (?)
-            """, (features,))
+    with open(file_path, 'r', encoding='utf-8') as file:
+        data = load(file)
 
-        conn.commit()
-        print(f"GeoJSON data from {file_path} loaded into the Cables table.")
+    data = as_feature_collection(data)
+    validate_feature_collection(data)
+    cable_id = save_feature_collection(data, database_file)
+    print(f"GeoJSON data from {file_path} loaded into the Cables table.")
+    return cable_id
 
 
 @converter_bp.route("/insert_geojson", methods=["POST"])
@@ -668,27 +1072,15 @@ def insert_geojson():
 
     try:
         # Use the `load_single_geojson_file` logic here
-        with sqlite3.connect("UsersDB.db") as conn:
-            cursor = conn.cursor()
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                features = json.dumps(data.get("features", []))
-
-                # Insert the features into the Cables table
-                cursor.execute("""
-                    INSERT INTO Cables (feature_collection)
-                    VALUES (?)
-                """, (features,))
-
-                # Commit changes and get the inserted cable ID
-                conn.commit()
-                cable_id = cursor.lastrowid
+        cable_id = load_single_geojson_file(file_path, DATABASE_FILE)
 
         return jsonify({
             "success": True,
             "message": "GeoJSON inserted into DB successfully.",
             "cable_id": cable_id  # Include the cable ID in the response
         })
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"Invalid GeoJSON format: {e}"}), 400
     except Exception as e:
         return jsonify({"success": False, "error": f"Failed to insert into DB: {str(e)}"}), 500
 
@@ -3,6 +3,9 @@ import os
 import sqlite3
 import json
 from werkzeug.security import generate_password_hash
+from cable_store import create_cable_tables, migrate_cables
+from cable_import import import_cables
+from zone_crossings import create_crossing_tables
 
 DATABASE_FILE = "UsersDB.db"
 
@@ -36,14 +39,10 @@ def create_tables():
             )
         """)
 
-        # 2) Create Cables table
-        #    Only store the entire FeatureCollection as TEXT
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Cables(
-                cable_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                feature_collection TEXT NOT NULL
-            )
-        """)
+        # 2) Create Cables + cable_features tables
+        #    Cables keeps the uploaded document, cable_features one indexed row per Feature
+        create_cable_tables(cursor)
+        create_crossing_tables(cursor)
 
         # Insert sample users if none exist
         cursor.execute("SELECT COUNT(*) FROM User")
@@ -56,7 +55,12 @@ def create_tables():
 
         # Commit changes
         conn.commit()
+
+        # 3) Move any legacy Cables rows into cable_features
+        migrated = migrate_cables(conn)
         print("Tables created and sample data inserted (if empty).")
+        if migrated:
+            print(f"Migrated {migrated} cables into cable_features.")
 
 if __name__ == "__main__":
     create_tables()
@@ -64,31 +68,14 @@ if __name__ == "__main__":
 
 def load_geojson_files(DATABASE_FILE = "UsersDB.db", GEOJSON_FOLDER = "static/tempconvertedfiles"):
     """
-    Loads all .geojson files in the specified folder and inserts their 'features' into the 'Cables' table.
+    Loads all .geojson files in the specified folder as cables, keeping each FeatureCollection whole.
+    Kept for existing scripts; `python cable_import.py <paths>` also takes KML/XLSX files and globs.
     """
     abs_path = os.path.abspath(DATABASE_FILE)
     print("Using database file at:", abs_path)
 
-    with sqlite3.connect(DATABASE_FILE) as conn:
-        cursor = conn.cursor()
-
-        # Iterate over all .geojson files in the folder
-        for filename in os.listdir(GEOJSON_FOLDER):
-            if filename.endswith(".geojson"):
-                file_path = os.path.join(GEOJSON_FOLDER, filename)
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-                    features = json.dumps(data.get("features", []))
-
-                    # Insert features into the Cables table
-                    cursor.execute("""
-                        INSERT INTO Cables (feature_collection)
-                        VALUES (?)
-                    """, (features,))
-
-        # Commit changes
-        conn.commit()
-        print("GeoJSON data loaded into the Cables table.")
+    import_cables([os.path.join(GEOJSON_FOLDER, "**", "*.geojson")], DATABASE_FILE)
+    print("GeoJSON data loaded into the Cables table.")
 
 if __name__ == "__main__":
     load_geojson_files()
@@ -1,14 +1,120 @@
 import os
-from dotenv import load_dotenv
 import sqlite3
+import threading
+from urllib.parse import quote
+from dotenv import load_dotenv
 from flask import g
 
+load_dotenv()
+
 DATABASE_FILE = os.getenv("DATABASE_FILE", "UsersDB.db")
 
+# Connection tuning shared by every blueprint (see `connect`)
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_KB = int(os.getenv("SQLITE_CACHE_KB", "65536"))
+# Prepared statements kept per connection; pooled connections reuse them across requests
+STATEMENT_CACHE_SIZE = 256
+# Seconds a writer waits for the lock before "database is locked"
+BUSY_TIMEOUT = 30
+
+_local = threading.local()
+_wal_lock = threading.Lock()
+_wal_ready = set()
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    A connection owned by one thread's pool. close() only rolls back an open
+    transaction and hands it back, so existing `conn.close()` calls stay safe;
+    dispose() really closes it.
+    """
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def dispose(self):
+        super().close()
+
+
+def _enable_wal(database_file):
+    # WAL is stored in the database file, so it only has to be switched on once
+    path = os.path.abspath(database_file)
+    if path in _wal_ready:
+        return
+    with _wal_lock:
+        if path not in _wal_ready:
+            conn = sqlite3.connect(database_file, timeout=BUSY_TIMEOUT)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            finally:
+                conn.close()
+            _wal_ready.add(path)
+
+
+def connect(database_file=DATABASE_FILE, readonly=False, factory=sqlite3.Connection):
+    """
+    Opens a tuned connection: WAL journal (readers never wait for writers),
+    synchronous=NORMAL, memory-mapped reads, a larger page cache and a bigger
+    prepared-statement cache. Rows are sqlite3.Row.
+
+    Args:
+        database_file (str): SQLite database file.
+        readonly (bool): Open with mode=ro; writes raise sqlite3.OperationalError.
+        factory: Connection class, see `PooledConnection`.
+    """
+    _enable_wal(database_file)
+    if readonly:
+        uri = f"file:{quote(os.path.abspath(database_file))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT,
+                               cached_statements=STATEMENT_CACHE_SIZE, factory=factory)
+    else:
+        conn = sqlite3.connect(database_file, timeout=BUSY_TIMEOUT,
+                               cached_statements=STATEMENT_CACHE_SIZE, factory=factory)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def get_connection(database_file=DATABASE_FILE, readonly=False):
+    """
+    Returns this thread's pooled connection to `database_file`, opening it on
+    first use. Read-only and read-write connections are pooled separately.
+    """
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = {}
+    key = (os.path.abspath(database_file), readonly)
+    conn = pool.get(key)
+    if conn is None:
+        conn = pool[key] = connect(database_file, readonly, factory=PooledConnection)
+    return conn
+
+
+def close_pool():
+    """
+    Really closes the calling thread's pooled connections.
+    """
+    for conn in getattr(_local, "pool", {}).values():
+        conn.dispose()
+    _local.pool = {}
+
+
+def _reset_pool_after_fork():
+    # A forked worker process must not reuse its parent's SQLite handles
+    global _local
+    _local = threading.local()
+
+
+os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
 def get_db():
     if "db" not in g:
-        g.db = sqlite3.connect(DATABASE_FILE)
-        g.db.row_factory = sqlite3.Row
+        g.db = get_connection(DATABASE_FILE)
     return g.db
 
 def close_db(e=None):
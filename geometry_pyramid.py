@@ -0,0 +1,129 @@
+# geometry_pyramid.py
+import math
+import os
+import threading
+from shapely.geometry import mapping, shape
+from json_utils import dumps_geojson, load
+
+# Simplification tolerance (degrees) of each pyramid level; level 0 is the source geometry
+LEVEL_TOLERANCES = [0.0, 0.0005, 0.002, 0.01, 0.05, 0.25]
+
+PYRAMID_DIR = "pyramid"
+
+# Web map zoom range; ?zoom=... outside of it is clamped
+MIN_ZOOM = 0
+MAX_ZOOM = 22
+
+_lock = threading.Lock()
+
+
+def simplify_levels(geom):
+    """
+    Topology-preserving simplifications of `geom` for every level above 0.
+
+    Returns:
+        list[tuple]: (level, simplified geometry) pairs.
+    """
+    return [
+        (level, geom.simplify(tolerance, preserve_topology=True))
+        for level, tolerance in enumerate(LEVEL_TOLERANCES)
+        if level > 0
+    ]
+
+
+def level_for_tolerance(tolerance):
+    """
+    Returns the coarsest level whose tolerance does not exceed `tolerance` (degrees).
+    """
+    level = 0
+    for idx, level_tolerance in enumerate(LEVEL_TOLERANCES):
+        if level_tolerance <= tolerance:
+            level = idx
+    return level
+
+
+def level_for_zoom(zoom):
+    """
+    Picks the level that stays under half a pixel at a web map zoom level
+    (clamped to MIN_ZOOM..MAX_ZOOM).
+    """
+    zoom = min(max(zoom, MIN_ZOOM), MAX_ZOOM)
+    degrees_per_pixel = 360.0 / (256 * math.pow(2, zoom))
+    return level_for_tolerance(degrees_per_pixel / 2)
+
+
+def level_from_args(args):
+    """
+    Reads ?zoom=... or ?tolerance=... from request args.
+
+    Returns:
+        int: The pyramid level (0 when neither is given).
+
+    Raises:
+        ValueError: If the parameter is not a finite number.
+    """
+    for param, to_level in (("zoom", level_for_zoom), ("tolerance", level_for_tolerance)):
+        if args.get(param):
+            value = float(args[param])
+            if not math.isfinite(value):
+                raise ValueError(f"'{param}' must be a finite number")
+            return to_level(value)
+    return 0
+
+
+def zone_level_filename(filename, level):
+    """
+    Path of a zone file's pyramid level relative to the zone directory.
+    """
+    if level == 0:
+        return filename
+    stem = filename.rsplit(".", 1)[0]
+    return os.path.join(PYRAMID_DIR, f"{stem}.lod{level}.geojson")
+
+
+def build_zone_pyramid(zone_dir, filename):
+    """
+    Writes every simplified level of a zone file next to the source, in
+    `<zone_dir>/pyramid/<stem>.lod<N>.geojson`. Levels older than the
+    source are rebuilt; up-to-date ones are left alone.
+    """
+    source_path = os.path.join(zone_dir, filename)
+    if not os.path.exists(source_path):
+        return
+
+    with _lock:
+        source_mtime = os.path.getmtime(source_path)
+        stale = [
+            level for level in range(1, len(LEVEL_TOLERANCES))
+            if not os.path.exists(os.path.join(zone_dir, zone_level_filename(filename, level)))
+            or os.path.getmtime(os.path.join(zone_dir, zone_level_filename(filename, level))) < source_mtime
+        ]
+        if not stale:
+            return
+
+        print(f"Building simplification pyramid for {filename}...")
+        with open(source_path, "r", encoding="utf-8") as f:
+            zone_data = load(f)
+
+        os.makedirs(os.path.join(zone_dir, PYRAMID_DIR), exist_ok=True)
+        for level in stale:
+            tolerance = LEVEL_TOLERANCES[level]
+            features = []
+            for zfeat in zone_data.get("features", []):
+                geom = zfeat.get("geometry")
+                if not geom or not geom.get("type"):
+                    continue
+                simplified = shape(geom).simplify(tolerance, preserve_topology=True)
+                if simplified.is_empty:
+                    continue
+                features.append({
+                    "type": "Feature",
+                    "geometry": mapping(simplified),
+                    "properties": zfeat.get("properties") or {},
+                })
+
+            level_path = os.path.join(zone_dir, zone_level_filename(filename, level))
+            tmp_path = f"{level_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(dumps_geojson({"type": "FeatureCollection", "features": features}))
+            os.replace(tmp_path, level_path)
@@ -0,0 +1,202 @@
+# http_cache.py
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from flask import Response, g, request
+
+# brotli is optional: noticeably smaller than gzip on GeoJSON; without it only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+# Per-request compression trades ratio for speed...
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# ...precompressed bodies are made once per version and can afford a better ratio
+PRECOMPRESSED_GZIP_LEVEL = 9
+PRECOMPRESSED_BROTLI_QUALITY = 9
+# (key, coding) bodies kept in memory, least recently used dropped first
+PRECOMPRESSED_ENTRIES = 24
+
+_lock = threading.Lock()
+_precompressed = OrderedDict()
+_stats = {"precompressed_hits": 0, "precompressed_misses": 0, "not_modified": 0}
+
+
+def make_etag(*parts):
+    """
+    Builds an ETag value from whatever identifies a response's contents
+    (table versions, file hashes, levels).
+    """
+    return hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:24]
+
+
+def accepted_coding():
+    """
+    Returns the content coding to answer the current request with: "br" (when
+    brotli is installed), "gzip", or None for an uncompressed body.
+    """
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+
+def compress(data, coding, precompressed=False):
+    if coding == "br":
+        return brotli.compress(data, quality=PRECOMPRESSED_BROTLI_QUALITY if precompressed else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=PRECOMPRESSED_GZIP_LEVEL if precompressed else GZIP_LEVEL, mtime=0)
+
+
+def _compress_stream(chunks, coding):
+    # Compresses a streamed body chunk by chunk; closes the wrapped generator
+    # so its `finally` (e.g. returning a pooled connection) still runs
+    if coding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process, finish = compressor.compress, compressor.flush
+    try:
+        for chunk in chunks:
+            data = process(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+            if data:
+                yield data
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def conditional(etag, last_modified=None):
+    """
+    Validators of the current response. Returns a `304 Not Modified` response when
+    the request's If-None-Match (or, without one, If-Modified-Since) shows the
+    client already has this version, else None; `finish_response` then adds the
+    ETag and Last-Modified headers to the 200 response.
+
+    ETags are weak: the same contents are sent gzip, brotli or uncompressed.
+    """
+    g.validators = (etag, last_modified)
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    else:
+        fresh = (
+            last_modified is not None and request.if_modified_since is not None
+            and last_modified.replace(microsecond=0) <= request.if_modified_since
+        )
+    if not fresh:
+        return None
+    _stats["not_modified"] += 1
+    return _add_validators(Response(status=304), etag, last_modified)
+
+
+def vary(*headers):
+    """
+    Request headers besides Accept-Encoding that pick the current response's
+    representation; `finish_response` lists them in Vary (on 304s as well).
+    """
+    g.vary = g.get("vary", ()) + headers
+
+
+def _add_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Everything behind login_required: browsers may keep it, but must revalidate
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _cached_body(key, coding):
+    # The body of `key` in `coding`, compressing the stored uncompressed body if needed
+    with _lock:
+        entry = _precompressed.get((key, coding))
+        if entry is None and coding is not None:
+            raw = _precompressed.get((key, None))
+            if raw is not None:
+                entry = (compress(raw[0], coding, precompressed=True), raw[1])
+                _precompressed[(key, coding)] = entry
+        if entry is not None:
+            _precompressed.move_to_end((key, coding))
+            while len(_precompressed) > PRECOMPRESSED_ENTRIES:
+                _precompressed.popitem(last=False)
+        return entry
+
+
+def precompressed(key):
+    """
+    Returns the cached response for `key` in the coding the client accepts, or
+    None; in that case the 200 response of this request is stored under `key` by
+    `finish_response`. `key` must change whenever the body does (include the ETag).
+    """
+    coding = accepted_coding()
+    entry = _cached_body(key, coding)
+    if entry is None:
+        _stats["precompressed_misses"] += 1
+        g.precompress_key = key
+        return None
+
+    _stats["precompressed_hits"] += 1
+    body, mimetype = entry
+    response = Response(body, mimetype=mimetype)
+    if coding is not None:
+        response.headers["Content-Encoding"] = coding
+    return response
+
+
+def finish_response(response):
+    """
+    after_request hook: adds the validators given to `conditional`, stores the body
+    for `precompressed`, and compresses the body (streamed ones chunk by chunk)
+    in the coding the client accepts.
+    """
+    validators = g.pop("validators", None)
+    key = g.pop("precompress_key", None)
+    response.vary.add("Accept-Encoding")
+    for header in g.pop("vary", ()):
+        response.vary.add(header)
+    if response.status_code != 200:
+        return response
+    if validators is not None:
+        _add_validators(response, *validators)
+    if response.direct_passthrough or "Content-Encoding" in response.headers:
+        return response
+
+    coding = accepted_coding()
+    if response.is_streamed:
+        if coding is not None:
+            response.response = _compress_stream(response.response, coding)
+            response.headers["Content-Encoding"] = coding
+        return response
+
+    body = response.get_data()
+    if key is not None:
+        with _lock:
+            _precompressed[(key, None)] = (body, response.mimetype)
+        if coding is not None:
+            response.set_data(_cached_body(key, coding)[0])
+            response.headers["Content-Encoding"] = coding
+    elif coding is not None and len(body) >= MIN_COMPRESS_BYTES:
+        response.set_data(compress(body, coding))
+        response.headers["Content-Encoding"] = coding
+    return response
+
+
+def http_cache_stats():
+    """
+    Returns 304 / precompressed-body counters and what is currently cached.
+    """
+    with _lock:
+        cached_bytes = sum(len(body) for body, _ in _precompressed.values())
+        entries = len(_precompressed)
+    return {
+        **_stats,
+        "precompressed_entries": entries,
+        "precompressed_bytes": cached_bytes,
+        "brotli": brotli is not None,
+    }
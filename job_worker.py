@@ -0,0 +1,24 @@
+# job_worker.py
+import argparse
+import converter_bp  # noqa: F401  (registers the xlsx and kml job handlers)
+from db_utils import DATABASE_FILE
+from jobs import JOB_WORKERS, init_jobs, start_job_workers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the XLSX/KML conversion job workers outside the web processes "
+                    "(start the web server with JOB_WORKERS=0)."
+    )
+    parser.add_argument("--database", default=DATABASE_FILE, help="SQLite database file")
+    parser.add_argument("--workers", type=int, default=max(JOB_WORKERS, 1), help="Worker threads")
+    args = parser.parse_args()
+
+    init_jobs(args.database)
+    threads = start_job_workers(args.database, args.workers)
+    print(f"Running {len(threads)} conversion job workers; Ctrl+C to stop.")
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        pass
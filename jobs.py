@@ -0,0 +1,350 @@
+# jobs.py
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import traceback
+import uuid
+from werkzeug.utils import secure_filename
+from db_utils import DATABASE_FILE, connect, get_connection
+from json_utils import dumps, loads
+
+# Uploads waiting for (or being) converted live here until their job finishes
+JOBS_DIR = os.path.join("static", "uploads", "jobs")
+# Background threads claiming queued conversion jobs in the serving process; with
+# several web processes (gunicorn) set 0 and run job_worker.py next to them instead
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Seconds an idle worker waits before polling the jobs table again
+JOB_POLL_SECONDS = 2.0
+# Idle polls between checks for jobs left "running" by a dead process
+ORPHAN_CHECK_POLLS = 15
+# A running job's lease: its worker renews `updated_at` every quarter of this while it
+# runs; a job not renewed for this long belongs to a dead process and is queued again
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+# Runs a job gets; one whose worker died this often (e.g. OOM-killed by its file) fails instead
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+_handlers = {}
+_wakeup = threading.Event()
+_start_lock = threading.Lock()
+_started = False
+
+
+def create_job_tables(cursor):
+    """
+    Creates `conversion_jobs`: one row per uploaded file waiting for, running
+    or finished with its conversion. `worker` is the "host:pid" of the process
+    that claimed the job; `updated_at` of a running job is its lease, renewed
+    while the job runs, so jobs of a process that died can be queued again.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS conversion_jobs(
+            job_id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            user_id INTEGER,
+            filename TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            options TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            sheets_total INTEGER NOT NULL DEFAULT 0,
+            sheets_done INTEGER NOT NULL DEFAULT 0,
+            rows_parsed INTEGER NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            worker TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL DEFAULT (datetime('now')),
+            updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    """)
+    _add_options_column(cursor)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_conversion_jobs_status
+        ON conversion_jobs(status, created_at)
+    """)
+
+
+def _add_options_column(cursor):
+    """
+    Adds the `options` column to a `conversion_jobs` table created before it existed.
+    """
+    cursor.execute("PRAGMA table_info(conversion_jobs)")
+    if "options" not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE conversion_jobs ADD COLUMN options TEXT")
+
+
+def register_job_handler(kind, handler):
+    """
+    Registers the function that converts jobs of `kind`.
+
+    The handler is called as handler(file_path, progress, options) and returns a
+    JSON-serializable result. `progress(sheets_done, sheets_total, rows_parsed)`
+    records how far the conversion got; `options` is the dict given to submit_job.
+    """
+    _handlers[kind] = handler
+
+
+def init_jobs(database_file=DATABASE_FILE):
+    """
+    Creates the jobs table and queues again any job a dead process was running.
+    Starts no workers, see `start_job_workers`.
+    """
+    conn = get_connection(database_file)
+    create_job_tables(conn.cursor())
+    requeue_orphaned_jobs(conn)
+    conn.commit()
+
+
+def start_job_workers(database_file=DATABASE_FILE, workers=JOB_WORKERS):
+    """
+    Starts the background workers of this process, once. Call it from the
+    process that serves requests (or job_worker.py), not at import time: the
+    debug reloader's watcher process must not run jobs.
+
+    Returns:
+        list[threading.Thread]: The started threads; empty if already started.
+    """
+    global _started
+    if _started:
+        return []
+    with _start_lock:
+        if _started:
+            return []
+        _started = True
+
+    threads = []
+    for idx in range(workers):
+        thread = threading.Thread(
+            target=_worker_loop,
+            args=(database_file,),
+            name=f"conversion-job-{idx}",
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+def submit_job(kind, uploaded_file, user_id=None, options=None, database_file=DATABASE_FILE):
+    """
+    Saves an uploaded file under JOBS_DIR and queues its conversion.
+
+    Args:
+        kind (str): Registered handler kind ("xlsx" or "kml").
+        uploaded_file: The werkzeug FileStorage from request.files.
+        user_id (int | None): Owner of the job; only they can read its status.
+        options (dict | None): Handler options, e.g. the KML cable grouping rule.
+
+    Returns:
+        str: The new job id.
+    """
+    if kind not in _handlers:
+        raise ValueError(f"No conversion handler for '{kind}' files.")
+
+    job_id = uuid.uuid4().hex
+    filename = secure_filename(uploaded_file.filename) or f"upload.{kind}"
+    job_dir = os.path.join(JOBS_DIR, job_id)
+    os.makedirs(job_dir, exist_ok=True)
+    file_path = os.path.join(job_dir, filename)
+    uploaded_file.save(file_path)
+
+    with get_connection(database_file) as conn:
+        conn.execute(
+            """
+            INSERT INTO conversion_jobs(job_id, kind, user_id, filename, file_path, options)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (job_id, kind, user_id, filename, file_path, dumps(options or {})),
+        )
+
+    print(f"DEBUG: Queued {kind} conversion job {job_id} for '{filename}'.")
+    _wakeup.set()
+    return job_id
+
+
+def get_job(job_id, database_file=DATABASE_FILE):
+    """
+    Returns a job's status, progress and (once done) result, or None if there
+    is no such job.
+    """
+    row = get_connection(database_file, readonly=True).execute(
+        """
+        SELECT job_id, kind, user_id, filename, status, sheets_total, sheets_done,
+               rows_parsed, result, error, attempts, created_at, updated_at
+        FROM conversion_jobs WHERE job_id = ?
+        """,
+        (job_id,),
+    ).fetchone()
+    if row is None:
+        return None
+
+    job = dict(row)
+    job["result"] = loads(job["result"]) if job["result"] else None
+    return job
+
+
+def _worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def requeue_orphaned_jobs(conn):
+    """
+    Puts running jobs whose lease expired back in the queue: the process that
+    claimed them is gone, e.g. after a web worker restart (a restarted container
+    may well reuse its pid, so the pid is not checked). Their progress starts
+    over; jobs that already had JOB_MAX_ATTEMPTS runs are marked failed instead.
+
+    Returns:
+        int: Number of jobs queued again.
+    """
+    orphaned = []
+    for job_id, attempts, file_path in conn.execute(
+        """
+        SELECT job_id, attempts, file_path FROM conversion_jobs
+        WHERE status = 'running' AND updated_at < datetime('now', ?)
+        """,
+        (f"-{JOB_LEASE_SECONDS} seconds",),
+    ).fetchall():
+        if attempts >= JOB_MAX_ATTEMPTS:
+            _give_up(conn, job_id, attempts, file_path)
+        else:
+            orphaned.append(job_id)
+
+    for job_id in orphaned:
+        conn.execute(
+            """
+            UPDATE conversion_jobs
+            SET status = 'queued', worker = NULL, sheets_done = 0, rows_parsed = 0,
+                updated_at = datetime('now')
+            WHERE job_id = ? AND status = 'running' AND updated_at < datetime('now', ?)
+            """,
+            (job_id, f"-{JOB_LEASE_SECONDS} seconds"),
+        )
+    if orphaned:
+        print(f"DEBUG: Re-queued {len(orphaned)} orphaned conversion jobs.")
+        _wakeup.set()
+    return len(orphaned)
+
+
+def _give_up(conn, job_id, attempts, file_path):
+    conn.execute(
+        """
+        UPDATE conversion_jobs
+        SET status = 'failed', error = ?, updated_at = datetime('now')
+        WHERE job_id = ? AND status = 'running'
+        """,
+        (f"The conversion was interrupted {attempts} times; the file may be too large to convert.", job_id),
+    )
+    print(f"DEBUG: Conversion job {job_id} failed after {attempts} interrupted attempts.")
+    shutil.rmtree(os.path.dirname(file_path), ignore_errors=True)
+
+
+def _claim_next(conn):
+    # One statement so two workers (threads or processes) never claim the same job
+    row = conn.execute(
+        """
+        UPDATE conversion_jobs
+        SET status = 'running', worker = ?, attempts = attempts + 1,
+            updated_at = datetime('now')
+        WHERE job_id = (
+            SELECT job_id FROM conversion_jobs
+            WHERE status = 'queued'
+            ORDER BY created_at, rowid
+            LIMIT 1
+        )
+        AND status = 'queued'
+        RETURNING job_id, kind, file_path, options
+        """,
+        (_worker_name(),),
+    ).fetchone()
+    conn.commit()
+    return row
+
+
+def _finish(conn, job_id, status, result=None, error=None):
+    conn.execute(
+        """
+        UPDATE conversion_jobs
+        SET status = ?, result = ?, error = ?, updated_at = datetime('now')
+        WHERE job_id = ?
+        """,
+        (status, dumps(result) if result is not None else None, error, job_id),
+    )
+    conn.commit()
+
+
+def _renew_lease(database_file, job_id, stop):
+    # Renews the lease of a running job until `stop` is set, on its own
+    # connection: the job's thread may be busy in a long sheet for minutes
+    conn = connect(database_file)
+    try:
+        while not stop.wait(JOB_LEASE_SECONDS / 4):
+            conn.execute(
+                "UPDATE conversion_jobs SET updated_at = datetime('now') WHERE job_id = ? AND status = 'running'",
+                (job_id,),
+            )
+            conn.commit()
+    except sqlite3.Error:
+        traceback.print_exc()
+    finally:
+        conn.close()
+
+
+def _run_job(conn, database_file, job_id, kind, file_path, options):
+    def progress(sheets_done, sheets_total, rows_parsed):
+        conn.execute(
+            """
+            UPDATE conversion_jobs
+            SET sheets_done = ?, sheets_total = ?, rows_parsed = ?, updated_at = datetime('now')
+            WHERE job_id = ?
+            """,
+            (sheets_done, sheets_total, rows_parsed, job_id),
+        )
+        conn.commit()
+
+    print(f"DEBUG: Running {kind} conversion job {job_id}...")
+    stop = threading.Event()
+    threading.Thread(
+        target=_renew_lease, args=(database_file, job_id, stop), name=f"job-lease-{job_id}", daemon=True,
+    ).start()
+    try:
+        handler = _handlers.get(kind)
+        if handler is None:
+            raise ValueError(f"No conversion handler for '{kind}' files.")
+        result = handler(file_path, progress, loads(options) if options else {})
+    except Exception as e:
+        traceback.print_exc()
+        _finish(conn, job_id, "failed", error=str(e))
+    else:
+        _finish(conn, job_id, "done", result=result)
+        print(f"DEBUG: Conversion job {job_id} done.")
+    finally:
+        stop.set()
+
+    # The upload is only kept so an interrupted job can be run again
+    shutil.rmtree(os.path.dirname(file_path), ignore_errors=True)
+
+
+def _worker_loop(database_file):
+    conn = get_connection(database_file)
+    idle_polls = 0
+    while True:
+        try:
+            job = _claim_next(conn)
+            if job is not None:
+                idle_polls = 0
+                _run_job(conn, database_file, *job)
+                continue
+
+            idle_polls += 1
+            if idle_polls % ORPHAN_CHECK_POLLS == 0:
+                requeue_orphaned_jobs(conn)
+                conn.commit()
+        except sqlite3.Error:
+            traceback.print_exc()
+
+        _wakeup.wait(JOB_POLL_SECONDS)
+        _wakeup.clear()
@@ -0,0 +1,163 @@
+# json_utils.py
+import json
+import os
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is optional: several times faster both ways, same output otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+# Decimal places kept for coordinates written to GeoJSON documents; 7 places is
+# about 1 cm of longitude/latitude, far below the accuracy of any cable route
+GEOJSON_PRECISION = int(os.getenv("GEOJSON_PRECISION", "7"))
+
+
+def _default(obj):
+    # NumPy arrays and scalars, then anything with a __geo_interface__ (shapely, geojson)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "__geo_interface__"):
+        return obj.__geo_interface__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj, pretty=False, precision=None, sort_keys=False, default=None):
+    """
+    Encodes `obj` as JSON text with orjson when available, else the standard library.
+
+    Output is compact (no whitespace, non-ASCII kept as UTF-8) unless `pretty`
+    asks for 2-space indentation. NaN is written as null by orjson and as NaN
+    by the standard library.
+
+    Args:
+        obj: Any JSON-serializable value; NumPy values and objects with a
+             __geo_interface__ are converted.
+        pretty (bool): Indent the output, only for files meant to be read by people.
+        precision (int | None): Round GeoJSON coordinates to this many decimal
+                                places (see `round_coordinates`); None keeps them.
+        sort_keys (bool): Sort object keys.
+        default (callable | None): Converts values the above does not handle;
+                                   should raise TypeError for anything else.
+
+    Returns:
+        str: The JSON text.
+    """
+    if precision is not None:
+        obj = round_coordinates(obj, precision)
+
+    def convert(value):
+        try:
+            return _default(value)
+        except TypeError:
+            if default is None:
+                raise
+            return default(value)
+
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=convert, option=option).decode("utf-8")
+
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if pretty else None,
+        separators=None if pretty else (",", ":"),
+        sort_keys=sort_keys,
+        default=convert,
+    )
+
+
+def dumps_geojson(obj, pretty=False):
+    """
+    Encodes a GeoJSON object with coordinates rounded to GEOJSON_PRECISION places.
+    """
+    return dumps(obj, pretty=pretty, precision=GEOJSON_PRECISION)
+
+
+def loads(text):
+    """
+    Decodes JSON text (str or bytes).
+
+    Raises:
+        json.JSONDecodeError: If the text is not valid JSON (orjson's error is a subclass).
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def load(file):
+    """
+    Decodes the JSON contents of an open file.
+    """
+    return loads(file.read())
+
+
+def _round_positions(coordinates, precision):
+    first = coordinates[0] if len(coordinates) else None
+    if isinstance(first, (int, float)):
+        return [round(value, precision) for value in coordinates]
+    if first is not None and len(first) and isinstance(first[0], (int, float)):
+        # A line or ring: round all its positions in one NumPy call
+        try:
+            return np.round(np.asarray(coordinates, dtype=float), precision).tolist()
+        except ValueError:
+            # Positions with and without depth
+            return [[round(value, precision) for value in position] for position in coordinates]
+    return [_round_positions(part, precision) for part in coordinates]
+
+
+def round_coordinates(obj, precision=GEOJSON_PRECISION):
+    """
+    Returns a copy of a GeoJSON FeatureCollection, Feature or geometry (or a list
+    of them) with every coordinate rounded to `precision` decimal places.
+    Properties and anything that is not GeoJSON are returned unchanged.
+    """
+    if isinstance(obj, list):
+        return [round_coordinates(item, precision) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+
+    geojson_type = obj.get("type")
+    if geojson_type == "FeatureCollection" and isinstance(obj.get("features"), list):
+        return {**obj, "features": [round_coordinates(feature, precision) for feature in obj["features"]]}
+    if geojson_type == "Feature" and isinstance(obj.get("geometry"), dict):
+        return {**obj, "geometry": round_coordinates(obj["geometry"], precision)}
+    if geojson_type == "GeometryCollection" and isinstance(obj.get("geometries"), list):
+        return {**obj, "geometries": [round_coordinates(geom, precision) for geom in obj["geometries"]]}
+    if isinstance(obj.get("coordinates"), (list, tuple)):
+        return {**obj, "coordinates": _round_positions(obj["coordinates"], precision)}
+    return obj
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by `dumps` / `loads`, so jsonify and request.json
+    use orjson when it is installed. Keeps Flask's key sorting, its pretty-printing
+    in debug mode and its `default` conversions (Decimal, UUID, dataclasses...);
+    without orjson it is Flask's stock provider plus NumPy / __geo_interface__ values.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            kwargs.setdefault("default", self._convert)
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, pretty=bool(kwargs.get("indent")), sort_keys=self.sort_keys, default=self.default)
+
+    def _convert(self, obj):
+        try:
+            return _default(obj)
+        except TypeError:
+            return self.default(obj)
+
+    def loads(self, s, **kwargs):
+        return loads(s)
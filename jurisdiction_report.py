@@ -0,0 +1,233 @@
+# jurisdiction_report.py
+import argparse
+import csv
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+from cable_store import fetch_name_keys, init_cable_store
+from db_utils import DATABASE_FILE
+from zone_crossings import (
+    compute_crossings, compute_crossings_parallel, create_crossing_tables,
+    record_zone_versions, stale_zones, write_crossings, zone_versions,
+)
+from zone_layers import ZONE_FILES
+
+# Output format -> mimetype
+REPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+# Cable names per process pool task; fewer changed names than this are computed in-process
+CHUNK_SIZE = 25
+# Worker processes for the /api/reports/jurisdictions endpoint (default: CPU count)
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "0")) or None
+
+_report_lock = threading.Lock()
+
+
+def create_report_tables(cursor):
+    """
+    Creates `jurisdiction_report_state`: the fingerprint of every cable name as of
+    the last report run, so the next incremental run only recomputes the names
+    whose geometries (or the zone files) changed since.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jurisdiction_report_state(
+            name_key TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            computed_at TEXT NOT NULL
+        )
+    """)
+
+
+def cable_fingerprints(conn, versions):
+    """
+    Returns {name_key: fingerprint}: a hash of every stored geometry of that name
+    and of the zone `versions` its crossings are computed against.
+    """
+    salt = "|".join(f"{label}={version}" for label, version in sorted(versions.items())).encode("utf-8")
+    fingerprints = {}
+    current, digest = None, None
+    cur = conn.cursor()
+    cur.execute("SELECT name_key, geometry_wkb FROM cable_features ORDER BY name_key, feature_id")
+    for name_key, geometry_wkb in cur:
+        if name_key != current:
+            if digest is not None:
+                fingerprints[current] = digest.hexdigest()
+            current, digest = name_key, hashlib.sha1(salt)
+        digest.update(geometry_wkb or b"")
+    if digest is not None:
+        fingerprints[current] = digest.hexdigest()
+    return fingerprints
+
+
+def update_crossings(database_file=DATABASE_FILE, full=False, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Brings `cable_zone_crossings` up to date for a report. Only the cable names
+    whose fingerprint changed since the last run are recomputed, with a process
+    pool split across names when there are more than `chunk_size` of them; `full`
+    (or a changed zone file) recomputes every name.
+
+    Returns:
+        dict: "cables", "recomputed" and "removed" name counts, "crossings" rows written.
+    """
+    with sqlite3.connect(database_file) as conn:
+        cur = conn.cursor()
+        create_crossing_tables(cur)
+        create_report_tables(cur)
+
+        name_keys = fetch_name_keys(conn)
+        fingerprints = cable_fingerprints(conn, zone_versions())
+        cur.execute("SELECT name_key, fingerprint FROM jurisdiction_report_state")
+        previous = dict(cur.fetchall())
+
+        stale = stale_zones(conn)
+        rebuild_all = full or bool(stale)
+        if rebuild_all:
+            pending = name_keys
+        else:
+            pending = [name_key for name_key in name_keys if previous.get(name_key) != fingerprints.get(name_key)]
+        removed = [name_key for name_key in previous if name_key not in fingerprints]
+
+        if len(pending) > chunk_size and workers != 1:
+            rows = compute_crossings_parallel(database_file, pending, None, workers, chunk_size)
+        else:
+            rows = compute_crossings(conn, pending)
+
+        write_crossings(conn, rows, None if rebuild_all else pending + removed)
+        if rebuild_all:
+            record_zone_versions(conn)
+        cur.executemany("DELETE FROM jurisdiction_report_state WHERE name_key = ?", [(n,) for n in removed])
+        cur.executemany("""
+            INSERT OR REPLACE INTO jurisdiction_report_state (name_key, fingerprint, computed_at)
+            VALUES (?, ?, datetime('now'))
+        """, [(name_key, fingerprints[name_key]) for name_key in pending if name_key in fingerprints])
+        conn.commit()
+
+    return {"cables": len(name_keys), "recomputed": len(pending), "removed": len(removed), "crossings": len(rows)}
+
+
+def report_rows(conn):
+    """
+    The cable x zone matrix: one row per cable name and country with the crossed
+    length in km per zone type (zone types overlap, so they are not added up) and
+    the number of crossings. Cables that cross no zone get one row without a country.
+
+    Returns:
+        tuple: (columns, rows) with rows as lists, sorted by cable and country name.
+    """
+    zone_labels = list(ZONE_FILES)
+    columns = ["cable_name", "country_name"] + [f"{label}_km" for label in zone_labels] + ["crossings"]
+
+    cur = conn.cursor()
+    cur.execute("SELECT name_key, MIN(name) FROM cable_features GROUP BY name_key")
+    display_names = dict(cur.fetchall())
+
+    cur.execute("""
+        SELECT name_key, COALESCE(country_name, 'Unknown'), zone_label, COUNT(*), SUM(intersection_km)
+        FROM cable_zone_crossings
+        GROUP BY 1, 2, 3
+    """)
+    # name_key -> country_name -> [km per zone..., crossings]
+    matrix = {}
+    for name_key, country_name, zone_label, count, length_km in cur.fetchall():
+        if name_key not in display_names or zone_label not in zone_labels:
+            continue
+        values = matrix.setdefault(name_key, {}).setdefault(country_name, [0.0] * len(zone_labels) + [0])
+        values[zone_labels.index(zone_label)] += length_km
+        values[-1] += count
+
+    rows = []
+    for name_key in sorted(display_names):
+        cable_name = display_names[name_key] or name_key
+        countries = matrix.get(name_key, {})
+        if not countries:
+            rows.append([cable_name, None] + [0.0] * len(zone_labels) + [0])
+        for country_name in sorted(countries):
+            values = countries[country_name]
+            rows.append([cable_name, country_name] + [round(km, 3) for km in values[:-1]] + [values[-1]])
+    return columns, rows
+
+
+def write_report(columns, rows, output, fmt):
+    """
+    Writes the report to `output` (a path or a binary file object) as CSV, XLSX or Parquet.
+
+    Raises:
+        ValueError: For an unknown format, or Parquet without pyarrow / fastparquet installed.
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"'format' must be one of: {', '.join(REPORT_FORMATS)}")
+
+    if fmt == "csv":
+        if isinstance(output, str):
+            with open(output, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows([columns] + rows)
+        else:
+            text = io.TextIOWrapper(output, encoding="utf-8", newline="")
+            csv.writer(text).writerows([columns] + rows)
+            text.detach()
+        return
+
+    df = pd.DataFrame(rows, columns=columns)
+    if fmt == "xlsx":
+        df.to_excel(output, index=False, sheet_name="Jurisdictions", engine="openpyxl")
+    else:
+        try:
+            df.to_parquet(output, index=False)
+        except ImportError:
+            raise ValueError("Parquet output needs pyarrow or fastparquet installed")
+
+
+def build_report(output, fmt="csv", database_file=DATABASE_FILE, full=False, workers=None):
+    """
+    Updates the crossings (incrementally unless `full`) and writes the whole-network
+    jurisdiction report to `output`. Runs one at a time per process.
+
+    Returns:
+        dict: The `update_crossings` counts plus "rows" and "elapsed" seconds.
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"'format' must be one of: {', '.join(REPORT_FORMATS)}")
+
+    start = time.perf_counter()
+    with _report_lock:
+        stats = update_crossings(database_file, full=full, workers=workers)
+        with sqlite3.connect(database_file) as conn:
+            columns, rows = report_rows(conn)
+        write_report(columns, rows, output, fmt)
+
+    stats["rows"] = len(rows)
+    stats["elapsed"] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write the km of every cable per country and zone type as CSV, XLSX or Parquet."
+    )
+    parser.add_argument("output", help="Report file; the format follows the extension unless --format is given")
+    parser.add_argument("--format", choices=sorted(REPORT_FORMATS), default=None)
+    parser.add_argument("--database", default=DATABASE_FILE, help="SQLite database file")
+    parser.add_argument("--full", action="store_true",
+                        help="Recompute every cable, not only those changed since the last run")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if fmt not in REPORT_FORMATS:
+        parser.error(f"Unknown report format '{fmt}'; use --format {{{','.join(sorted(REPORT_FORMATS))}}}")
+
+    # Legacy Cables rows are part of the network too
+    init_cable_store(args.database)
+    try:
+        stats = build_report(args.output, fmt, args.database, args.full, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Recomputed {stats['recomputed']} of {stats['cables']} cables ({stats['crossings']} crossings, "
+          f"{stats['removed']} removed); wrote {stats['rows']} rows to {args.output} in {stats['elapsed']:.2f}s.")
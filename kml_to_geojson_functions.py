@@ -1,122 +1,254 @@
 import os
-import xml.etree.ElementTree as ET
+import re
+import zipfile
+from contextlib import contextmanager
 import geojson
+import numpy as np
+from lxml import etree
+from json_utils import dumps_geojson
 
-def process_kml_file(kml_file_path):
+# Tags are matched in any namespace: exports use KML 2.1/2.2, Google's gx extension or none
+PLACEMARK_TAG = "{*}Placemark"
+CONTAINER_TAGS = ("{*}Folder", "{*}Document")
+LINE_TAGS = ("{*}LineString", "{*}LinearRing", "{*}Track")
+
+# Default cable grouping rule for process_kml_file (see cable_group_key); unset groups by first word
+KML_GROUP_BY = os.getenv("KML_GROUP_BY")
+GROUP_PROPERTY_PREFIX = "property:"
+
+
+@contextmanager
+def open_kml_source(file_path):
+    """
+    Opens a .kml file, or the main document of a .kmz archive (doc.kml, else the
+    first .kml entry), as a binary stream; the file or archive is closed on exit.
+    """
+    if not zipfile.is_zipfile(file_path):
+        with open(file_path, "rb") as source:
+            yield source
+        return
+
+    with zipfile.ZipFile(file_path) as archive:
+        kml_names = [name for name in archive.namelist() if name.lower().endswith(".kml")]
+        if not kml_names:
+            raise ValueError("KMZ archive contains no .kml document.")
+        main_name = "doc.kml" if "doc.kml" in kml_names else kml_names[0]
+        with archive.open(main_name) as source:
+            yield source
+
+
+def parse_coordinates(text):
+    """
+    Parses the text of a <coordinates> element ("lon,lat[,alt] lon,lat[,alt] ...")
+    into an (n, 2) or (n, 3) float array. Tuples with a mixed number of values are
+    padded to three with an altitude of 0.
+    """
+    tuples = (text or "").split()
+    if not tuples:
+        return np.empty((0, 3))
+
+    dims = tuples[0].count(",") + 1
+    if text.count(",") == len(tuples) * (dims - 1):
+        values = np.array(text.replace(",", " ").split(), dtype=float)
+        if values.size == len(tuples) * dims:
+            return values.reshape(-1, dims)
+
+    points = np.zeros((len(tuples), 3))
+    for idx, coord in enumerate(tuples):
+        parts = coord.split(",")[:3]
+        points[idx, :len(parts)] = [float(part) for part in parts]
+    return points
+
+
+def _line_coordinates(element):
+    if element.tag.endswith("}Track") or element.tag == "Track":
+        # gx:Track: one "lon lat alt" per <gx:coord>
+        coords = [coord.text for coord in element.iterchildren("{*}coord") if coord.text]
+        if not coords:
+            return np.empty((0, 3))
+        return np.array(" ".join(coords).split(), dtype=float).reshape(len(coords), -1)
+
+    coordinates = element.find("{*}coordinates")
+    return parse_coordinates(coordinates.text if coordinates is not None else "")
+
+
+def iter_placemarks(file_path):
+    """
+    Streams the placemarks of a KML or KMZ file with lxml's iterparse, clearing
+    each one once it has been read so memory stays flat on large exports.
+
+    Every LineString, LinearRing and gx:Track of a placemark is read, including
+    those inside MultiGeometry and gx:MultiTrack. Standalone points are skipped.
+
+    Yields:
+        dict: 'name', 'lines', a list of (n, 2|3) coordinate arrays with at least
+              two points each, and 'properties', the placemark's ExtendedData values.
+              Placemarks without such lines are left out.
+    """
+    with open_kml_source(file_path) as source:
+        for _, placemark in etree.iterparse(
+            source, events=("end",), tag=(PLACEMARK_TAG,) + CONTAINER_TAGS, huge_tree=True,
+            remove_blank_text=True,
+        ):
+            if not placemark.tag.endswith("}Placemark") and placemark.tag != "Placemark":
+                # A finished Folder / Document: its placemarks were all read already
+                _drop_read_elements(placemark)
+                continue
+
+            name = placemark.findtext("{*}name")
+            properties = _extended_data(placemark)
+            lines = [
+                coords
+                for element in placemark.iter(*LINE_TAGS)
+                for coords in (_line_coordinates(element),)
+                if len(coords) > 1
+            ]
+
+            _drop_read_elements(placemark)
+
+            if lines:
+                yield {
+                    "name": name.strip() if name and name.strip() else "Unnamed Placemark",
+                    "lines": lines,
+                    "properties": properties,
+                }
+
+
+def _drop_read_elements(element):
+    # Clears `element` and removes everything read before it, at every level up
+    # to the root, so earlier Folders / Documents do not stay attached either
+    element.clear()
+    for node in (element, *element.iterancestors()):
+        while node.getprevious() is not None:
+            del node.getparent()[0]
+
+
+def _extended_data(placemark):
+    # <ExtendedData><Data name=".."><value>..</value></Data> and <SchemaData><SimpleData name="..">
+    properties = {}
+    for data in placemark.iterfind("{*}ExtendedData/{*}Data"):
+        if data.get("name"):
+            properties[data.get("name")] = data.findtext("{*}value")
+    for data in placemark.iterfind("{*}ExtendedData/{*}SchemaData/{*}SimpleData"):
+        if data.get("name"):
+            properties[data.get("name")] = data.text
+    return properties
+
+
+def first_word(name):
+    """
+    Default cable grouping: the first word of the placemark name.
+    """
+    return name.split()[0]
+
+
+def cable_group_key(group_by=None):
     """
-    Converts a KML file to GeoJSON files, with metadata conforming to the specified schema.
-    
+    Builds the function that maps a placemark (as yielded by `iter_placemarks`)
+    to the name of the cable it belongs to.
+
     Args:
-        kml_file_path (str): The path to the KML file.
+        group_by: None for the first word of the name (KML_GROUP_BY when set),
+                  "property:<key>" to group by an ExtendedData value,
+                  a regex (string or compiled) searched in the name; its first
+                  group is used when it has one, else the whole match,
+                  or a callable taking the placemark dict.
+        Placemarks the rule does not match (or whose group is empty, e.g. an
+        optional group that did not take part) fall back to the first word.
     """
-    def parse_kml(file_path):
-        """
-        Parses a KML file and extracts placemark information, filtering out standalone points.
-        
-        Args:
-            file_path (str): The path to the KML file.
-        
-        Returns:
-            list[dict]: A list of dictionaries, each containing 'name' and 'coordinates' for placemarks
-                        with more than one coordinate.
-        """
-        namespace = {'kml': 'http://www.opengis.net/kml/2.2'}
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        
-        # Initialize a list to store placemark information
-        placemarks = []
-        
-        # Parse through all Placemark elements
-        for placemark in root.findall('.//kml:Placemark', namespace):
-
-            name = placemark.find('kml:name', namespace)
-            name = name.text if name is not None else "Unnamed Placemark"
-            
-            coordinates = placemark.find('.//kml:coordinates', namespace)
-            if coordinates is not None:
-                # Parse coordinates (longitude, latitude, altitude)
-                points = [list(map(float, coord.strip().split(','))) for coord in coordinates.text.strip().split()]
-            else:
-                points = []
-            
-            # Include only placemarks with more than one coordinate
-            if len(points) > 1:
-                placemarks.append({'name': name, 'coordinates': points})
-        
-        return placemarks
-
-    def create_geojson(features):
-        """
-        Creates a GeoJSON FeatureCollection with metadata based on specified parameters.
-
-        Args:
-            features (list[dict]): A list of features, each containing 'coordinates' and other metadata.
-
-        Returns:
-            str: The GeoJSON encoding as a formatted string.
-        """
-        geojson_features = []
-        for feature in features:
-            metadata = {
-                "Buried Depth": feature.get('buried_depth', None),
-                "Category of Cable": feature.get('category_of_cable', None),
-                "Condition": feature.get('condition', None),
-                "[Feature Name]: Language": feature.get('feature_language', None),
-                "[Feature Name]: Name": feature.get('feature_name', None),
-                "[Feature Name]: Name Usage": feature.get('feature_name_usage', None),
-                "[Fixed Date Range]: Date End": feature.get('date_end', None),
-                "[Fixed Date Range]: Date Start": feature.get('date_start', None),
-                "Status": feature.get('status', None),
-                "Scale Minimum": feature.get('scale_minimum', None),
-                "[Information]: File Locator": feature.get('file_locator', None),
-                "[Information]: File Reference": feature.get('file_reference', None),
-                "[Information]: Headline": feature.get('headline', None),
-                "[Information]: Language": feature.get('information_language', None),
-                "[Information]: Text": feature.get('information_text', None),
-                "Feature Association: Component of": feature.get('component_of', None),
-                "Feature Association: Updates": feature.get('updates', None),
-                "Feature Association: Positions": feature.get('positions', None),
-                "Feature Association: Provides Information": feature.get('provides_information', None),
-            }
-
-            geojson_feature = geojson.Feature(
-                geometry=geojson.LineString(feature['coordinates']),
-                properties=metadata
-            )
-            geojson_features.append(geojson_feature)
-
-        feature_collection = geojson.FeatureCollection(geojson_features)
-
-        # Encode
-        return geojson.dumps(feature_collection, indent=2)
-    
-    placemarks = parse_kml(kml_file_path)
-    cable_groups = {}
+    group_by = group_by or KML_GROUP_BY
+    if not group_by:
+        return lambda placemark: first_word(placemark["name"])
+    if callable(group_by):
+        return group_by
 
-    for placemark in placemarks:
-        # Extract name for metadata and file name
-        feature_name = placemark['name']
-        cable_name = feature_name.split()[0]  # Assuming the cable name is the first word in the feature name
+    if isinstance(group_by, str) and group_by.startswith(GROUP_PROPERTY_PREFIX):
+        key = group_by[len(GROUP_PROPERTY_PREFIX):]
 
-        if cable_name not in cable_groups:
-            cable_groups[cable_name] = []
-        
-        cable_groups[cable_name].append({
-            'coordinates': placemark['coordinates'],
-            'feature_name': feature_name
-        })
+        def by_property(placemark):
+            value = placemark["properties"].get(key)
+            return value.strip() if value and value.strip() else first_word(placemark["name"])
+        return by_property
 
-    for cable_name, features in cable_groups.items():
-        # File path for the GeoJSON file
-        # file_path = os.path.join(os.getcwd(), f"{cable_name}.geojson")
+    pattern = re.compile(group_by) if isinstance(group_by, str) else group_by
+
+    def by_pattern(placemark):
+        match = pattern.search(placemark["name"])
+        key = (match.group(1) if pattern.groups else match.group(0)) if match else None
+        return key.strip() if key and key.strip() else first_word(placemark["name"])
+    return by_pattern
 
-        # Generate GeoJSON with the specified metadata
-        geojson_data = create_geojson(features)
 
-        # # Save GeoJSON to file
-        # with open(file_path, 'w') as file:
-        #     file.write(geojson_data)
-        # print(f"Saved GeoJSON: {file_path}")
+def placemark_feature(placemark):
+    """
+    Builds the GeoJSON Feature of a placemark, with metadata conforming to the
+    specified schema (only the feature name is known from the KML).
+    """
+    metadata = {
+        "Buried Depth": None,
+        "Category of Cable": None,
+        "Condition": None,
+        "[Feature Name]: Language": None,
+        "[Feature Name]: Name": placemark['name'],
+        "[Feature Name]: Name Usage": None,
+        "[Fixed Date Range]: Date End": None,
+        "[Fixed Date Range]: Date Start": None,
+        "Status": None,
+        "Scale Minimum": None,
+        "[Information]: File Locator": None,
+        "[Information]: File Reference": None,
+        "[Information]: Headline": None,
+        "[Information]: Language": None,
+        "[Information]: Text": None,
+        "Feature Association: Component of": None,
+        "Feature Association: Updates": None,
+        "Feature Association: Positions": None,
+        "Feature Association: Provides Information": None,
+    }
+
+    lines = placemark['lines']
+    if len(lines) == 1:
+        geometry = geojson.LineString(lines[0].tolist())
+    else:
+        geometry = geojson.MultiLineString([line.tolist() for line in lines])
+
+    return geojson.Feature(geometry=geometry, properties=metadata)
+
+
+def process_kml_file(kml_file_path, group_by=None, per_cable=False):
+    """
+    Converts a KML (or KMZ) file to GeoJSON, with metadata conforming to the specified schema.
+    Placemarks are grouped into cables (see `cable_group_key`) and every group is returned.
+
+    Args:
+        kml_file_path (str): The path to the KML or KMZ file.
+        group_by: Cable grouping rule, see `cable_group_key`.
+        per_cable (bool): Return one FeatureCollection per cable instead of a single one.
+
+    Returns:
+        str | dict: One FeatureCollection holding every cable's features, grouped in
+                    order, whose "cable_groups" member maps each cable name to the
+                    indexes of its features; or, with per_cable, a dict of cable name
+                    to that cable's FeatureCollection. Both are GeoJSON strings.
+    """
+    group_key = cable_group_key(group_by)
+    cable_groups = {}
+
+    for placemark in iter_placemarks(kml_file_path):
+        cable_groups.setdefault(group_key(placemark), []).append(placemark_feature(placemark))
+
+    # Encode once: per cable, or the whole network in one go
+    if per_cable:
+        return {
+            cable_name: dumps_geojson(geojson.FeatureCollection(features))
+            for cable_name, features in cable_groups.items()
+        }
+
+    all_features = []
+    group_indexes = {}
+    for cable_name, features in cable_groups.items():
+        group_indexes[cable_name] = list(range(len(all_features), len(all_features) + len(features)))
+        all_features.extend(features)
 
-    return geojson_data
\ No newline at end of file
+    feature_collection = geojson.FeatureCollection(all_features, cable_groups=group_indexes)
+    return dumps_geojson(feature_collection)
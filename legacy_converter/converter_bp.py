@@ -11,6 +11,7 @@ from dotenv import load_dotenv
 
 # KML parser
 from kml_to_geojson_functions import parse_kml
+from db_utils import get_connection
 
 converter_bp = Blueprint("converter_bp", __name__)
 
@@ -25,9 +26,7 @@ DATABASE_FILE = "UsersDB.db"
 ALLOWED_EXT = {"xlsx", "csv", "kml"}
 
 def get_db():
-    conn = sqlite3.connect(DATABASE_FILE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return get_connection(DATABASE_FILE)
 
 def get_dropbox_client():
     """
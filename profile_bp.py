@@ -70,8 +70,3 @@ def update_profile():
         return jsonify({"success": "Password updated successfully"}), 200
     except sqlite3.IntegrityError:
         return jsonify({"error": "Failed to update password"}), 500
-    finally:
-        # Typically you do not close the DB here if using Flask’s `g` object
-        # because Flask closes it automatically after the request.
-        # But if you really want to close it manually, you can keep this:
-        db.close()
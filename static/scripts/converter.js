@@ -35,6 +35,52 @@ document.addEventListener("DOMContentLoaded", () => {
   // Store the current FeatureCollection in JS memory
   let currentGeoJSON = null;
 
+  // How often a queued conversion job is polled (ms)
+  const JOB_POLL_INTERVAL = 1000;
+
+  // Polls /jobs/<id> until the conversion is done; resolves with the job's result
+  function waitForJob(jobId, onProgress) {
+    return new Promise((resolve, reject) => {
+      const poll = () => {
+        fetch(`/jobs/${jobId}`)
+          .then((res) => res.json())
+          .then((data) => {
+            if (!data.success) {
+              reject(new Error(data.error || "Conversion job not found."));
+              return;
+            }
+            const job = data.job;
+            if (onProgress) onProgress(job);
+
+            if (job.status === "done") {
+              resolve(job.result);
+            } else if (job.status === "failed") {
+              reject(new Error(job.error || "Conversion failed."));
+            } else {
+              setTimeout(poll, JOB_POLL_INTERVAL);
+            }
+          })
+          .catch(reject);
+      };
+      poll();
+    });
+  }
+
+  // Uploads a file to a conversion endpoint, then waits for the queued job
+  function convertFile(url, formData, onProgress) {
+    return fetch(url, {
+      method: "POST",
+      body: formData,
+    })
+      .then((res) => res.json())
+      .then((data) => {
+        if (!data.success) {
+          throw new Error(data.error || "An error occurred.");
+        }
+        return waitForJob(data.job_id, onProgress);
+      });
+  }
+
   // Basic popup open/close
   function openPopup() {
     converterPopup.style.display = "block";
@@ -77,20 +123,12 @@ document.addEventListener("DOMContentLoaded", () => {
 
     const fileExtension = file.name.split(".").pop().toLowerCase();
 
-    if (fileExtension === "kml") {
-      fetch("/upload_and_convert", {
-        method: "POST",
-        body: formData,
-      })
-        .then((res) => res.json())
-        .then((data) => {
-          if (!data.success) {
-            fileError.textContent = data.error || "An error occurred.";
-            return;
-          }
+    if (fileExtension === "kml" || fileExtension === "kmz") {
+      convertFile("/upload_and_convert", formData)
+        .then((result) => {
           // We got a real FeatureCollection from the server
-          currentGeoJSON = data.geojson;
-          fileError.textContent = data.message || "File parsed successfully.";
+          currentGeoJSON = result.geojson;
+          fileError.textContent = "File parsed successfully.";
 
           // Build the metadata form for each Feature
           buildMetadataForm(currentGeoJSON);
@@ -100,7 +138,7 @@ document.addEventListener("DOMContentLoaded", () => {
         })
         .catch((err) => {
           console.error("Error uploading file:", err);
-          fileError.textContent = "Error uploading file.";
+          fileError.textContent = err.message || "Error uploading file.";
         });
     }
   });
@@ -219,7 +257,11 @@ document.addEventListener("DOMContentLoaded", () => {
           alert("DB Error: " + (data.error || "unknown"));
           return;
         }
-        alert("Inserted to DB. Cable ID: " + data.cable_id);
+        if (data.cable_ids) {
+          alert(`Inserted ${data.cable_ids.length} cables to DB. Cable IDs: ${data.cable_ids.join(", ")}`);
+        } else {
+          alert("Inserted to DB. Cable ID: " + data.cable_id);
+        }
       })
       .catch((err) => {
         console.error(err);
@@ -297,37 +339,30 @@ document.addEventListener("DOMContentLoaded", () => {
     progressMessage.textContent = "Converting...";
     progressBar.style.width = "0%";
 
-    let progress = 0;
-    const progressInterval = setInterval(() => {
-      progress = Math.min(progress + 10, 90); 
-      progressBar.style.width = `${progress}%`;
-    }, 300);
-
-    fetch("/upload_xlsx", {
-      method: "POST",
-      body: formData,
+    convertFile("/upload_xlsx", formData, (job) => {
+      if (job.status === "queued") {
+        progressMessage.textContent = "Waiting for a conversion worker...";
+      } else if (job.sheets_total > 0) {
+        const percent = Math.round((job.sheets_done / job.sheets_total) * 100);
+        progressBar.style.width = `${percent}%`;
+        progressMessage.textContent =
+          `Converting... sheet ${job.sheets_done} of ${job.sheets_total} (${job.rows_parsed} rows)`;
+      }
     })
-      .then((response) => response.json())
-      .then((data) => {
-        clearInterval(progressInterval);
-        if (data.success) {
-          progressMessage.textContent = "Conversion succeeded!";
-          progressBar.style.width = "100%";
-          currentGeoJSON = data.files;
-
-          setTimeout(() => {
-            progressScreen.style.display = "none";
-            propertyEditScreen.style.display = "block";
-            populatePropertiesForm(data.files);
-          }, 1000);
-        } else {
-          progressMessage.textContent = "Conversion failed!";
-          progressScreen.style.backgroundColor = "#f8d7da";
-        }
+      .then((result) => {
+        progressMessage.textContent = "Conversion succeeded!";
+        progressBar.style.width = "100%";
+        currentGeoJSON = result.files;
+
+        setTimeout(() => {
+          progressScreen.style.display = "none";
+          propertyEditScreen.style.display = "block";
+          populatePropertiesForm(result.files);
+        }, 1000);
       })
       .catch((err) => {
-        clearInterval(progressInterval);
-        progressMessage.textContent = "An error occurred during conversion.";
+        console.error("Error converting XLSX file:", err);
+        progressMessage.textContent = `Conversion failed! ${err.message || ""}`;
         progressScreen.style.backgroundColor = "#f8d7da";
       });
   });
@@ -341,23 +376,15 @@ document.addEventListener("DOMContentLoaded", () => {
     const formData = new FormData();
     formData.append("file", file);
 
-    fetch("/upload_and_convert", {
-      method: "POST",
-      body: formData,
-    })
-      .then((response) => response.json())
-      .then((data) => {
-        if (data.success) {
-          currentGeoJSON = data.geojson;
-          buildMetadataForm(currentGeoJSON);
-          metadataForm.style.display = "block";
-        } else {
-          fileError.textContent = data.error || "An error occurred.";
-        }
+    convertFile("/upload_and_convert", formData)
+      .then((result) => {
+        currentGeoJSON = result.geojson;
+        buildMetadataForm(currentGeoJSON);
+        metadataForm.style.display = "block";
       })
       .catch((err) => {
         console.error("Error uploading KML file:", err);
-        fileError.textContent = "Error uploading file.";
+        fileError.textContent = err.message || "Error uploading file.";
       });
   }
 
@@ -366,7 +393,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
   
   fileInput.addEventListener("change", () => {
-    const allowedExtensions = ["xlsx", "kml"];
+    const allowedExtensions = ["xlsx", "kml", "kmz"];
     const file = fileInput.files[0];
     if (!file) return;
   
@@ -376,7 +403,7 @@ document.addEventListener("DOMContentLoaded", () => {
     fileNameDisplay.textContent = fileName;
   
     if (!allowedExtensions.includes(fileExtension)) {
-      fileError.textContent = "Invalid file type. Please upload a .xlsx or .kml file.";
+      fileError.textContent = "Invalid file type. Please upload a .xlsx, .kml or .kmz file.";
       fileError.className = "message-error";
       addToMapButton.style.display = "none"; 
 
@@ -391,7 +418,7 @@ document.addEventListener("DOMContentLoaded", () => {
       saveMetadataBtn.style.display ="none";
       confirmButton.style.display = "none"; 
       downloadButton.style.display = "none";
-    } else if (fileExtension === "kml") {
+    } else if (fileExtension === "kml" || fileExtension === "kmz") {
       addToMapButton.style.display = "none"; 
       processKMLFile(file); 
     }
@@ -28,47 +28,61 @@ document.addEventListener("DOMContentLoaded", () => {
     .setPrefix('Data © <a href="https://www.openstreetmap.org/">OpenStreetMap</a> contributors');
 
   /*************************************************************
-   * 2) MARITIME ZONES (Vector Tiles) for Visualization Only
+   * 2) MARITIME ZONES + CABLES (Vector Tiles) for Visualization Only
+   *    Served by our own /tiles/<layer>/{z}/{x}/{y}.pbf endpoint
    *************************************************************/
   const vectorGrid = {
     territorial: {
-      url: "https://tileserver-with-data.onrender.com/data/eez_12nm/{z}/{x}/{y}.pbf",
+      url: "/tiles/territorial/{z}/{x}/{y}.pbf",
       className: "territorial-layer",
     },
     contiguous: {
-      url: "https://tileserver-with-data.onrender.com/data/eez_24nm/{z}/{x}/{y}.pbf",
+      url: "/tiles/contiguous/{z}/{x}/{y}.pbf",
       className: "contiguous-layer",
     },
     eez: {
-      url: "https://tileserver-with-data.onrender.com/data/eez_boundaries/{z}/{x}/{y}.pbf",
+      url: "/tiles/eez/{z}/{x}/{y}.pbf",
       className: "eez-layer",
     },
     ecs: {
-      url: "https://tileserver-with-data.onrender.com/data/ecs/{z}/{x}/{y}.pbf",
+      url: "/tiles/ecs/{z}/{x}/{y}.pbf",
       className: "ecs-layer",
     },
     highseas: {
-      url: "https://tileserver-with-data.onrender.com/data/high_seas/{z}/{x}/{y}.pbf",
+      url: "/tiles/highseas/{z}/{x}/{y}.pbf",
       className: "highseas-layer",
     },
+    cables: {
+      url: "/tiles/cables/{z}/{x}/{y}.pbf",
+      className: "cables-tile-layer",
+    },
   };
 
   const overlayLayers = {};
   Object.entries(vectorGrid).forEach(([key, { url, className }]) => {
     overlayLayers[key] = L.vectorGrid.protobuf(url, {
-      vectorTileLayerStyles: { default: {} },
+      vectorTileLayerStyles: {
+        default: {},
+        // Same colours as the selected cables below
+        cables: (props) => getCableStyle(props),
+      },
       interactive: true,
       zIndex: 9,
-      getFeatureId: (feat) => feat.properties.MRGID_Ter1 || feat.properties.Sovereign1,
+      getFeatureId: (feat) =>
+        feat.properties.cable_id ||
+        feat.properties.MRGID_Ter1 || feat.properties.MRGID_TER1 ||
+        feat.properties.Sovereign1 || feat.properties.SOVEREIGN1,
     });
     overlayLayers[key].options.className = className;
 
-    // Optional mouseover popup for zone name
+    // Optional mouseover popup for zone / cable name
     overlayLayers[key].on("mouseover", (e) => {
       const props = e.layer.properties || {};
-      const popupContent = `
-        <strong>Zone:</strong> ${props.Sovereign1 || "Unknown"}<br/>
-        <strong>MRGID_Ter1:</strong> ${props.MRGID_Ter1 || "N/A"}
+      const popupContent = key === "cables"
+        ? `<strong>Cable:</strong> ${props.name || "Unknown"}`
+        : `
+        <strong>Zone:</strong> ${props.Sovereign1 || props.SOVEREIGN1 || "Unknown"}<br/>
+        <strong>MRGID_Ter1:</strong> ${props.MRGID_Ter1 || props.MRGID_TER1 || "N/A"}
       `;
       L.popup({ closeButton: false, autoPan: false })
         .setLatLng(e.latlng)
@@ -212,17 +226,82 @@ document.addEventListener("DOMContentLoaded", () => {
   // And cableCrossingsByCable for cable-to-cable intersections
   const cableCrossingsByCable = {};
 
-  // Fetch cables from /api/cables
+  /*************************************************************
+   * COMPACT WIRE FORMAT (?format=compact)
+   * Every array of positions is one flat array of integers, quantized
+   * with encoding.scale and (if encoding.delta) stored as differences
+   * from the previous position; see wire_format.py.
+   *************************************************************/
+  const POSITION_DEPTH = {
+    Point: 0,
+    MultiPoint: 1,
+    LineString: 1,
+    MultiLineString: 2,
+    Polygon: 2,
+    MultiPolygon: 3,
+  };
+
+  function decodePositions(values, dims, scale, delta) {
+    const positions = [];
+    const previous = new Array(dims).fill(0);
+    for (let i = 0; i < values.length; i += dims) {
+      const position = new Array(dims);
+      for (let d = 0; d < dims; d++) {
+        const value = delta ? previous[d] + values[i + d] : values[i + d];
+        previous[d] = value;
+        position[d] = value / scale[d];
+      }
+      positions.push(position);
+    }
+    return positions;
+  }
+
+  function decodeGeometry(geometry, encoding) {
+    if (!geometry || !encoding) return geometry;
+    if (geometry.type === "GeometryCollection") {
+      return {
+        type: "GeometryCollection",
+        geometries: geometry.geometries.map((g) => decodeGeometry(g, encoding)),
+      };
+    }
+    const { dims } = geometry;
+    const { scale, delta } = encoding;
+    const unpack = (coords, level) => {
+      if (level === 0) return decodePositions(coords, dims, scale, false)[0] || [];
+      if (level === 1) return decodePositions(coords, dims, scale, delta);
+      return coords.map((part) => unpack(part, level - 1));
+    };
+    return {
+      type: geometry.type,
+      coordinates: unpack(geometry.coordinates, POSITION_DEPTH[geometry.type]),
+    };
+  }
+
+  // Decodes the "geometry" of every record in place
+  function decodeGeometries(records, encoding) {
+    if (!encoding) return records;
+    records.forEach((record) => {
+      record.geometry = decodeGeometry(record.geometry, encoding);
+    });
+    return records;
+  }
+
+  // Fetch cables from /api/cables (compact wire format, decoded here)
   function fetchCables(filters = {}) {
     const url = new URL("/api/cables", window.location.origin);
     Object.entries(filters).forEach(([k, v]) => {
       if (v) url.searchParams.append(k, v);
     });
+    url.searchParams.append("format", "compact");
     return fetch(url)
       .then((r) => {
         if (!r.ok) throw new Error(`HTTP error! Status: ${r.status}`);
         return r.json();
       })
+      .then((data) => {
+        decodeGeometries(data.features, data.encoding);
+        return data;
+      })
       .catch((err) => {
         console.error("Error fetching cables:", err);
         return { features: [] };
@@ -287,6 +366,7 @@ document.addEventListener("DOMContentLoaded", () => {
         delete zoneCrossingsByCable[zone][cableName];
       }
     });
+    delete crossingsByCable[cableName.toLowerCase()];
     // Remove cable-cable intersections
     if (cableCrossingsByCable[cableName]) {
       map.removeLayer(cableCrossingsByCable[cableName]);
@@ -386,36 +466,72 @@ document.addEventListener("DOMContentLoaded", () => {
     ).map((cb) => cb.value);
   }
 
-  // fetch zone crossing
-  function fetchZoneCrossings(zone, cableName = "") {
-    let endpoint, color, group, zoneRef;
+  // Crossings of every zone per cable, loaded for all selected cables with one
+  // /api/cable-crossings/all request and shared by the five zone toggles.
+  // Keyed by lower-cased cable name; each value is a Promise of the API entry.
+  const crossingsByCable = {};
+
+  function fetchAllCrossings(cableNames) {
+    const missing = cableNames.filter((c) => !(c.toLowerCase() in crossingsByCable));
+    if (missing.length > 0) {
+      const url = new URL("/api/cable-crossings/all", window.location.origin);
+      missing.forEach((c) => url.searchParams.append("cable", c));
+      url.searchParams.append("format", "compact");
+
+      const request = fetch(url)
+        .then((res) => {
+          if (!res.ok) throw new Error(`HTTP error! Status: ${res.status}`);
+          return res.json();
+        })
+        .then((data) => {
+          const entries = {};
+          data.cables.forEach((entry) => {
+            Object.values(entry.intersections).forEach((records) =>
+              decodeGeometries(records, data.encoding)
+            );
+            entries[entry.cable_name] = entry;
+          });
+          return entries;
+        });
+
+      missing.forEach((c) => {
+        const key = c.toLowerCase();
+        const pending = request.then((entries) => entries[key] || null);
+        crossingsByCable[key] = pending;
+        // A failed request is retried on the next toggle
+        pending.catch(() => {
+          if (crossingsByCable[key] === pending) delete crossingsByCable[key];
+        });
+      });
+    }
+    return Promise.all(cableNames.map((c) => crossingsByCable[c.toLowerCase()]));
+  }
+
+  // draw zone crossings of the given cables
+  function fetchZoneCrossings(zone, cableNames) {
+    let color, group, zoneRef;
     switch (zone) {
       case "territorial":
-        endpoint = "/api/cable-crossings/territorial";
         color = "red";
         group = territorialGroup;
         zoneRef = zoneCrossingsByCable.territorial;
         break;
       case "contiguous":
-        endpoint = "/api/cable-crossings/contiguous";
         color = "orange";
         group = contiguousGroup;
         zoneRef = zoneCrossingsByCable.contiguous;
         break;
       case "eez":
-        endpoint = "/api/cable-crossings/eez";
         color = "blue";
         group = eezGroup;
         zoneRef = zoneCrossingsByCable.eez;
         break;
       case "ecs":
-        endpoint = "/api/cable-crossings/ecs";
         color = "purple";
         group = ecsGroup;
         zoneRef = zoneCrossingsByCable.ecs;
         break;
       case "highseas":
-        endpoint = "/api/cable-crossings/highseas";
         color = "green";
         group = highSeasGroup;
         zoneRef = zoneCrossingsByCable.highseas;
@@ -424,46 +540,43 @@ document.addEventListener("DOMContentLoaded", () => {
         console.warn(`Unknown zone: ${zone}`);
         return;
     }
-
-    const url = new URL(endpoint, window.location.origin);
-    if (cableName) url.searchParams.append("cable", cableName);
-
-    fetch(url)
-      .then((res) => {
-        if (!res.ok) throw new Error(`HTTP error! Status: ${res.status}`);
-        return res.json();
-      })
-      .then((data) => {
-        const { intersections } = data;
-        if (!zoneRef[cableName]) {
-          zoneRef[cableName] = L.featureGroup();
-        }
-        const cableFG = zoneRef[cableName];
-        intersections.forEach((inter) => {
-          const cName = inter.cable_name || "Unknown";
-          const zLabel = inter.zone_label || zone;
-          const ctry   = inter.country_name || "Unknown";
-          const lenKm  = inter.intersection_km || 0;
-          const geometry = inter.geometry;
-
-          const lyr = L.geoJSON(geometry, {
-            style: { color, weight: 8, opacity: 0.7 },
-            onEachFeature: (feat, layer) => {
-              layer.bindPopup(`
-                <div style="display:flex; align-items:center;">
-                  <i class="fa-solid fa-triangle-exclamation" style="color:${color}; margin-right:5px;"></i>
-                  <div>
-                    <strong>Cable:</strong> ${cName}<br/>
-                    <strong>Zone:</strong> ${zLabel} (${ctry})<br/>
-                    <strong>Approx. Length:</strong> ${lenKm} km
+    if (cableNames.length === 0) return;
+
+    fetchAllCrossings(cableNames)
+      .then((entries) => {
+        entries.forEach((entry, idx) => {
+          if (!entry) return;
+          const cableName = cableNames[idx];
+          if (!zoneRef[cableName]) {
+            zoneRef[cableName] = L.featureGroup();
+          }
+          const cableFG = zoneRef[cableName];
+          (entry.intersections[zone] || []).forEach((inter) => {
+            const cName = inter.cable_name || "Unknown";
+            const zLabel = inter.zone_label || zone;
+            const ctry   = inter.country_name || "Unknown";
+            const lenKm  = inter.intersection_km || 0;
+            const geometry = inter.geometry;
+
+            const lyr = L.geoJSON(geometry, {
+              style: { color, weight: 8, opacity: 0.7 },
+              onEachFeature: (feat, layer) => {
+                layer.bindPopup(`
+                  <div style="display:flex; align-items:center;">
+                    <i class="fa-solid fa-triangle-exclamation" style="color:${color}; margin-right:5px;"></i>
+                    <div>
+                      <strong>Cable:</strong> ${cName}<br/>
+                      <strong>Zone:</strong> ${zLabel} (${ctry})<br/>
+                      <strong>Approx. Length:</strong> ${lenKm} km
+                    </div>
                   </div>
-                </div>
-              `);
-            }
+                `);
+              }
+            });
+            lyr.addTo(cableFG);
           });
-          lyr.addTo(cableFG);
+          cableFG.addTo(group);
         });
-        cableFG.addTo(group);
       })
       .catch((err) => console.error(`Error fetching ${zone} crossings:`, err));
   }
@@ -473,13 +586,7 @@ document.addEventListener("DOMContentLoaded", () => {
   terrBtn?.addEventListener("click", () => {
     territorialVisible = !territorialVisible;
     if (territorialVisible) {
-      const selectedCables = getSelectedCables();
-      if (selectedCables.length === 0) {
-        // if no cables, fetch all or partial logic
-        fetchZoneCrossings("territorial");
-      } else {
-        selectedCables.forEach((cName) => fetchZoneCrossings("territorial", cName));
-      }
+      fetchZoneCrossings("territorial", getSelectedCables());
       terrBtn.classList.add("active");
     } else {
       territorialGroup.clearLayers();
@@ -493,12 +600,7 @@ document.addEventListener("DOMContentLoaded", () => {
   contigBtn?.addEventListener("click", () => {
     contiguousVisible = !contiguousVisible;
     if (contiguousVisible) {
-      const selCables = getSelectedCables();
-      if (selCables.length === 0) {
-        fetchZoneCrossings("contiguous");
-      } else {
-        selCables.forEach((c) => fetchZoneCrossings("contiguous", c));
-      }
+      fetchZoneCrossings("contiguous", getSelectedCables());
       contigBtn.classList.add("active");
     } else {
       contiguousGroup.clearLayers();
@@ -511,12 +613,7 @@ document.addEventListener("DOMContentLoaded", () => {
   eezBtn?.addEventListener("click", () => {
     eezVisible = !eezVisible;
     if (eezVisible) {
-      const selCables = getSelectedCables();
-      if (selCables.length === 0) {
-        fetchZoneCrossings("eez");
-      } else {
-        selCables.forEach((c) => fetchZoneCrossings("eez", c));
-      }
+      fetchZoneCrossings("eez", getSelectedCables());
       eezBtn.classList.add("active");
     } else {
       eezGroup.clearLayers();
@@ -529,12 +626,7 @@ document.addEventListener("DOMContentLoaded", () => {
   ecsBtn?.addEventListener("click", () => {
     ecsVisible = !ecsVisible;
     if (ecsVisible) {
-      const selCables = getSelectedCables();
-      if (selCables.length === 0) {
-        fetchZoneCrossings("ecs");
-      } else {
-        selCables.forEach((c) => fetchZoneCrossings("ecs", c));
-      }
+      fetchZoneCrossings("ecs", getSelectedCables());
       ecsBtn.classList.add("active");
     } else {
       ecsGroup.clearLayers();
@@ -547,12 +639,7 @@ document.addEventListener("DOMContentLoaded", () => {
   hsBtn?.addEventListener("click", () => {
     highSeasVisible = !highSeasVisible;
     if (highSeasVisible) {
-      const selCables = getSelectedCables();
-      if (selCables.length === 0) {
-        fetchZoneCrossings("highseas");
-      } else {
-        selCables.forEach((c) => fetchZoneCrossings("highseas", c));
-      }
+      fetchZoneCrossings("highseas", getSelectedCables());
       hsBtn.classList.add("active");
     } else {
       highSeasGroup.clearLayers();
@@ -595,6 +682,7 @@ document.addEventListener("DOMContentLoaded", () => {
   function fetchCableCrossings(cableName) {
     const url = new URL("/api/cable-crossings/cables", window.location.origin);
     url.searchParams.append("cable", cableName);
+    url.searchParams.append("format", "compact");
 
     // create a featureGroup for that cable's intersections
     const fg = L.featureGroup();
@@ -606,7 +694,8 @@ document.addEventListener("DOMContentLoaded", () => {
         return r.json();
       })
       .then((data) => {
-        const { crossings } = data; // array of { cableA, cableB, geometry }
+        // array of { cableA, cableB, geometry }
+        const crossings = decodeGeometries(data.crossings, data.encoding);
         crossings.forEach((cx) => {
           const geometry = cx.geometry;
           const cA = cx.cableA;
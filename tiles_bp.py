@@ -0,0 +1,204 @@
+# tiles_bp.py
+import os
+import shutil
+import tempfile
+import numpy as np
+import mapbox_vector_tile
+import mercantile
+import shapely
+from flask import Blueprint, Response, jsonify
+from flask_login import login_required
+from api_bp import get_db
+from cable_cache import get_snapshot
+from cable_lengths import get_transformer
+from geometry_pyramid import level_for_zoom
+from zone_layers import ZONE_FILES, get_zone_layer, get_zone_level_layer
+
+tiles_bp = Blueprint("tiles_bp", __name__)
+
+TILE_CACHE_DIR = "tile_cache"
+TILE_EXTENT = 4096
+# Extra margin around each tile (in tile units) so lines do not end at the edge
+TILE_BUFFER = 64
+# Simplify to half a pixel of a 256px tile
+SIMPLIFY_PIXELS = 0.5
+MAX_ZOOM = 22
+# Web Mercator stops here
+MAX_LAT = 85.0511287798
+
+MVT_MIMETYPE = "application/vnd.mapbox-vector-tile"
+
+
+def _to_mercator(geom):
+    transformer = get_transformer("EPSG:4326", "EPSG:3857")
+
+    def project(coords):
+        x, y = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([x, y])
+
+    return shapely.transform(geom, project)
+
+
+def _tile_features(geoms_and_props, z, x, y):
+    """
+    Clips, projects and simplifies (lon/lat geometry, properties) pairs for one tile.
+    """
+    west, south, east, north = mercantile.bounds(x, y, z)
+    margin_lon = (east - west) * TILE_BUFFER / TILE_EXTENT
+    margin_lat = (north - south) * TILE_BUFFER / TILE_EXTENT
+    clip_box = (
+        west - margin_lon, max(south - margin_lat, -MAX_LAT),
+        east + margin_lon, min(north + margin_lat, MAX_LAT),
+    )
+
+    xy_bounds = mercantile.xy_bounds(x, y, z)
+    tolerance = (xy_bounds.right - xy_bounds.left) / 256 * SIMPLIFY_PIXELS
+
+    features = []
+    for geom, props in geoms_and_props:
+        clipped = shapely.clip_by_rect(geom, *clip_box)
+        if clipped.is_empty:
+            continue
+        projected = _to_mercator(clipped).simplify(tolerance, preserve_topology=True)
+        if projected.is_empty:
+            continue
+        features.append({
+            "geometry": projected,
+            "properties": {k: v for k, v in props.items() if isinstance(v, (str, int, float, bool))},
+        })
+    return features, xy_bounds
+
+
+def _cable_candidates(snapshot, z, x, y):
+    _, geometries = snapshot.level(level_for_zoom(z), get_db)
+    west, south, east, north = mercantile.bounds(x, y, z)
+    for pos in snapshot.positions_in_bounds(west, south, east, north):
+        props = snapshot.features[pos]["properties"]
+        yield geometries[pos], {
+            "cable_id": snapshot.cable_ids[pos],
+            "name": props.get("[Feature Name]: Name"),
+            "Status": props.get("Status"),
+            "Condition": props.get("Condition"),
+            "Category of Cable": props.get("Category of Cable"),
+        }
+
+
+def _zone_candidates(zone_layer, z, x, y):
+    west, south, east, north = mercantile.bounds(x, y, z)
+    for idx in sorted(zone_layer.tree.query(shapely.box(west, south, east, north))):
+        yield zone_layer.geometries[idx], zone_layer.properties[idx]
+
+
+def render_tile(layer, z, x, y, snapshot=None):
+    """
+    Encodes one MVT tile for `layer` ("cables" or a zone label), starting from
+    the simplification pyramid level that matches the zoom. Cable tiles are drawn
+    from `snapshot` (default: the current CableSnapshot).
+
+    Returns:
+        bytes | None: The encoded tile, or None if the layer does not exist.
+    """
+    if layer == "cables":
+        candidates = _cable_candidates(snapshot or get_snapshot(get_db), z, x, y)
+    else:
+        zone_layer = get_zone_level_layer(ZONE_FILES[layer], level_for_zoom(z))
+        if zone_layer is None:
+            return None
+        candidates = _zone_candidates(zone_layer, z, x, y)
+
+    features, xy_bounds = _tile_features(candidates, z, x, y)
+    return mapbox_vector_tile.encode(
+        [{"name": layer, "features": features}],
+        default_options={
+            "quantize_bounds": (xy_bounds.left, xy_bounds.bottom, xy_bounds.right, xy_bounds.top),
+            "extents": TILE_EXTENT,
+        },
+    )
+
+
+def _cache_path(layer, z, x, y, snapshot=None):
+    """
+    On-disk location of a cached tile. Zone tiles live under their file hash and
+    cable tiles under the cable_version of the `snapshot` they are drawn from, so
+    a changed zone file or an insert never serves old tiles (older cable versions
+    are removed by `_prune_cable_tiles`).
+    """
+    if layer == "cables":
+        layer_dir = os.path.join(TILE_CACHE_DIR, "cables", str(snapshot.version))
+    else:
+        zone_layer = get_zone_layer(ZONE_FILES[layer])
+        if zone_layer is None:
+            return None
+        layer_dir = os.path.join(TILE_CACHE_DIR, layer, zone_layer.file_hash[:16])
+    return os.path.join(layer_dir, str(z), str(x), f"{y}.pbf")
+
+
+def _prune_cable_tiles(version):
+    """
+    Removes the cached cable tiles of every cable_version older than `version`.
+    Called when the first tile of `version` is written.
+    """
+    cables_dir = os.path.join(TILE_CACHE_DIR, "cables")
+    for entry in os.listdir(cables_dir):
+        if entry.isdigit() and int(entry) < version:
+            shutil.rmtree(os.path.join(cables_dir, entry), ignore_errors=True)
+
+
+def _write_tile(path, tile, snapshot=None):
+    """
+    Stores a rendered tile at `path`; the first cable tile of a new snapshot
+    version also drops the older versions.
+    """
+    first_of_version = (
+        snapshot is not None
+        and not os.path.isdir(os.path.join(TILE_CACHE_DIR, "cables", str(snapshot.version)))
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if first_of_version:
+        _prune_cable_tiles(snapshot.version)
+    # Unique per thread and process; the rename is atomic
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+        f.write(tile)
+    os.replace(f.name, path)
+
+
+@tiles_bp.route("/tiles/<layer>/<int:z>/<int:x>/<int:y>.pbf", methods=["GET"])
+@login_required
+def get_tile(layer, z, x, y):
+    """
+    GET /tiles/<layer>/<z>/<x>/<y>.pbf
+    Serves cables or a local maritime zone layer as a Mapbox Vector Tile.
+    """
+    if layer != "cables" and layer not in ZONE_FILES:
+        return jsonify({"error": f"Unknown layer '{layer}'"}), 404
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({"error": "Tile out of range"}), 400
+
+    try:
+        # Path and tile come from the same snapshot, so a tile rendered before an
+        # insert can only ever land under the version it was rendered from
+        snapshot = get_snapshot(get_db) if layer == "cables" else None
+        path = _cache_path(layer, z, x, y, snapshot)
+        if path is None:
+            return jsonify({"error": f"{ZONE_FILES[layer]} not found"}), 404
+
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                tile = f.read()
+        else:
+            tile = render_tile(layer, z, x, y, snapshot)
+            if tile is None:
+                return jsonify({"error": f"{ZONE_FILES[layer]} not found"}), 404
+            if tile:
+                try:
+                    _write_tile(path, tile, snapshot)
+                except OSError:
+                    # Its version was pruned by a newer one while we rendered: serve it uncached
+                    pass
+
+        return Response(tile, mimetype=MVT_MIMETYPE)
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,204 @@
+# wire_format.py
+import os
+import numpy as np
+from shapely.geometry import mapping
+from cable_store import decode_geometries
+from json_utils import dumps
+
+# Decimal places kept for longitude/latitude in the compact format; 6 places is about 0.1 m
+COMPACT_PRECISION = int(os.getenv("COMPACT_PRECISION", "6"))
+# Decimal places kept for depth (metres)
+DEPTH_PRECISION = 1
+MAX_PRECISION = 9
+
+# How deeply the position arrays are nested in each geometry type's coordinates
+POSITION_DEPTH = {
+    "Point": 0, "MultiPoint": 1, "LineString": 1,
+    "MultiLineString": 2, "Polygon": 2, "MultiPolygon": 3,
+}
+
+
+def wire_params(args):
+    """
+    Reads the wire format query parameters of an API request:
+    ?format=compact, ?precision=<decimal places> and ?delta=0 to turn off delta encoding.
+
+    In the compact format every array of positions (a line, a ring, the points of a
+    MultiPoint) is one flat array of integers: each position is quantized to
+    round(value * scale) and, with delta encoding, stored as the difference from the
+    previous position of the same array. Each geometry carries "dims" (2 or 3), and
+    the response carries the returned encoding so clients can decode it. Features
+    also leave out their null properties.
+
+    Returns:
+        dict | None: {"format", "scale", "delta"}, or None for plain GeoJSON.
+
+    Raises:
+        ValueError: With a message for the client if a parameter is malformed.
+    """
+    wire_format = args.get("format", "geojson").strip().lower() or "geojson"
+    if wire_format == "geojson":
+        return None
+    if wire_format != "compact":
+        raise ValueError("'format' must be 'geojson' or 'compact'")
+
+    try:
+        precision = int(args.get("precision", COMPACT_PRECISION))
+    except ValueError:
+        precision = -1
+    if not 0 <= precision <= MAX_PRECISION:
+        raise ValueError(f"'precision' must be an integer from 0 to {MAX_PRECISION}")
+
+    return {
+        "format": "compact",
+        "scale": [10 ** precision, 10 ** precision, 10 ** DEPTH_PRECISION],
+        "delta": args.get("delta", "1").strip().lower() not in ("0", "false", "no"),
+    }
+
+
+def _positions_array(positions):
+    # An (n, 2|3) float array; positions mixing 2D and 3D are padded to 3D with an
+    # altitude of 0, and values past the third are dropped
+    try:
+        values = np.asarray(positions, dtype=float)
+        if values.ndim == 2 and values.shape[1] <= 3:
+            return values
+    except ValueError:
+        pass
+    if len(positions) == 0:
+        return np.empty((0, 2))
+    dims = min(max(len(position) for position in positions), 3)
+    values = np.zeros((len(positions), dims))
+    for idx, position in enumerate(positions):
+        position = position[:dims]
+        values[idx, :len(position)] = position
+    return values
+
+
+def _pack(values, scale, delta, dims):
+    if values.size == 0:
+        return []
+    if values.shape[1] < dims:
+        values = np.hstack([values, np.zeros((len(values), dims - values.shape[1]))])
+    quantized = np.rint(values * scale[:dims]).astype(np.int64)
+    if delta:
+        quantized[1:] = np.diff(quantized, axis=0)
+    return quantized.ravel().tolist()
+
+
+def compact_geometry(geometry, encoding):
+    """
+    Encodes one GeoJSON geometry dict in the compact format described by `encoding`
+    (see `wire_params`).
+    """
+    if not geometry:
+        return geometry
+    geometry_type = geometry.get("type")
+    if geometry_type == "GeometryCollection":
+        return {
+            "type": geometry_type,
+            "geometries": [compact_geometry(geom, encoding) for geom in geometry["geometries"]],
+        }
+    if geometry_type not in POSITION_DEPTH:
+        raise ValueError(f"Unknown geometry type {geometry_type!r}")
+
+    scale = np.asarray(encoding["scale"], dtype=float)
+    dims = 2
+
+    def load(coordinates, level):
+        # Position arrays as numpy arrays, nested like the coordinates
+        nonlocal dims
+        if level <= 1:
+            values = _positions_array(coordinates if level == 1 else [coordinates])
+            if values.size:
+                dims = max(dims, values.shape[1])
+            return values
+        return [load(part, level - 1) for part in coordinates]
+
+    def pack(values, level):
+        if level <= 1:
+            return _pack(values, scale, encoding["delta"] and level == 1, dims)
+        return [pack(part, level - 1) for part in values]
+
+    # One "dims" per geometry: 2D parts of a 3D geometry are padded to 3D
+    level = POSITION_DEPTH[geometry_type]
+    coordinates = pack(load(geometry["coordinates"], level), level)
+    return {"type": geometry_type, "dims": dims, "coordinates": coordinates}
+
+
+def compact_features(features, encoding):
+    """
+    Returns copies of GeoJSON Features in the compact format: compact geometries
+    and no null properties (clients read a missing property as null).
+    """
+    return [
+        {
+            "type": "Feature",
+            "geometry": compact_geometry(feature.get("geometry"), encoding),
+            "properties": {
+                key: value for key, value in (feature.get("properties") or {}).items()
+                if value is not None
+            },
+        }
+        for feature in features
+    ]
+
+
+def compact_geometries(items, encoding):
+    """
+    Returns copies of Features (or crossing records) with their "geometry"
+    encoded in the compact format. With `encoding` None the items are returned as-is.
+    """
+    if encoding is None:
+        return items
+    return [{**item, "geometry": compact_geometry(item.get("geometry"), encoding)} for item in items]
+
+
+def compact_geometry_json(encoding):
+    """
+    Returns a `geometry_encoder` for cable_store.iter_feature_json that turns
+    stored WKB values into compact geometry JSON text.
+    """
+    def encode(blobs):
+        return [
+            dumps(compact_geometry(mapping(geom), encoding)) if geom is not None else None
+            for geom in decode_geometries(blobs)
+        ]
+    return encode
+
+
+def _unpack(values, dims, scale, delta):
+    positions = np.asarray(values, dtype=np.int64).reshape(-1, dims)
+    if delta:
+        positions = np.cumsum(positions, axis=0)
+    return (positions / scale[:dims]).tolist()
+
+
+def decode_geometry(geometry, encoding):
+    """
+    Decodes a compact geometry back into a GeoJSON geometry dict, like the
+    decoder in static/scripts/map.js.
+    """
+    if not geometry:
+        return geometry
+    if geometry["type"] == "GeometryCollection":
+        return {
+            "type": "GeometryCollection",
+            "geometries": [decode_geometry(geom, encoding) for geom in geometry["geometries"]],
+        }
+
+    scale = np.asarray(encoding["scale"], dtype=float)
+    dims = geometry["dims"]
+
+    def unpack(coordinates, level):
+        if level == 0:
+            positions = _unpack(coordinates, dims, scale, False)
+            return positions[0] if positions else []
+        if level == 1:
+            return _unpack(coordinates, dims, scale, encoding["delta"])
+        return [unpack(part, level - 1) for part in coordinates]
+
+    return {
+        "type": geometry["type"],
+        "coordinates": unpack(geometry["coordinates"], POSITION_DEPTH[geometry["type"]]),
+    }
@@ -0,0 +1,392 @@
+# zone_crossings.py
+import argparse
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from shapely.ops import unary_union
+from cable_lengths import geodesic_lengths_km
+from cable_store import fetch_geometries_by_name, fetch_name_keys
+from db_utils import DATABASE_FILE
+from json_utils import dumps, dumps_geojson, loads
+from zone_layers import ZONE_FILES, get_zone_layer
+
+# Bump when the way crossing lengths are measured changes, so stored rows get rebuilt
+LENGTH_METHOD = "geodesic-wgs84"
+
+_rebuild_lock = threading.Lock()
+
+
+def create_crossing_tables(cursor):
+    """
+    Creates `cable_zone_crossings` (one row per cable name / zone polygon crossing)
+    and `zone_layer_versions`, which records the zone file hash each zone's
+    crossings were computed from.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cable_zone_crossings(
+            crossing_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name_key TEXT NOT NULL,
+            zone_label TEXT NOT NULL,
+            zone_index INTEGER NOT NULL,
+            country_name TEXT,
+            intersection_km REAL NOT NULL,
+            geometry TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cable_zone_crossings_lookup
+        ON cable_zone_crossings(zone_label, name_key, zone_index)
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS zone_layer_versions(
+            zone_label TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            file_hash TEXT NOT NULL,
+            computed_at TEXT NOT NULL
+        )
+    """)
+
+
+def init_zone_crossings(database_file):
+    """
+    Creates the crossing tables if needed. They are filled lazily per zone
+    or in bulk with `python zone_crossings.py`.
+    """
+    with sqlite3.connect(database_file) as conn:
+        create_crossing_tables(conn.cursor())
+        conn.commit()
+
+
+def crossing_rows(name_key, cable_geom, zone_label, zone_layer):
+    """
+    Intersects one cable geometry with one zone layer.
+    Lengths are geodesic, computed for all intersection parts in one call.
+
+    Returns:
+        list[tuple]: Rows ready for `cable_zone_crossings`, in zone file order.
+    """
+    hits = zone_layer.intersections(cable_geom)
+    lengths_km = geodesic_lengths_km([inters for _, inters in hits])
+    return [
+        (
+            name_key,
+            zone_label,
+            zone_idx,
+            zone_layer.country_name(zone_idx),
+            round(float(length_km), 3),
+            dumps_geojson(inters.__geo_interface__),
+        )
+        for (zone_idx, inters), length_km in zip(hits, lengths_km)
+    ]
+
+
+def _layer_version(zone_layer):
+    """
+    What the stored crossings of a zone depend on: the zone file contents and
+    the length method. Stored in `zone_layer_versions.file_hash`.
+    """
+    return f"{zone_layer.file_hash}:{LENGTH_METHOD}"
+
+
+def _available_zones(zone_labels=None):
+    """
+    Returns (zone_label, ZoneLayer) for the requested zones whose files exist.
+    """
+    zones = []
+    for zone_label in zone_labels or ZONE_FILES:
+        zone_layer = get_zone_layer(ZONE_FILES[zone_label])
+        if zone_layer is not None:
+            zones.append((zone_label, zone_layer))
+    return zones
+
+
+def compute_crossings(conn, name_keys, zone_labels=None):
+    """
+    Computes the crossing rows of the given cable names against the given zones.
+    """
+    zones = _available_zones(zone_labels)
+
+    rows = []
+    for name_key in name_keys:
+        geoms = fetch_geometries_by_name(conn, name_key)
+        if not geoms:
+            continue
+        cable_geom = unary_union(geoms)
+        for zone_label, zone_layer in zones:
+            rows.extend(crossing_rows(name_key, cable_geom, zone_label, zone_layer))
+    return rows
+
+
+def write_crossings(conn, rows, name_keys=None, zone_labels=None):
+    """
+    Replaces the stored crossings of `name_keys` (all names when None) for the
+    given zones with `rows`. The caller commits.
+    """
+    cur = conn.cursor()
+    for zone_label in zone_labels or ZONE_FILES:
+        if name_keys is None:
+            cur.execute("DELETE FROM cable_zone_crossings WHERE zone_label = ?", (zone_label,))
+        else:
+            cur.executemany(
+                "DELETE FROM cable_zone_crossings WHERE zone_label = ? AND name_key = ?",
+                [(zone_label, name_key) for name_key in name_keys]
+            )
+    cur.executemany("""
+        INSERT INTO cable_zone_crossings
+            (name_key, zone_label, zone_index, country_name, intersection_km, geometry)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+
+
+def record_zone_versions(conn, zone_labels=None):
+    cur = conn.cursor()
+    for zone_label, zone_layer in _available_zones(zone_labels):
+        cur.execute("""
+            INSERT OR REPLACE INTO zone_layer_versions (zone_label, filename, file_hash, computed_at)
+            VALUES (?, ?, ?, datetime('now'))
+        """, (zone_label, zone_layer.filename, _layer_version(zone_layer)))
+
+
+def mark_zones_stale(conn, zone_labels=None):
+    """
+    Forgets the recorded version of the given zones (all by default), so the next
+    `ensure_crossings` rebuilds their crossings. Commits.
+    """
+    cur = conn.cursor()
+    if zone_labels is None:
+        cur.execute("DELETE FROM zone_layer_versions")
+    else:
+        cur.executemany("DELETE FROM zone_layer_versions WHERE zone_label = ?", [(label,) for label in zone_labels])
+    conn.commit()
+
+
+def refresh_cable_crossings(conn, cable_id):
+    """
+    Recomputes the crossings of every cable name present in `cable_id`.
+    Called right after a cable is inserted; commits.
+    """
+    refresh_cables_crossings(conn, [cable_id])
+
+
+def refresh_cables_crossings(conn, cable_ids):
+    """
+    Recomputes the crossings of every cable name present in any of `cable_ids`,
+    in one write and one commit. Used after bulk inserts.
+    """
+    name_keys = sorted({
+        name_key for cable_id in cable_ids for name_key in fetch_name_keys(conn, cable_id)
+    })
+    rows = compute_crossings(conn, name_keys)
+    write_crossings(conn, rows, name_keys)
+    conn.commit()
+
+
+def ensure_zone_crossings(conn, zone_label):
+    """
+    Rebuilds the crossings of `zone_label` for every cable if its zone file or the
+    length method changed (or it was never materialized). Returns False if the zone file does not exist.
+    """
+    return bool(ensure_crossings(conn, [zone_label]))
+
+
+def ensure_crossings(conn, zone_labels=None):
+    """
+    Same as `ensure_zone_crossings` for several zones (all by default). Every stale
+    zone is rebuilt in one pass over the cables: each cable geometry is read and
+    unioned once, then intersected with all of them.
+
+    Returns:
+        list[str]: The requested zone labels whose files exist, in ZONE_FILES order.
+    """
+    zones = _available_zones(zone_labels)
+    if stale_zones(conn, zone_labels):
+        with _rebuild_lock:
+            stale = stale_zones(conn, zone_labels)
+            if stale:
+                for label in stale:
+                    print(f"Zone layer {ZONE_FILES[label]} changed, rebuilding {label} crossings...")
+                rows = compute_crossings(conn, fetch_name_keys(conn), stale)
+                write_crossings(conn, rows, None, stale)
+                record_zone_versions(conn, stale)
+                conn.commit()
+    return [label for label, _ in zones]
+
+
+def stale_zones(conn, zone_labels=None):
+    """
+    Returns the labels of the given zones (all by default) whose files exist but
+    whose stored crossings were computed from another file version, or never.
+    """
+    return [
+        label for label, zone_layer in _available_zones(zone_labels)
+        if _stored_hash(conn, label) != _layer_version(zone_layer)
+    ]
+
+
+def zone_versions(zone_labels=None):
+    """
+    Returns {zone_label: version} of the given zones whose files exist, where the
+    version is what `zone_layer_versions.file_hash` records for up-to-date crossings.
+    """
+    return {label: _layer_version(zone_layer) for label, zone_layer in _available_zones(zone_labels)}
+
+
+def _stored_hash(conn, zone_label):
+    cur = conn.cursor()
+    cur.execute("SELECT file_hash FROM zone_layer_versions WHERE zone_label = ?", (zone_label,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def fetch_crossings(conn, zone_label, name_key):
+    """
+    Reads the materialized crossings of one cable name with one zone.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT country_name, intersection_km, geometry FROM cable_zone_crossings
+        WHERE zone_label = ? AND name_key = ?
+        ORDER BY zone_index
+    """, (zone_label, name_key))
+    return [_crossing_record(name_key, zone_label, row) for row in cur.fetchall()]
+
+
+def fetch_all_crossings(conn, name_keys, zone_labels=None):
+    """
+    Reads the materialized crossings of several cable names with several zones
+    (all by default) in one query.
+
+    Returns:
+        dict: {name_key: {zone_label: [crossing, ...]}} with every requested name
+              and zone present, crossings in zone file order.
+    """
+    zone_labels = list(zone_labels or ZONE_FILES)
+    crossings = {name_key: {zone_label: [] for zone_label in zone_labels} for name_key in name_keys}
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT name_key, zone_label, country_name, intersection_km, geometry FROM cable_zone_crossings
+        WHERE zone_label IN (SELECT value FROM json_each(?))
+          AND name_key IN (SELECT value FROM json_each(?))
+        ORDER BY zone_label, name_key, zone_index
+    """, (dumps(zone_labels), dumps(list(name_keys))))
+    for row in cur.fetchall():
+        crossings[row[0]][row[1]].append(_crossing_record(row[0], row[1], row[2:]))
+    return crossings
+
+
+def _crossing_record(name_key, zone_label, row):
+    # row: (country_name, intersection_km, geometry)
+    return {
+        "zone_label": zone_label,
+        "cable_name": name_key,
+        "country_name": row[0],
+        "intersection_km": row[1],
+        "geometry": loads(row[2]),
+    }
+
+
+def summarize_crossings(crossings):
+    """
+    Length breakdown of crossing records (from one or several cables) per zone type
+    and per country. Zone types overlap (the territorial sea is also part of the
+    EEZ), so lengths are never added up across zone types.
+
+    Returns:
+        dict: {"zones": {zone_label: km}, "countries": [{"country_name", "zones":
+              {zone_label: km}}, ...]} with countries sorted by name.
+    """
+    zones = {}
+    countries = {}
+    for crossing in crossings:
+        zone_label = crossing["zone_label"]
+        country_name = crossing["country_name"] or "Unknown"
+        zones[zone_label] = zones.get(zone_label, 0.0) + crossing["intersection_km"]
+        country = countries.setdefault(country_name, {})
+        country[zone_label] = country.get(zone_label, 0.0) + crossing["intersection_km"]
+
+    return {
+        "zones": {zone_label: round(km, 3) for zone_label, km in zones.items()},
+        "countries": [
+            {
+                "country_name": country_name,
+                "zones": {zone_label: round(km, 3) for zone_label, km in countries[country_name].items()},
+            }
+            for country_name in sorted(countries)
+        ],
+    }
+
+
+def summarize_cable_crossings(crossings_by_zone):
+    """
+    `summarize_crossings` of one cable's {zone_label: [crossing, ...]} from `fetch_all_crossings`.
+    """
+    return summarize_crossings(chain.from_iterable(crossings_by_zone.values()))
+
+
+def _load_zone_layers(zone_labels):
+    """
+    Process pool initializer: loads the zone layers (polygons and STRtrees) before
+    the first chunk. Forked workers find the parent's already loaded layers and
+    share their memory until written to.
+    """
+    _available_zones(zone_labels)
+
+
+def _compute_chunk(args):
+    """
+    Process pool worker: computes the crossing rows for a chunk of cable names.
+    Each worker loads the zone layers once through the registry.
+    """
+    database_file, name_keys, zone_labels = args
+    conn = sqlite3.connect(database_file)
+    try:
+        return compute_crossings(conn, name_keys, zone_labels)
+    finally:
+        conn.close()
+
+
+def compute_crossings_parallel(database_file, name_keys, zone_labels=None, workers=None, chunk_size=25):
+    """
+    Computes the crossing rows of `name_keys` with a process pool split across cable names.
+    """
+    chunks = [name_keys[i:i + chunk_size] for i in range(0, len(name_keys), chunk_size)]
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_zone_layers, initargs=(zone_labels,)) as pool:
+        for chunk_rows in pool.map(_compute_chunk, [(database_file, chunk, zone_labels) for chunk in chunks]):
+            rows.extend(chunk_rows)
+    return rows
+
+
+def rebuild_all_crossings(database_file=DATABASE_FILE, zone_labels=None, workers=None, chunk_size=25):
+    """
+    Recomputes the whole `cable_zone_crossings` table (or only some zones) with a
+    process pool split across cable names, then writes it in one transaction.
+    """
+    start = time.perf_counter()
+    with sqlite3.connect(database_file) as conn:
+        create_crossing_tables(conn.cursor())
+        name_keys = fetch_name_keys(conn)
+
+    rows = compute_crossings_parallel(database_file, name_keys, zone_labels, workers, chunk_size)
+
+    with sqlite3.connect(database_file) as conn:
+        write_crossings(conn, rows, None, zone_labels)
+        record_zone_versions(conn, zone_labels)
+        conn.commit()
+
+    elapsed = time.perf_counter() - start
+    print(f"Rebuilt {len(rows)} crossings for {len(name_keys)} cables in {elapsed:.2f}s.")
+    return len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the cable_zone_crossings table.")
+    parser.add_argument("--database", default=DATABASE_FILE, help="SQLite database file")
+    parser.add_argument("--zone", action="append", choices=sorted(ZONE_FILES),
+                        help="Only rebuild this zone (repeatable); default is every zone")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    rebuild_all_crossings(args.database, args.zone, args.workers)
@@ -0,0 +1,127 @@
+# zone_layers.py
+import hashlib
+import os
+import threading
+import shapely
+from shapely.geometry import shape
+from shapely.strtree import STRtree
+from geometry_pyramid import build_zone_pyramid, zone_level_filename
+from json_utils import loads
+
+ZONE_DIR = os.path.join("static", "simplified_geojson_files")
+
+# zone_label -> file in ZONE_DIR
+ZONE_FILES = {
+    "territorial": "simplified_eez_12nm_v4.geojson",
+    "contiguous": "simplified_eez_24nm_v4.geojson",
+    "eez": "simplified_eez_v12.geojson",
+    "ecs": "simplified_ecs_v02.geojson",
+    "highseas": "simplified_High_Seas_v2.geojson",
+}
+
+_lock = threading.Lock()
+_layers = {}
+
+
+class ZoneLayer:
+    """
+    One maritime zone file loaded into memory: prepared polygons, their
+    properties and an STRtree over the polygon bounding boxes.
+    """
+
+    def __init__(self, filename, path):
+        self.filename = filename
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        # Identifies the file contents, e.g. to tell when materialized crossings are stale
+        self.file_hash = hashlib.sha256(raw).hexdigest()
+        zone_data = loads(raw)
+
+        self.geometries = []
+        self.properties = []
+        for zfeat in zone_data.get("features", []):
+            geom = zfeat.get("geometry")
+            if not geom or not geom.get("type"):
+                continue
+            self.geometries.append(shape(geom))
+            self.properties.append(zfeat.get("properties") or {})
+
+        shapely.prepare(self.geometries)
+        self.tree = STRtree(self.geometries)
+
+    def country_name(self, idx):
+        return self.properties[idx].get("SOVEREIGN1", "Unknown")
+
+    def intersections(self, geom):
+        """
+        Intersects `geom` with the zone polygons whose bounding boxes it hits.
+
+        Returns:
+            list[tuple]: (polygon index, intersection geometry) in file order,
+                         skipping empty intersections.
+        """
+        results = []
+        for idx in sorted(self.tree.query(geom)):
+            zone_geom = self.geometries[idx]
+            if not zone_geom.intersects(geom):
+                continue
+            inters = geom.intersection(zone_geom)
+            if not inters.is_empty:
+                results.append((int(idx), inters))
+        return results
+
+
+def get_zone_layer(filename):
+    """
+    Returns the loaded ZoneLayer for `filename`, or None if the file does not exist.
+    Each file is parsed once per process and reloaded only when it changes on disk.
+    """
+    path = os.path.join(ZONE_DIR, filename)
+    if not os.path.exists(path):
+        return None
+
+    layer = _layers.get(filename)
+    if layer is not None and layer.mtime == os.path.getmtime(path):
+        return layer
+
+    with _lock:
+        layer = _layers.get(filename)
+        if layer is None or layer.mtime != os.path.getmtime(path):
+            print(f"Loading zone layer {filename}...")
+            layer = ZoneLayer(filename, path)
+            _layers[filename] = layer
+    return layer
+
+
+def zone_level_path(filename, level):
+    """
+    Returns the path of a zone file at one pyramid level, building the pyramid
+    next to the source first if needed, or None if the zone file does not exist.
+    """
+    if not os.path.exists(os.path.join(ZONE_DIR, filename)):
+        return None
+    if level > 0:
+        build_zone_pyramid(ZONE_DIR, filename)
+    return os.path.join(ZONE_DIR, zone_level_filename(filename, level))
+
+
+def get_zone_level_layer(filename, level):
+    """
+    Same as `get_zone_layer`, but for one pyramid level of the zone file.
+    """
+    if zone_level_path(filename, level) is None:
+        return None
+    return get_zone_layer(zone_level_filename(filename, level))
+
+
+def preload_zone_layers():
+    """
+    Loads every known zone file up front so the first request does not pay for it,
+    and builds any missing simplification pyramid.
+    """
+    for filename in ZONE_FILES.values():
+        get_zone_layer(filename)
+        build_zone_pyramid(ZONE_DIR, filename)